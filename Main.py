@@ -1,16 +1,155 @@
 import requests
-from bs4 import BeautifulSoup
+import argparse
+import asyncio
+import csv
+import io
+import json
+import math
+import sys
+import threading
 import time
-from typing import Dict, List, Optional, Union
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Optional, Union
 import re
 
+from posterior import final_probability_interval
+from disk_cache import DiskCache
+from player_index import PlayerIndex
+from season_dates import parse_game_date, regular_season_start, season_end_year, season_start_year
+from season_store import SeasonStore
+from snapshot import WarmSnapshot
+from stat_store import SQLAggregates, StatWarehouse
+from parsers import get_backend
+from gamelog import GameLog, OpponentAggregates
+from lazy_analysis import STANDINGS_COMPONENTS, LazyAnalysis, check_components
+from metrics import Metrics, NULL_METRICS, configure_event_logging, write_prometheus
+from transport import LiveTransport, ResilientTransport, Transport, make_transport, parse_latency
+
 
 class NBAPropsAnalyzer:
-    def __init__(self):
+    STANDINGS_URL = "https://www.espn.com/nba/standings"
+    SEARCH_URL = "https://site.web.api.espn.com/apis/common/v3/search"
+    GAMELOG_URL = "https://www.espn.com/nba/player/gamelog/_/id/{player_id}"
+    # Past seasons by the year they end in (2024 is the 2023-24 season)
+    GAMELOG_SEASON_URL = "https://www.espn.com/nba/player/gamelog/_/id/{player_id}/type/nba/year/{season}"
+
+    # Map property types to game log keys
+    PROP_STATS = {
+        'points': 'points',
+        'rebounds': 'rebounds',
+        'assists': 'assists',
+        'steals': 'steals',
+        'blocks': 'blocks',
+        'threes': 'threes',
+        'pra': 'pra'
+    }
+
+    def __init__(self, cache_dir: Optional[str] = None, cache_ttls: Optional[Dict[str, float]] = None,
+                 player_index_path: Optional[str] = None, max_concurrency: int = 8,
+                 parser: str = 'auto', gamelog_parser: str = 'auto',
+                 parse_workers: int = 0, parse_chunksize: int = 4,
+                 transport: Optional[Transport] = None, metrics: Optional[Metrics] = None,
+                 history_dir: Optional[str] = None, warehouse_path: Optional[str] = None):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
+        # Parsed standings and game logs survive restarts when a cache dir is given
+        self.cache = DiskCache(cache_dir, cache_ttls) if cache_dir else None
+        # Completed seasons are fetched once and then read locally
+        self.season_store = SeasonStore(history_dir) if history_dir else None
+        # Optional SQLite warehouse that every fetched game log is upserted into
+        self.warehouse = StatWarehouse(warehouse_path) if warehouse_path else None
+        # Warmed slate data served from memory (see load_snapshot / warmer.py)
+        self.snapshot: Optional[WarmSnapshot] = None
+        # Name -> ESPN id lookups are served locally once a player has been seen
+        self.player_index = PlayerIndex(player_index_path)
+        # HTML backend used to pull rows out of ESPN's table.Table elements
+        self.parser = get_backend(parser)
+        # Backend for game-log pages; 'stream' (opt-in) reads them row by row and stops at the season totals marker
+        self.gamelog_parser = get_backend(gamelog_parser)
+
+        # Every request goes through the transport: live, recording or replaying an archive,
+        # by default behind retries with backoff and an adaptive concurrency limit
+        self.transport = transport or ResilientTransport(LiveTransport(max_concurrency), max_concurrency=max_concurrency)
+        # Stage timings and cache/bytes counters; the default no-op costs next to nothing
+        self.metrics = metrics or NULL_METRICS
+        self.transport.bind_metrics(self.metrics)
+
+        # Async fetches run blocking I/O here; its size bounds concurrency
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='props-io')
+
+        # Optional process pool for CPU-bound game-log parsing on big refreshes
+        self.parse_workers = parse_workers
+        self.parse_chunksize = parse_chunksize
+        self._parse_pool = None
+        self._gamelog_parser_name = gamelog_parser
+
+    def load_snapshot(self, path: str, max_age: Optional[float] = 24 * 60 * 60) -> int:
+        """
+        Serve players in a warmed snapshot from memory.
+
+        Players missing from the snapshot, or any player once the snapshot is
+        older than max_age seconds, fall back to the normal fetch path.
+
+        :return: Number of players in the snapshot.
+        """
+        self.snapshot = WarmSnapshot.load(path, max_age)
+        self.snapshot.precompute(set(self.PROP_STATS.values()))
+        return len(self.snapshot.players)
+
+    def snapshot_game_log(self, player_name: str) -> Optional[GameLog]:
+        """The player's GameLog from a fresh snapshot, or None"""
+        if self.snapshot and self.snapshot.is_fresh():
+            return self.snapshot.game_log(player_name)
+        return None
+
+    def _serves_from_snapshot(self, player_name: str, seasons: int = 1, date_filter: Optional[str] = None) -> bool:
+        return seasons <= 1 and not date_filter and self.snapshot_game_log(player_name) is not None
+
+    def snapshot_standings(self) -> Optional[Dict]:
+        """Standings from a fresh snapshot, or None"""
+        if self.snapshot and self.snapshot.is_fresh():
+            return self.snapshot.standings
+        return None
+
+    def close(self) -> None:
+        """Shut down the I/O and parse pools and the transport (which saves any recording)"""
+        self._executor.shutdown(wait=False)
+        if self._parse_pool:
+            self._parse_pool.shutdown(wait=False)
+            self._parse_pool = None
+        self.transport.close()
+        if self.warehouse:
+            self.warehouse.close()
+
+    def _http_get(self, url: str, **kwargs) -> requests.Response:
+        """Issue a GET through the configured transport"""
+        return self.transport.get(url, **kwargs)
+
+    async def _run_io(self, func, *args):
+        """Run a blocking fetch on the I/O pool without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    @staticmethod
+    def _run_sync(coro):
+        """Drive a coroutine to completion from synchronous code"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+
+        # Already inside an event loop (e.g. a notebook): use a private one
+        result = {}
+
+        def runner():
+            result["value"] = asyncio.run(coro)
+
+        thread = threading.Thread(target=runner)
+        thread.start()
+        thread.join()
+        return result["value"]
 
     def clean_team_name(self, raw_text: str) -> str:
         """Clean team name from the raw text"""
@@ -66,82 +205,178 @@ class NBAPropsAnalyzer:
                 
         return raw_text
 
+    def _conditional_get(self, resource: str, key: str, url: str, **kwargs):
+        """
+        Consult the disk cache before going to the network.
+
+        Fresh entries are served without a request. Stale entries are
+        revalidated with ETag/Last-Modified so an unchanged page costs a 304
+        and no parsing.
+
+        :return: (cached data, None) when the cache answered, otherwise
+                 (None, response) with a page that still needs parsing.
+        """
+        entry = self.cache.get(resource, key) if self.cache else None
+        if entry and entry["fresh"]:
+            self.metrics.incr('cache_requests', resource=resource, result='hit')
+            return entry["data"], None
+
+        headers = dict(self.headers)
+        if entry:
+            if entry.get("etag"):
+                headers['If-None-Match'] = entry["etag"]
+            if entry.get("last_modified"):
+                headers['If-Modified-Since'] = entry["last_modified"]
+
+        with self.metrics.stage('fetch', resource=resource):
+            response = self._http_get(url, headers=headers, **kwargs)
+        self.metrics.incr('http_responses', resource=resource, status=response.status_code)
+        self.metrics.incr('bytes_fetched', len(response.content), resource=resource)
+
+        if entry and response.status_code == 304:
+            self.metrics.incr('cache_requests', resource=resource, result='revalidated')
+            self.cache.touch(resource, key)
+            return entry["data"], None
+        if self.cache:
+            self.metrics.incr('cache_requests', resource=resource, result='miss')
+        return None, response
+
+    def _store(self, resource: str, key: str, data, response: requests.Response) -> None:
+        """Cache freshly parsed data along with the response's validators"""
+        if self.cache and response.status_code == 200:
+            self.cache.set(
+                resource, key, data,
+                etag=response.headers.get('ETag'),
+                last_modified=response.headers.get('Last-Modified')
+            )
+
+    def _fetch_cached(self, resource: str, key: str, url: str, parse, **kwargs):
+        """Fetch and parse a page, going through the disk cache when enabled"""
+        data, response = self._conditional_get(resource, key, url, **kwargs)
+        if response is None:
+            return data
+        # Throttled or failed pages that outlived the transport's retries are errors, not empty pages
+        response.raise_for_status()
+
+        with self.metrics.stage('parse', resource=resource):
+            data = parse(response.content)
+        self._store(resource, key, data, response)
+        return data
+
     def scrape_standings(self) -> Dict:
         """Scrape current NBA standings"""
         #print("Fetching NBA standings...")
-        url = "https://www.espn.com/nba/standings"
+        url = self.STANDINGS_URL
         
         try:
-            response = requests.get(url, headers=self.headers)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            tables = soup.find_all('table', class_='Table')
-            #print(f"\nFound {len(tables)} tables")
-            
-            standings = {'Eastern': [], 'Western': []}
-            
-            # Process team names from the first and third tables
-            eastern_teams = []
-            western_teams = []
-            
-            if len(tables) >= 1:
-                for row in tables[0].find_all('tr')[1:]:  # Skip header
-                    cell = row.find('td')
-                    if cell:
-                        team_name = self.clean_team_name(cell.text.strip())
-                        eastern_teams.append(team_name)
-                        
-            if len(tables) >= 3:
-                for row in tables[2].find_all('tr')[1:]:  # Skip header
-                    cell = row.find('td')
-                    if cell:
-                        team_name = self.clean_team_name(cell.text.strip())
-                        western_teams.append(team_name)
-            
-            # Process stats from the second and fourth tables
-            if len(tables) >= 2:
-                for i, row in enumerate(tables[1].find_all('tr')[1:]):  # Skip header
-                    cells = row.find_all('td')
-                    if len(cells) >= 3 and i < len(eastern_teams):
-                        try:
-                            win_pct = float(cells[2].text.strip().replace('.', '0.'))
-                        except ValueError:
-                            win_pct = 0.0
-                            
-                        standings['Eastern'].append({
-                            'team': eastern_teams[i],
-                            'wins': int(cells[0].text.strip()),
-                            'losses': int(cells[1].text.strip()),
-                            'win_pct': win_pct,
-                            'conference': 'Eastern'
-                        })
-                        
-            if len(tables) >= 4:
-                for i, row in enumerate(tables[3].find_all('tr')[1:]):  # Skip header
-                    cells = row.find_all('td')
-                    if len(cells) >= 3 and i < len(western_teams):
-                        try:
-                            win_pct = float(cells[2].text.strip().replace('.', '0.'))
-                        except ValueError:
-                            win_pct = 0.0
-                            
-                        standings['Western'].append({
-                            'team': western_teams[i],
-                            'wins': int(cells[0].text.strip()),
-                            'losses': int(cells[1].text.strip()),
-                            'win_pct': win_pct,
-                            'conference': 'Western'
-                        })
-            
+            standings = self._fetch_cached('standings', url, url, self._parse_standings)
             return {"success": True, "data": standings}
             
         except Exception as e:
-            print(f"\nError details: {str(e)}")
+            print(f"\nError details: {str(e)}", file=sys.stderr)
             return {"success": False, "error": str(e)}
 
+    def _parse_standings(self, content: bytes) -> Dict:
+        """Parse the standings page into per-conference team records"""
+        # Only the first four tables matter: team names and stats per conference
+        tables = [[], [], [], []]
+        for table_index, _, cells in self.parser.iter_rows(content):
+            if table_index >= len(tables):
+                break
+            tables[table_index].append(cells)
+        
+        standings = {'Eastern': [], 'Western': []}
+        
+        # Process team names from the first and third tables
+        eastern_teams = []
+        western_teams = []
+        
+        for cells in tables[0][1:]:  # Skip header
+            if cells:
+                eastern_teams.append(self.clean_team_name(cells[0]))
+                    
+        for cells in tables[2][1:]:  # Skip header
+            if cells:
+                western_teams.append(self.clean_team_name(cells[0]))
+        
+        # Process stats from the second and fourth tables
+        for i, cells in enumerate(tables[1][1:]):  # Skip header
+            if len(cells) >= 3 and i < len(eastern_teams):
+                try:
+                    win_pct = float(cells[2].replace('.', '0.'))
+                except ValueError:
+                    win_pct = 0.0
+                    
+                standings['Eastern'].append({
+                    'team': eastern_teams[i],
+                    'wins': int(cells[0]),
+                    'losses': int(cells[1]),
+                    'win_pct': win_pct,
+                    'conference': 'Eastern'
+                })
+                    
+        for i, cells in enumerate(tables[3][1:]):  # Skip header
+            if len(cells) >= 3 and i < len(western_teams):
+                try:
+                    win_pct = float(cells[2].replace('.', '0.'))
+                except ValueError:
+                    win_pct = 0.0
+                    
+                standings['Western'].append({
+                    'team': western_teams[i],
+                    'wins': int(cells[0]),
+                    'losses': int(cells[1]),
+                    'win_pct': win_pct,
+                    'conference': 'Western'
+                })
+        
+        return standings
+
     def get_player_id(self, player_name: str) -> Dict:
-        """Get player's ESPN ID"""
-        search_url = "https://site.web.api.espn.com/apis/common/v3/search"
+        """
+        Get player's ESPN ID, using the local player index before searching ESPN.
+
+        Only an exact (normalized) index hit skips the search. A fuzzy index
+        match is a last resort when the search fails, so a similar name such
+        as "Jaden" for "Jalen" never resolves to the wrong player.
+        """
+        entry = self.player_index.lookup(player_name, fuzzy=False)
+        if entry:
+            self.metrics.incr('player_index_lookups', result='hit')
+            return {"success": True, "id": entry["id"]}
+        self.metrics.incr('player_index_lookups', result='miss')
+
+        result = self.search_player_id(player_name)
+        if result["success"]:
+            # Write the resolution back so the next lookup skips the search
+            if self._remember_search(player_name, result):
+                self.player_index.save()
+            return result
+
+        entry = self.player_index.lookup(player_name)
+        if entry:
+            self.metrics.incr('player_index_lookups', result='fuzzy')
+            return {"success": True, "id": entry["id"]}
+        return result
+
+    def _remember_search(self, player_name: str, result: Dict) -> bool:
+        """
+        Add a search resolution to the player index.
+
+        The query name is only stored when the search matched it exactly; a
+        fallback to the first result is stored under that player's own name.
+
+        :return: True if the index changed.
+        """
+        if result.get("exact"):
+            return self.player_index.add(player_name, result["id"], result["name"])
+        if result.get("name"):
+            return self.player_index.add(result["name"], result["id"], result["name"])
+        return False
+
+    def search_player_id(self, player_name: str) -> Dict:
+        """Look up a player's ESPN ID through the ESPN search API"""
+        search_url = self.SEARCH_URL
         params = {
             "query": player_name,
             "limit": 5,
@@ -151,25 +386,49 @@ class NBAPropsAnalyzer:
         
         try:
             #print(f"\nSearching for {player_name}...")
-            response = requests.get(search_url, params=params)
+            with self.metrics.stage('search'):
+                response = self._http_get(search_url, params=params)
+            self.metrics.incr('bytes_fetched', len(response.content), resource='search')
             data = response.json()
             #print(f"Debug - Search response: {data}")  # Print response data
             
             if 'items' in data and len(data['items']) > 0:
+                wanted = PlayerIndex.normalize(player_name)
                 for item in data['items']:
-                    if item['displayName'].lower() == player_name.lower():
+                    if PlayerIndex.normalize(item['displayName']) == wanted:
                         player_id = item['id']
                         #print(f"Debug - Found player ID: {player_id}")
-                        return {"success": True, "id": player_id}
+                        return {"success": True, "id": player_id, "name": item['displayName'], "exact": True}
                 player_id = data['items'][0]['id']
                 #print(f"Debug - Using first result ID: {player_id}")
-                return {"success": True, "id": player_id}
+                return {"success": True, "id": player_id, "name": data['items'][0].get('displayName'), "exact": False}
             return {"success": False, "error": "Player not found"}
             
         except Exception as e:
             return {"success": False, "error": str(e)}
 
-    def clean_opponent_name(self, opponent: str) -> str:
+    def build_player_index(self, player_names: Optional[List[str]] = None, roster: Optional[List[Dict]] = None) -> Dict:
+        """
+        Populate the player index from a roster dump and/or the search endpoint.
+
+        :param player_names: Names to resolve through ESPN search if not already indexed.
+        :param roster: Roster records with "id" and "displayName" (or "name").
+        :return: Number of index entries added or changed.
+        """
+        changed = self.player_index.update(roster or [])
+
+        for player_name in player_names or []:
+            if self.player_index.lookup(player_name, fuzzy=False):
+                continue
+            result = self.search_player_id(player_name)
+            if result["success"] and self._remember_search(player_name, result):
+                changed += 1
+
+        self.player_index.save()
+        return {"success": True, "data": {"changed": changed, "players": len(self.player_index)}}
+
+    @staticmethod
+    def clean_opponent_name(opponent: str) -> str:
         """Clean opponent name from game log"""
         #print(f"\nDebug - Cleaning opponent name: {opponent}")
         
@@ -221,10 +480,12 @@ class NBAPropsAnalyzer:
         NBA season spans two years and officially starts in October.
         Returns the earlier year (e.g., 2024 for the 2024-25 season)
         """
-        current_date = datetime.now()
-        if current_date.month >= 10:  # New season starts in October
-            return f"{current_date.year}-{current_date.year + 1}"
-        return f"{current_date.year - 1}-{current_date.year}"
+        start_year = season_start_year()  # New season starts in October
+        return f"{start_year}-{start_year + 1}"
+
+    def current_season_year(self) -> int:
+        """ESPN's year for the current season, i.e. the year it ends in"""
+        return season_end_year()
 
     def get_player_games(self, player_name: str) -> Dict:
         """Get player's game logs."""
@@ -232,277 +493,267 @@ class NBAPropsAnalyzer:
         if not player_id_result["success"]:
             return player_id_result
 
-        player_id = player_id_result["id"]
-        url = f"https://www.espn.com/nba/player/gamelog/_/id/{player_id}"
+        player_id = str(player_id_result["id"])
 
         try:
-            #print(f"Fetching game logs from: {url}")
-            response = requests.get(url, headers=self.headers)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            game_tables = soup.find_all('table', class_='Table')
-            #print(f"Found {len(game_tables)} tables")
+            #print(f"Fetching game logs from: {self.GAMELOG_URL.format(player_id=player_id)}")
+            all_games, response = self._fetch_game_log_page(player_id)
+            if response is not None:
+                with self.metrics.stage('parse', resource='gamelog'):
+                    all_games = self._parse_game_log(response.content)
 
-            all_games = []
-            exclude_after_marker = False  # Flag to stop processing after the marker row
+            # Debug output for parsed games
+            #print(f"Total regular season games found: {len(all_games)}")
+            return self._finish_game_log(player_id, all_games, response)
 
-            for table in game_tables:
-                rows = table.find_all('tr')
+        except Exception as e:
+            print(f"Error in get_player_games: {e}", file=sys.stderr)
+            return {"success": False, "error": str(e)}
 
-                for row in rows:
-                    row_text = row.get_text(strip=True)
+    def _fetch_game_log_page(self, player_id: str):
+        """
+        First half of every current-season game-log fetch: cache lookup, then the page.
 
-                    # Check for the marker row and set the flag to stop processing
-                    if row_text.startswith("Regular Season StatsMINFGFG%3PT3P%FTFT%REBASTBLKSTLPFTOPTS"):
-                        exclude_after_marker = True
-                        #print(f"Found marker row: {row_text}. Excluding subsequent rows.")
-                        break
+        :return: (cached games, None) or (None, response) for a page that still
+                 needs parsing. Failed pages raise instead of parsing as an empty log.
+        """
+        url = self.GAMELOG_URL.format(player_id=player_id)
+        data, response = self._conditional_get('gamelog', player_id, url)
+        if response is not None:
+            response.raise_for_status()
+        return data, response
 
-                    # Skip rows after the marker
-                    if exclude_after_marker:
-                        continue
-
-                    # Parse valid game rows
-                    cells = row.find_all('td')
-                    if len(cells) < 2:  # Ensure valid row structure
-                        #print(f"Skipping invalid or summary row: {row_text}")
-                        continue
-
-                    # Extract and validate date
-                    date_text = cells[0].text.strip()
-                    if not re.match(r'\w{3} \d{1,2}/\d{1,2}', date_text):
-                        #print(f"Invalid date format, skipping: {date_text}")
-                        continue
-
-                    # Process regular-season game data
-                    try:
-
-                        opponent = self.clean_opponent_name(cells[1].text.strip())
-
-                        def safe_parse(value):
-                            """Parses stats safely, handling ranges like '2-2' or empty cells."""
-                            try:
-                                #print(f"Parsing value: {value}")  # Debug log
-
-                                if '-' in value:
-                                    parts = value.split('-')
-                                    # Use the first value instead of averaging
-                                    return float(parts[0])  # Take the first part only
-                                return float(value)
-                            except ValueError:
-                                print(f"Failed to parse value: {value}")  # Debug log for failures
-                                return 0.0
-                            
-                        points = safe_parse(cells[16].text.strip()) if len(cells) > 16 else 0.0
-                        rebounds = safe_parse(cells[10].text.strip()) if len(cells) > 10 else 0.0
-                        assists = safe_parse(cells[11].text.strip()) if len(cells) > 11 else 0.0
-                        threes = safe_parse(cells[6].text.strip()) if len(cells) > 6 else 0.0
-                        #print(f"Parsed threes for {date_text} vs {opponent}: {threes}")  # Debug log
-                        pra = points + rebounds + assists
-
-                        game_data = {
-                            'date': date_text,
-                            'opponent': opponent,
-                            'points': points,
-                            'rebounds': rebounds,
-                            'assists': assists,
-                            'threes': threes,
-                            'pra': pra
-                        }
-                        all_games.append(game_data)
-                        #print(f"Regular season game added: {game_data}")
-
-                    except Exception as e:
-                        print(f"Error processing row: {e}")
-                        continue
+    def _finish_game_log(self, player_id: str, all_games: List[Dict],
+                         response: Optional[requests.Response] = None) -> Dict:
+        """
+        Second half, after parsing (in process or on the parse pool): cache a
+        freshly parsed page and upsert the games into the warehouse.
+        """
+        if response is not None:
+            self._store('gamelog', player_id, all_games, response)
+        if self.warehouse:
+            self.warehouse.upsert_games(player_id, self.current_season_year(), all_games)
+        return {"success": True, "data": all_games}
 
-            # Debug output for parsed games
-            #print(f"Total regular season games found: {len(all_games)}")
-            return {"success": True, "data": all_games}
+    def fetch_season_games(self, player_id: str, season: int) -> List[Dict]:
+        """Fetch and parse one past season's game log, tagging each game with its season"""
+        url = self.GAMELOG_SEASON_URL.format(player_id=player_id, season=season)
+        with self.metrics.stage('fetch', resource='season'):
+            response = self._http_get(url, headers=self.headers)
+        self.metrics.incr('bytes_fetched', len(response.content), resource='season')
+        if response.status_code != 200:
+            raise ValueError(f"Season {season} game log returned HTTP {response.status_code}")
 
-        except Exception as e:
-            print(f"Error in get_player_games: {e}")
-            return {"success": False, "error": str(e)}
+        with self.metrics.stage('parse', resource='season'):
+            games = self._parse_game_log(response.content, season)
+        return [{**game, 'season': season} for game in games]
 
-    def is_regular_season_game(self, date_text: str) -> bool:
-        """Check if a game date is in the regular season."""
-        try:
-            # Dynamically determine the current NBA season's start date
-            now = datetime.now()
-            if now.month >= 10:  # NBA season starts in October
-                season_start_year = now.year
-            else:  # Before October, we are in the previous season
-                season_start_year = now.year - 1
-
-            # Regular season start date: October 22
-            season_start_date = datetime(season_start_year, 10, 22)
-
-            # Parse the game date (e.g., "Sat 12/28")
-            date_parts = date_text.split()
-            month_map = {
-                'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
-                'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
-            }
+    async def backfill_seasons_async(self, player_name: str, seasons: List[int]) -> Dict:
+        """
+        Fetch a player's completed seasons into the season store, in parallel.
 
-            if len(date_parts) >= 3:
-                month = month_map.get(date_parts[1].lower(), 0)
-                day = int(date_parts[2])
+        Seasons already stored are skipped and the current season is never
+        stored, since it is still changing.
 
-                # Determine game year
-                if month < 7:  # Jan-Jun belong to the next calendar year
-                    game_year = season_start_year + 1
-                else:  # Jul-Dec belong to the current calendar year
-                    game_year = season_start_year
+        :param seasons: ESPN season years (the year each season ends in).
+        :return: The player id plus which seasons were fetched and which were already stored.
+        """
+        if not self.season_store:
+            return {"success": False, "error": "Backfill needs a history_dir for the season store"}
 
-                game_date = datetime(game_year, month, day)
+        player_id_result = await self._run_io(self.get_player_id, player_name)
+        if not player_id_result["success"]:
+            return player_id_result
+        player_id = str(player_id_result["id"])
+
+        current = self.current_season_year()
+        wanted = sorted({int(season) for season in seasons if int(season) < current})
+        missing = [season for season in wanted if not self.season_store.has(player_id, season)]
 
-                # Exclude games before the regular season start date
-                return game_date >= season_start_date
+        try:
+            fetched = await asyncio.gather(*(
+                self._run_io(self.fetch_season_games, player_id, season) for season in missing
+            ))
         except Exception as e:
-            print(f"Error parsing date: {e}")
-            return False
+            print(f"Error in backfill_seasons: {e}", file=sys.stderr)
+            return {"success": False, "error": str(e)}
+
+        for season, games in zip(missing, fetched):
+            self.season_store.put(player_id, season, games)
+            if self.warehouse:
+                self.warehouse.upsert_games(player_id, season, games)
 
-    def analyze_vs_team(self, games: List[Dict], team: str, prop_type: str, prop_value: float, is_over: bool) -> Dict:
-        """Analyze player's performance against specific team"""
-        relevant_games = []
-        
-        # Debug print
-        #print(f"\nDebug - Looking for games against {team}")
-        for game in games:
-            #print(f"Debug - Checking game: Opponent = {game['opponent']}, Points = {game['points']}")
-            if game['opponent'] == team:
-                #print(f"Debug - Found matching game!")
-                relevant_games.append(game)
-        
-        if not relevant_games:
-            return {
-                "success": True,
-                "data": {
-                    "games_played": 0,
-                    "average": 0,
-                    "hit_rate": 0,
-                    "hit_count": 0,
-                    "performances": []
-                }
-            }
-        
-        # Calculate stats
-        total_value = 0
-        hits = 0
-        performances = []
-        
-        for game in relevant_games:
-            stat_key = prop_type.lower()
-            stat_value = game.get(stat_key, 0)
-            total_value += stat_value
-            
-            # Check if prop hit
-            if is_over:
-                hit = stat_value > prop_value
-            else:
-                hit = stat_value < prop_value
-                
-            if hit:
-                hits += 1
-                
-            performances.append({
-                'date': game['date'],
-                'value': stat_value,
-                'hit': hit
-            })
-        
         return {
             "success": True,
             "data": {
-                "games_played": len(relevant_games),
-                "average": total_value / len(relevant_games),
-                "hit_rate": (hits / len(relevant_games)) * 100,
-                "hit_count": hits,
-                "performances": performances
+                "player_id": player_id,
+                "fetched": missing,
+                "stored": [season for season in wanted if season not in missing]
             }
         }
 
-    def analyze_performance(self, games: List[Dict], team: str, prop_type: str, prop_value: float, is_over: bool) -> Dict:
+    def backfill_seasons(self, player_name: str, seasons: List[int]) -> Dict:
+        """Synchronous wrapper around backfill_seasons_async"""
+        return self._run_sync(self.backfill_seasons_async(player_name, seasons))
+
+    async def get_player_history_async(self, player_name: str, seasons: int = 1) -> Dict:
+        """
+        Game logs over the last `seasons` seasons, newest season first.
+
+        The current season comes from get_player_games (and the disk cache);
+        past seasons come from the season store, which is backfilled first if
+        any are missing. With seasons=1 this is exactly get_player_games.
+        Multi-season records carry a 'season' field.
+        """
+        if seasons <= 1:
+            return await self.get_player_games_async(player_name)
+
+        current = self.current_season_year()
+        past = list(range(current - 1, current - seasons, -1))
+
+        if self.season_store:
+            current_result, backfill_result = await asyncio.gather(
+                self.get_player_games_async(player_name),
+                self.backfill_seasons_async(player_name, past)
+            )
+            if not backfill_result["success"]:
+                return backfill_result
+            player_id = backfill_result["data"]["player_id"]
+            past_games = [self.season_store.get(player_id, season) or [] for season in past]
+        else:
+            # No store: fetch every past season on each call
+            current_result = await self.get_player_games_async(player_name)
+            if not current_result["success"]:
+                return current_result
+            player_id = str((await self._run_io(self.get_player_id, player_name))["id"])
+            try:
+                past_games = await asyncio.gather(*(
+                    self._run_io(self.fetch_season_games, player_id, season) for season in past
+                ))
+            except Exception as e:
+                return {"success": False, "error": str(e)}
+
+        if not current_result["success"]:
+            return current_result
+
+        games = [{**game, 'season': current} for game in current_result["data"]]
+        for season_games in past_games:
+            games.extend(season_games)
+        return {"success": True, "data": games}
+
+    def get_player_history(self, player_name: str, seasons: int = 1) -> Dict:
+        """Synchronous wrapper around get_player_history_async"""
+        return self._run_sync(self.get_player_history_async(player_name, seasons))
+
+    def refresh_players(self, player_names: List[str]) -> Dict:
+        """
+        Fetch many players' game logs, parsing raw pages on a process pool.
+
+        Pages are downloaded concurrently on the I/O pool and handed to worker
+        processes in chunks of parse_chunksize as they arrive, so downloads
+        overlap parsing and parsing scales with cores instead of one GIL.
+        Falls back to in-process parsing when parse_workers is 0.
+
+        :return: Game log results keyed by player name.
+        """
+        unique_names = list(dict.fromkeys(player_names))
+        if not self.parse_workers:
+            return {"success": True, "data": {name: self.get_player_games(name) for name in unique_names}}
+
+        if self._parse_pool is None:
+            self._parse_pool = ProcessPoolExecutor(
+                max_workers=self.parse_workers,
+                initializer=_init_parse_worker,
+                initargs=(self._gamelog_parser_name,)
+            )
+
+        def download(player_name):
+            player_id_result = self.get_player_id(player_name)
+            if not player_id_result["success"]:
+                return player_name, None, player_id_result, None
+            player_id = str(player_id_result["id"])
+            try:
+                data, response = self._fetch_game_log_page(player_id)
+                if response is None:
+                    return player_name, player_id, self._finish_game_log(player_id, data), None
+            except Exception as e:
+                return player_name, player_id, {"success": False, "error": str(e)}, None
+            return player_name, player_id, None, response
+
+        results = {}
+        parse_jobs = []
+        chunk = []
+
+        season = self.current_season_year()
+
+        def submit(chunk):
+            future = self._parse_pool.submit(
+                _parse_game_logs_chunk, [response.content for _, _, response in chunk], season
+            )
+            parse_jobs.append((future, chunk))
+
+        downloads = [self._executor.submit(download, name) for name in unique_names]
+        for future in as_completed(downloads):
+            player_name, player_id, result, response = future.result()
+            if response is None:
+                results[player_name] = result
+                continue
+            chunk.append((player_name, player_id, response))
+            if len(chunk) >= self.parse_chunksize:
+                submit(chunk)
+                chunk = []
+        if chunk:
+            submit(chunk)
+
+        for future, chunk in parse_jobs:
+            try:
+                parsed_pages = future.result()
+            except Exception as e:
+                for player_name, _, _ in chunk:
+                    results[player_name] = {"success": False, "error": str(e)}
+                continue
+            for (player_name, player_id, response), (all_games, seconds) in zip(chunk, parsed_pages):
+                self.metrics.observe('parse', seconds, resource='gamelog')
+                try:
+                    results[player_name] = self._finish_game_log(player_id, all_games, response)
+                except Exception as e:
+                    results[player_name] = {"success": False, "error": str(e)}
+
+        return {"success": True, "data": {name: results[name] for name in unique_names}}
+
+    def _parse_game_log(self, content: bytes, season: Optional[int] = None) -> List[Dict]:
+        """Parse a game log page with this analyzer's backend (see parse_game_log)"""
+        return parse_game_log(content, self.gamelog_parser, season or self.current_season_year())
+
+    def is_regular_season_game(self, date_text: str, season: Optional[int] = None) -> bool:
+        """Check if a game date is in the regular season."""
+        # Same season-year inference the parser uses
+        season = season or self.current_season_year()
+        game_day = parse_game_date(date_text, season)
+        if game_day is None:
+            print(f"Error parsing date: {date_text}", file=sys.stderr)
+            return False
+
+        # Exclude games before the regular season start date
+        return game_day >= regular_season_start(season)
+
+    def analyze_vs_team(self, games: Union[List[Dict], GameLog], team: str, prop_type: str, prop_value: float,
+                        is_over: bool) -> Dict:
         """Analyze player's performance against specific team"""
-        relevant_games = []
-        
-        # Map property types to game log keys
-        stat_map = {
-            'points': 'points',
-            'rebounds': 'rebounds',
-            'assists': 'assists',
-            'steals': 'steals',
-            'blocks': 'blocks',
-            'threes': 'threes',
-            'pra': 'pra'
-        }
-        
-        stat_key = stat_map.get(prop_type.lower())
+        games = GameLog.coerce(games)
+        aggregates = games.aggregate(prop_type.lower(), prop_value, is_over, missing_as_zero=True)
+        return {"success": True, "data": aggregates.team_summary(team)}
+
+    def analyze_performance(self, games: Union[List[Dict], GameLog], team: str, prop_type: str, prop_value: float,
+                            is_over: bool) -> Dict:
+        """Analyze player's performance against specific team"""
+        stat_key = self.PROP_STATS.get(prop_type.lower())
         if not stat_key:
             return {"success": False, "error": f"Invalid prop type: {prop_type}"}
         
-        # Debug print
-        #print(f"\nDebug - Looking for games against {team}")
-        for game in games:
-            if stat_key == 'pra':
-                game_stat = game['points'] + game['rebounds'] + game['assists']  # Calculate PRA directly
-                #print(f"Debug - Checking game: Opponent = {game['opponent']}, PRA = {game_stat} " +
-                      #f"(P:{game['points']} R:{game['rebounds']} A:{game['assists']})")
-            else:
-                game_stat = game[stat_key]
-                #print(f"Debug - Checking game: Opponent = {game['opponent']}, {stat_key.title()} = {game_stat}")
-            
-            if game['opponent'] == team:
-                #print(f"Debug - Found matching game!")
-                game_with_stat = game.copy()
-                game_with_stat['stat_value'] = game_stat
-                relevant_games.append(game_with_stat)
-        
-        if not relevant_games:
-            return {
-                "success": True,
-                "data": {
-                    "games_played": 0,
-                    "average": 0,
-                    "hit_rate": 0,
-                    "hit_count": 0,
-                    "performances": []
-                }
-            }
-        
-        # Calculate stats
-        total_value = 0
-        hits = 0
-        performances = []
-        
-        for game in relevant_games:
-            stat_value = game['stat_value']  # Use calculated stat
-            total_value += stat_value
-            
-            # Check if prop hit
-            if is_over:
-                hit = stat_value > prop_value
-            else:
-                hit = stat_value < prop_value
-                
-            if hit:
-                hits += 1
-                
-            performances.append({
-                'date': game['date'],
-                'value': stat_value,
-                'hit': hit
-            })
-        
-        return {
-            "success": True,
-            "data": {
-                "games_played": len(relevant_games),
-                "average": total_value / len(relevant_games),
-                "hit_rate": (hits / len(relevant_games)) * 100,
-                "hit_count": hits,
-                "performances": performances
-            }
-        }
+        games = GameLog.coerce(games)
+        aggregates = games.aggregate(stat_key, prop_value, is_over)
+        return {"success": True, "data": aggregates.team_summary(team)}
     
     def get_surrounding_teams(self, team_name: str, standings: Dict, positions: int = 2) -> Dict:
         """Get teams above and below the given team in standings"""
@@ -543,12 +794,22 @@ class NBAPropsAnalyzer:
             return {"success": True, "data": teams}
             
         except Exception as e:
-            print(f"Error in get_surrounding_teams: {str(e)}")
+            print(f"Error in get_surrounding_teams: {str(e)}", file=sys.stderr)
             return {"success": False, "error": str(e)}
 
-    def analyze_surrounding_teams(self, games: List[Dict], opponent: str, standings: Dict,
+    def analyze_surrounding_teams(self, games: Union[List[Dict], GameLog], opponent: str, standings: Dict,
                                 prop_type: str, prop_value: float, is_over: bool, positions: int = 2) -> Dict:
         """Analyze performance against teams surrounding the opponent in standings"""
+        stat_key = self.PROP_STATS.get(prop_type.lower())
+        if not stat_key:
+            return {"success": False, "error": f"Invalid prop type: {prop_type}"}
+
+        aggregates = GameLog.coerce(games).aggregate(stat_key, prop_value, is_over)
+        return self._surrounding_from_aggregates(aggregates, opponent, standings, positions)
+
+    def _surrounding_from_aggregates(self, aggregates: OpponentAggregates, opponent: str, standings: Dict,
+                                     positions: int = 2) -> Dict:
+        """Surrounding-teams block read from precomputed per-opponent aggregates"""
         # Get surrounding teams
         surr_teams = self.get_surrounding_teams(opponent, standings, positions)
         if not surr_teams["success"]:
@@ -560,26 +821,20 @@ class NBAPropsAnalyzer:
         }
         
         # Process teams above
-        if "above" in surr_teams["data"]:
-            for pos, team in enumerate(surr_teams["data"]["above"], 1):
-                analysis = self.analyze_performance(games, team['team'], prop_type, prop_value, is_over)
-                if analysis["success"]:
-                    results["above"].append({
-                        "team": team['team'],
-                        "position_diff": -pos,  # Negative for above
-                        "analysis": analysis["data"]
-                    })
+        for pos, team in enumerate(surr_teams["data"]["above"], 1):
+            results["above"].append({
+                "team": team['team'],
+                "position_diff": -pos,  # Negative for above
+                "analysis": aggregates.team_summary(team['team'])
+            })
         
         # Process teams below
-        if "below" in surr_teams["data"]:
-            for pos, team in enumerate(surr_teams["data"]["below"], 1):
-                analysis = self.analyze_performance(games, team['team'], prop_type, prop_value, is_over)
-                if analysis["success"]:
-                    results["below"].append({
-                        "team": team['team'],
-                        "position_diff": pos,  # Positive for below
-                        "analysis": analysis["data"]
-                    })
+        for pos, team in enumerate(surr_teams["data"]["below"], 1):
+            results["below"].append({
+                "team": team['team'],
+                "position_diff": pos,  # Positive for below
+                "analysis": aggregates.team_summary(team['team'])
+            })
         
         return {"success": True, "data": results}
 
@@ -617,12 +872,22 @@ class NBAPropsAnalyzer:
             }
             
         except Exception as e:
-            print(f"Error in find_win_pct_match: {str(e)}")
+            print(f"Error in find_win_pct_match: {str(e)}", file=sys.stderr)
             return {"success": False, "error": str(e)}
 
-    def analyze_cross_conference(self, games: List[Dict], opponent: str, standings: Dict,
+    def analyze_cross_conference(self, games: Union[List[Dict], GameLog], opponent: str, standings: Dict,
                                 prop_type: str, prop_value: float, is_over: bool) -> Dict:
         """Analyze performance against similar win percentage team in opposite conference"""
+        stat_key = self.PROP_STATS.get(prop_type.lower())
+        if not stat_key:
+            return {"success": False, "error": f"Invalid prop type: {prop_type}"}
+
+        aggregates = GameLog.coerce(games).aggregate(stat_key, prop_value, is_over)
+        return self._cross_conference_from_aggregates(aggregates, opponent, standings)
+
+    def _cross_conference_from_aggregates(self, aggregates: OpponentAggregates, opponent: str,
+                                          standings: Dict) -> Dict:
+        """Cross-conference block read from precomputed per-opponent aggregates"""
         # Find matching team in opposite conference
         match_result = self.find_win_pct_match(opponent, standings)
         if not match_result["success"]:
@@ -630,70 +895,33 @@ class NBAPropsAnalyzer:
             
         matched_team = match_result["data"]
         
-        # Analyze performance against matched team
-        direct_analysis = self.analyze_performance(games, matched_team['team'], prop_type, prop_value, is_over)
-        
-        # Analyze surrounding teams
-        surr_analysis = self.analyze_surrounding_teams(
-            games, matched_team['team'], standings, prop_type, prop_value, is_over
-        )
+        # Analyze surrounding teams of the matched team
+        surr_analysis = self._surrounding_from_aggregates(aggregates, matched_team['team'], standings)
         
         return {
             "success": True,
             "data": {
                 "matched_team": matched_team['team'],
                 "win_pct": matched_team['win_pct'],
-                "direct_analysis": direct_analysis["data"],
+                "direct_analysis": aggregates.team_summary(matched_team['team']),
                 "surrounding_teams": surr_analysis["data"] if surr_analysis["success"] else None
             }
         }
 
-    def calculate_overall_stats(self, games: List[Dict], prop_type: str, prop_value: float, is_over: bool) -> Dict:
-        """Calculate overall season stats"""
-        total_games = 0
-        total_value = 0
-        hits = 0
-        
-        stat_map = {
-            'points': 'points',
-            'rebounds': 'rebounds',
-            'assists': 'assists',
-            'steals': 'steals',
-            'blocks': 'blocks',
-            'threes': 'threes',
-            'pra': 'pra'  # Add PRA to stat map
-        }
-        
-        stat_key = stat_map.get(prop_type.lower())
+    def calculate_overall_stats(self, games: Union[List[Dict], GameLog], prop_type: str, prop_value: float, is_over: bool,
+                                recency: bool = False) -> Dict:
+        """Calculate overall season stats, optionally with last-5/10/20 and decayed numbers"""
+        stat_key = self.PROP_STATS.get(prop_type.lower())
         if not stat_key:
             return {"success": False, "error": "Invalid prop type"}
             
         # Calculate season stats
-        for game in games:
-            if stat_key == 'pra':
-                stat_value = game['points'] + game['rebounds'] + game['assists']
-            else:
-                stat_value = game.get(stat_key, 0)
-                
-            total_value += stat_value
-            total_games += 1
-            
-            if is_over:
-                if stat_value > prop_value:
-                    hits += 1
-            else:
-                if stat_value < prop_value:
-                    hits += 1
-        
-        return {
-            "success": True,
-            "data": {
-                "games_played": total_games,
-                "season_average": total_value / total_games if total_games > 0 else 0,
-                "season_hit_rate": (hits / total_games * 100) if total_games > 0 else 0,
-                "season_hits": hits
-            }
-        }
+        games = GameLog.coerce(games)
+        aggregates = games.aggregate(stat_key, prop_value, is_over, missing_as_zero=True)
+        overall_stats = aggregates.season_summary()
+        if recency:
+            overall_stats["recency"] = games.recency.summary(stat_key, prop_value, is_over)
+        return {"success": True, "data": overall_stats}
 
     def calculate_final_probability(self, 
                                     direct_matchups: Dict, 
@@ -763,81 +991,638 @@ class NBAPropsAnalyzer:
             }
         }
 
-    def perform_full_analysis(self, player_name: str, prop_type: str, prop_value: float,
-                          opponent: str, is_over: bool, season: str = None) -> Dict:
-        """Perform complete analysis using all components"""
+    def analyze_with_data(self, games: Union[List[Dict], GameLog], standings: Union[Dict, Callable[[], Dict]],
+                          prop_type: str, prop_value: float, opponent: str, is_over: bool, interval_draws: int = 0,
+                          interval_level: float = 0.9, seed: Optional[int] = None, recency: bool = False,
+                          date_filter: Optional[str] = None, components: Optional[Iterable[str]] = None) -> Dict:
+        """
+        Run every analysis component over already-fetched game logs and standings.
+
+        With interval_draws > 0 the final_probability block also gets a
+        credible_interval from that many posterior draws (see
+        posterior.final_probability_interval). recency adds last-5/10/20
+        and exponentially decayed numbers to overall_stats. date_filter limits
+        the games to 'regular_season', 'since_all_star' or 'last_<N>_days'.
+
+        With components, only those are computed now and the data is a
+        LazyAnalysis that computes the rest on access; standings may then be a
+        function returning a scrape_standings result, called only if a
+        standings-based component is needed.
+        """
+        try:
+            stat_key = self.PROP_STATS.get(prop_type.lower())
+            if not stat_key:
+                return {"success": False, "error": f"Invalid prop type: {prop_type}"}
+
+            stage = self.metrics.stage
+
+            # One pass over the games gives every component its sums, counts and hits
+            with stage('analysis', component='aggregate'):
+                game_log = GameLog.coerce(games)
+                if date_filter:
+                    game_log = game_log.subset(game_log.date_filter(date_filter))
+                aggregates = game_log.aggregate(stat_key, prop_value, is_over)
+
+            if components is not None:
+                recency_summary = (lambda: game_log.recency.summary(stat_key, prop_value, is_over)) if recency else None
+                return self._lazy_analysis(aggregates, standings, opponent, components, interval_draws,
+                                           interval_level, seed, recency_summary)
+
+            result = self._analyze_aggregates(aggregates, standings, opponent, interval_draws, interval_level, seed)
+            if recency and result["success"]:
+                with stage('analysis', component='recency'):
+                    result["data"]["overall_stats"]["recency"] = game_log.recency.summary(stat_key, prop_value, is_over)
+            return result
+
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    def _analyze_aggregates(self, aggregates: Union[OpponentAggregates, SQLAggregates], standings: Dict,
+                            opponent: str, interval_draws: int = 0, interval_level: float = 0.9,
+                            seed: Optional[int] = None) -> Dict:
+        """Every analysis component read from per-opponent aggregates (in memory or SQL)"""
+        try:
+            stage = self.metrics.stage
+
+            with stage('analysis', component='overall_stats'):
+                overall_stats = aggregates.season_summary()
+            with stage('analysis', component='direct_matchup'):
+                direct_analysis = aggregates.team_summary(opponent)
+
+            with stage('analysis', component='surrounding_teams'):
+                surr_analysis = self._surrounding_from_aggregates(aggregates, opponent, standings)
+            if not surr_analysis["success"]:
+                return surr_analysis
+
+            with stage('analysis', component='cross_conference'):
+                cross_conf_analysis = self._cross_conference_from_aggregates(aggregates, opponent, standings)
+            if not cross_conf_analysis["success"]:
+                return cross_conf_analysis
+            
+            # Calculate final probability
+            with stage('analysis', component='final_probability'):
+                final_prob_result = self.calculate_final_probability(
+                    direct_analysis,
+                    surr_analysis["data"],
+                    cross_conf_analysis["data"],
+                    overall_stats,
+                    direct_analysis["games_played"]
+                )
+
+            if interval_draws:
+                with stage('analysis', component='credible_interval'):
+                    final_prob_result["data"]["credible_interval"] = final_probability_interval(
+                        direct_analysis, overall_stats, final_prob_result["data"], interval_draws, interval_level,
+                        seed
+                    )
+
+            return {
+                "success": True,
+                "data": {
+                    "overall_stats": overall_stats,
+                    "direct_matchup": direct_analysis,
+                    "surrounding_teams": surr_analysis["data"],
+                    "cross_conference": cross_conf_analysis["data"],
+                    "final_probability": final_prob_result["data"]  # Ensure this is included
+                }
+            }
+            
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    def _lazy_analysis(self, aggregates: Union[OpponentAggregates, SQLAggregates],
+                       standings: Union[Dict, Callable[[], Dict]], opponent: str, components: Iterable[str],
+                       interval_draws: int = 0, interval_level: float = 0.9, seed: Optional[int] = None,
+                       recency_summary: Optional[Callable[[], Dict]] = None) -> Dict:
+        """
+        The requested components computed now, in a LazyAnalysis that computes the rest on access.
+
+        Standings are only read (and, when given as a function, fetched) by
+        the surrounding_teams, cross_conference and final_probability
+        components, so asking for overall_stats and direct_matchup costs no
+        standings request at all.
+        """
         try:
-            # Get standings
+            components = check_components(components)
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+        stage = self.metrics.stage
+
+        def get_standings(analysis):
+            if callable(standings):
+                return standings()
+            return {"success": True, "data": standings}
+
+        def overall_stats(analysis):
+            with stage('analysis', component='overall_stats'):
+                data = aggregates.season_summary()
+            if recency_summary:
+                with stage('analysis', component='recency'):
+                    data["recency"] = recency_summary()
+            return {"success": True, "data": data}
+
+        def direct_matchup(analysis):
+            with stage('analysis', component='direct_matchup'):
+                return {"success": True, "data": aggregates.team_summary(opponent)}
+
+        def surrounding_teams(analysis):
+            standings_data = analysis.resolve('standings')
+            with stage('analysis', component='surrounding_teams'):
+                return self._surrounding_from_aggregates(aggregates, opponent, standings_data)
+
+        def cross_conference(analysis):
+            standings_data = analysis.resolve('standings')
+            with stage('analysis', component='cross_conference'):
+                return self._cross_conference_from_aggregates(aggregates, opponent, standings_data)
+
+        def final_probability(analysis):
+            direct_analysis = analysis.resolve('direct_matchup')
+            overall = analysis.resolve('overall_stats')
+            with stage('analysis', component='final_probability'):
+                final_prob_result = self.calculate_final_probability(
+                    direct_analysis,
+                    analysis.resolve('surrounding_teams'),
+                    analysis.resolve('cross_conference'),
+                    overall,
+                    direct_analysis["games_played"]
+                )
+            if interval_draws:
+                with stage('analysis', component='credible_interval'):
+                    final_prob_result["data"]["credible_interval"] = final_probability_interval(
+                        direct_analysis, overall, final_prob_result["data"], interval_draws, interval_level, seed
+                    )
+            return final_prob_result
+
+        analysis = LazyAnalysis({
+            'standings': get_standings,
+            'overall_stats': overall_stats,
+            'direct_matchup': direct_matchup,
+            'surrounding_teams': surrounding_teams,
+            'cross_conference': cross_conference,
+            'final_probability': final_probability
+        })
+        try:
+            for name in components:
+                analysis.resolve(name)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+        return {"success": True, "data": analysis}
+
+    def analyze_from_snapshot(self, player_name: str, prop_type: str, prop_value: float, opponent: str,
+                              is_over: bool, interval_draws: int = 0, interval_level: float = 0.9,
+                              recency: bool = False, components: Optional[Iterable[str]] = None,
+                              seed: Optional[int] = None) -> Dict:
+        """Full analysis from the warmed snapshot's precomputed per-opponent aggregates"""
+        stat_key = self.PROP_STATS.get(prop_type.lower())
+        if not stat_key:
+            return {"success": False, "error": f"Invalid prop type: {prop_type}"}
+
+        game_log = self.snapshot_game_log(player_name)
+        if game_log is None:
+            return {"success": False, "error": f"{player_name} is not in the snapshot"}
+
+        try:
+            aggregates = self.snapshot.stat_index(player_name, stat_key).at_line(prop_value, is_over)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+        if components is not None:
+            recency_summary = (lambda: game_log.recency.summary(stat_key, prop_value, is_over)) if recency else None
+            return self._lazy_analysis(aggregates, self.snapshot.standings, opponent, components, interval_draws,
+                                       interval_level, seed, recency_summary)
+
+        result = self._analyze_aggregates(aggregates, self.snapshot.standings, opponent, interval_draws,
+                                          interval_level, seed)
+        if recency and result["success"]:
+            result["data"]["overall_stats"]["recency"] = game_log.recency.summary(stat_key, prop_value, is_over)
+        return result
+
+    def analyze_from_warehouse(self, player_name: str, prop_type: str, prop_value: float, opponent: str,
+                               is_over: bool, standings: Optional[Dict] = None,
+                               seasons: Optional[List[int]] = None) -> Dict:
+        """
+        Full analysis answered by aggregate SQL queries against the stat warehouse.
+
+        Only standings may need fetching (pass them in to skip that too); the
+        game rows must already have been ingested by get_player_games or
+        backfill_seasons.
+
+        :param seasons: ESPN season years to include, or None for every stored season.
+        """
+        if not self.warehouse:
+            return {"success": False, "error": "No stat warehouse configured (warehouse_path)"}
+
+        stat_key = self.PROP_STATS.get(prop_type.lower())
+        if not stat_key:
+            return {"success": False, "error": f"Invalid prop type: {prop_type}"}
+
+        player_id_result = self.get_player_id(player_name)
+        if not player_id_result["success"]:
+            return player_id_result
+
+        if standings is None:
             standings_result = self.scrape_standings()
             if not standings_result["success"]:
                 return standings_result
+            standings = standings_result["data"]
+
+        try:
+            with self.metrics.stage('analysis', component='aggregate_sql'):
+                aggregates = self.warehouse.aggregate(player_id_result["id"], stat_key, prop_value, is_over, seasons)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+        return self._analyze_aggregates(aggregates, standings, opponent)
+
+    async def scrape_standings_async(self) -> Dict:
+        """Scrape current NBA standings without blocking the event loop"""
+        return await self._run_io(self.scrape_standings)
+
+    async def get_player_games_async(self, player_name: str) -> Dict:
+        """Get player's game logs without blocking the event loop"""
+        return await self._run_io(self.get_player_games, player_name)
+
+    async def get_players_games_async(self, player_names: List[str], seasons: int = 1) -> Dict[str, Dict]:
+        """Fetch several players' game logs in parallel, once per unique name"""
+        if seasons > 1:
+            unique_names = list(dict.fromkeys(player_names))
+            results = await asyncio.gather(*(self.get_player_history_async(name, seasons) for name in unique_names))
+            return dict(zip(unique_names, results))
+
+        if self.parse_workers:
+            # refresh_players drives the I/O pool itself, so run it beside it
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(None, self.refresh_players, player_names)
+            return result["data"]
+
+        unique_names = list(dict.fromkeys(player_names))
+        results = await asyncio.gather(*(self.get_player_games_async(name) for name in unique_names))
+        return dict(zip(unique_names, results))
+
+    async def perform_full_analysis_async(self, player_name: str, prop_type: str, prop_value: float,
+                                          opponent: str, is_over: bool, season: str = None,
+                                          seasons: int = 1, interval_draws: int = 0, interval_level: float = 0.9,
+                                          recency: bool = False, date_filter: Optional[str] = None,
+                                          components: Optional[Iterable[str]] = None,
+                                          seed: Optional[int] = None) -> Dict:
+        """
+        Perform complete analysis, fetching standings and game logs concurrently.
+
+        seasons > 1 analyzes the current season plus that many minus one past
+        seasons from the season store. interval_draws > 0 adds a credible
+        interval for the final probability (seed makes it reproducible), recency adds
+        rolling-window stats and date_filter restricts the games analyzed.
+
+        components (e.g. ['overall_stats', 'direct_matchup']) computes only
+        those and returns a LazyAnalysis for the rest; standings are fetched
+        up front only when a requested component needs them. Otherwise they
+        are fetched on first access to a component that does, which blocks, so
+        async code should get more components through complete_analysis_async.
+        """
+        try:
+            if components is not None:
+                components = check_components(components)
+            if self._serves_from_snapshot(player_name, seasons, date_filter):
+                with self.metrics.stage('full_analysis', source='snapshot'):
+                    return self.analyze_from_snapshot(player_name, prop_type, prop_value, opponent, is_over,
+                                                      interval_draws, interval_level, recency, components, seed)
+
+            if components is not None and not STANDINGS_COMPONENTS.intersection(components):
+                with self.metrics.stage('full_analysis', source='lazy'):
+                    games_result = await self.get_player_history_async(player_name, seasons)
+                    if not games_result["success"]:
+                        return games_result
+                    return self.analyze_with_data(
+                        games_result["data"], self._deferred_standings, prop_type, prop_value, opponent, is_over,
+                        interval_draws, interval_level, seed, recency=recency, date_filter=date_filter,
+                        components=components
+                    )
+
+            with self.metrics.stage('full_analysis'):
+                standings_result, games_result = await asyncio.gather(
+                    self.scrape_standings_async(),
+                    self.get_player_history_async(player_name, seasons)
+                )
+                if not standings_result["success"]:
+                    return standings_result
+                if not games_result["success"]:
+                    return games_result
+
+                return self.analyze_with_data(
+                    games_result["data"],
+                    standings_result["data"],
+                    prop_type,
+                    prop_value,
+                    opponent,
+                    is_over,
+                    interval_draws,
+                    interval_level,
+                    seed,
+                    recency=recency,
+                    date_filter=date_filter,
+                    components=components
+                )
             
-            # Get player's game logs for specified season
-            games_result = self.get_player_games(player_name)
-            if not games_result["success"]:
-                return games_result
-                
-            # Calculate overall stats
-            overall_stats = self.calculate_overall_stats(
-                games_result["data"],
-                prop_type,
-                prop_value,
-                is_over
-            )
-            
-            # Direct matchup analysis
-            direct_analysis = self.analyze_performance(
-                games_result["data"],
-                opponent,
-                prop_type,
-                prop_value,
-                is_over
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    def _deferred_standings(self) -> Dict:
+        """Standings for a LazyAnalysis component accessed after the analysis returned"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return self.scrape_standings()
+        # A blocking fetch here would stall the event loop for every other task
+        return {"success": False, "error": "Standings were not fetched; from async code, "
+                                           "use complete_analysis_async for standings-based components"}
+
+    async def complete_analysis_async(self, analysis: LazyAnalysis, components: Iterable[str]) -> Dict:
+        """
+        Compute further components of a LazyAnalysis from async code.
+
+        Standings, if a component needs them and they were not fetched yet,
+        are awaited like any other fetch instead of blocking the event loop.
+
+        :return: The requested components, as analysis[name] gives them.
+        """
+        try:
+            components = check_components(components)
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+        if STANDINGS_COMPONENTS.intersection(components) and not analysis.has('standings'):
+            analysis.provide('standings', await self.scrape_standings_async())
+        return {"success": True, "data": {name: analysis[name] for name in components}}
+
+    async def perform_batch_analysis_async(self, props: List[tuple], seasons: int = 1) -> Dict:
+        """
+        Analyze a whole slate of props while fetching shared data only once.
+
+        Standings are scraped once and each unique player's game log is fetched
+        once, all in parallel, so a slate costs one request chain per player
+        plus one for standings instead of a full scrape per prop.
+
+        Players in a fresh warmed snapshot (and its standings) are served from
+        memory; only the rest are fetched.
+
+        :param props: List of (player_name, prop_type, prop_value, opponent, is_over) tuples.
+        :param seasons: Number of seasons of game logs to analyze, counting the current one.
+        :return: Per-prop results in the same order as the input.
+        """
+        from_snapshot = {prop[0] for prop in props if self._serves_from_snapshot(prop[0], seasons)}
+        to_fetch = [prop[0] for prop in props if prop[0] not in from_snapshot]
+
+        standings = self.snapshot_standings()
+        if standings is None:
+            standings_result, player_games = await asyncio.gather(
+                self.scrape_standings_async(),
+                self.get_players_games_async(to_fetch, seasons)
             )
-            
-            # Surrounding teams analysis
-            surr_analysis = self.analyze_surrounding_teams(
-                games_result["data"],
-                opponent,
-                standings_result["data"],
+            if not standings_result["success"]:
+                return standings_result
+            standings = standings_result["data"]
+        else:
+            player_games = await self.get_players_games_async(to_fetch, seasons) if to_fetch else {}
+
+        # One columnar log (and opponent index) per player, shared by all their props
+        game_logs = {
+            player_name: GameLog.from_records(games_result["data"])
+            for player_name, games_result in player_games.items()
+            if games_result["success"]
+        }
+
+        results = []
+        for player_name, prop_type, prop_value, opponent, is_over in props:
+            if player_name in from_snapshot:
+                results.append(self.analyze_from_snapshot(player_name, prop_type, prop_value, opponent, is_over))
+                continue
+            games_result = player_games[player_name]
+            if not games_result["success"]:
+                results.append(games_result)
+                continue
+            results.append(self.analyze_with_data(
+                game_logs[player_name],
+                standings,
                 prop_type,
                 prop_value,
-                is_over
-            )
-            
-            # Cross-conference analysis
-            cross_conf_analysis = self.analyze_cross_conference(
-                games_result["data"],
                 opponent,
-                standings_result["data"],
-                prop_type,
-                prop_value,
                 is_over
-            )
-            
-            # Calculate final probability
-            num_direct_matchups = direct_analysis["data"].get("games_played", 0)
-            final_prob_result = self.calculate_final_probability(
-                direct_analysis["data"],
-                surr_analysis["data"],
-                cross_conf_analysis["data"],
-                overall_stats["data"],
-                num_direct_matchups
-            )
+            ))
+
+        return {"success": True, "data": results}
+
+    def analyze_ladder_with_data(self, games: Union[List[Dict], GameLog], standings: Dict, prop_type: str,
+                                 prop_values: List[float], opponent: str) -> Dict:
+        """
+        Hit rates and final probabilities for many lines at once, over and under.
+
+        Each component's games are sorted once, then every line is a binary
+        search, so the ladder costs one analysis plus O(log n) per line.
+
+        :param prop_values: Lines to evaluate, e.g. [24.5, 25.5, 26.5].
+        :return: One entry per line with season, direct, surrounding and
+                 cross-conference hit rates and the final probability for
+                 both directions.
+        """
+        try:
+            stat_key = self.PROP_STATS.get(prop_type.lower())
+            if not stat_key:
+                return {"success": False, "error": f"Invalid prop type: {prop_type}"}
+
+            ladder = GameLog.coerce(games).ladder(stat_key)
+            lines = list(prop_values)
+
+            surr_teams = self.get_surrounding_teams(opponent, standings)
+            if not surr_teams["success"]:
+                return surr_teams
+            match_result = self.find_win_pct_match(opponent, standings)
+            if not match_result["success"]:
+                return match_result
+            matched_team = match_result["data"]['team']
+            surrounding = [team['team'] for team in surr_teams["data"]["above"] + surr_teams["data"]["below"]]
+
+            season = ladder.hit_rates(lines)
+            direct = ladder.hit_rates(lines, opponent)
+            cross = ladder.hit_rates(lines, matched_team)
+            surr_rates = {team: ladder.hit_rates(lines, team) for team in surrounding}
+
+            entries = []
+            for i, prop_value in enumerate(lines):
+                entry = {"prop_value": prop_value}
+                for direction in ("over", "under"):
+                    # As in a full analysis, only the direct and season blocks carry a
+                    # top-level hit rate; the surrounding/cross blocks are per team
+                    final_prob = self.calculate_final_probability(
+                        {"hit_rate": float(direct[direction][i])},
+                        {"above": [], "below": []},
+                        {"matched_team": matched_team},
+                        {"season_hit_rate": float(season[direction][i])},
+                        direct["games_played"]
+                    )
+                    entry[direction] = {
+                        "season_hit_rate": float(season[direction][i]),
+                        "direct_hit_rate": float(direct[direction][i]),
+                        "surrounding_hit_rates": {
+                            team: float(rates[direction][i]) for team, rates in surr_rates.items()
+                        },
+                        "cross_conference_hit_rate": float(cross[direction][i]),
+                        "final_probability": final_prob["data"]["final_probability"]
+                    }
+                entries.append(entry)
 
             return {
                 "success": True,
                 "data": {
-                    "overall_stats": overall_stats["data"],
-                    "direct_matchup": direct_analysis["data"],
-                    "surrounding_teams": surr_analysis["data"],
-                    "cross_conference": cross_conf_analysis["data"],
-                    "final_probability": final_prob_result["data"]  # Ensure this is included
+                    "prop_type": prop_type,
+                    "opponent": opponent,
+                    "matched_team": matched_team,
+                    "games_played": {
+                        "season": season["games_played"],
+                        "direct": direct["games_played"],
+                        "cross_conference": cross["games_played"],
+                        "surrounding": {team: rates["games_played"] for team, rates in surr_rates.items()}
+                    },
+                    "ladder": entries
                 }
             }
-            
+
         except Exception as e:
             return {"success": False, "error": str(e)}
 
+    async def analyze_line_ladder_async(self, player_name: str, prop_type: str, prop_values: List[float],
+                                        opponent: str, seasons: int = 1) -> Dict:
+        """Fetch standings and game logs concurrently, then evaluate every line"""
+        standings_result, games_result = await asyncio.gather(
+            self.scrape_standings_async(),
+            self.get_player_history_async(player_name, seasons)
+        )
+        if not standings_result["success"]:
+            return standings_result
+        if not games_result["success"]:
+            return games_result
+
+        return self.analyze_ladder_with_data(
+            games_result["data"], standings_result["data"], prop_type, prop_values, opponent
+        )
+
+    def analyze_line_ladder(self, player_name: str, prop_type: str, prop_values: List[float],
+                            opponent: str, seasons: int = 1) -> Dict:
+        """Synchronous wrapper around analyze_line_ladder_async"""
+        return self._run_sync(self.analyze_line_ladder_async(player_name, prop_type, prop_values, opponent, seasons))
+
+    def perform_full_analysis(self, player_name: str, prop_type: str, prop_value: float,
+                          opponent: str, is_over: bool, season: str = None, seasons: int = 1,
+                          interval_draws: int = 0, interval_level: float = 0.9, recency: bool = False,
+                          date_filter: Optional[str] = None, components: Optional[Iterable[str]] = None,
+                          seed: Optional[int] = None) -> Dict:
+        """Perform complete analysis using all components, or only the requested ones (see the async version)"""
+        if self._serves_from_snapshot(player_name, seasons, date_filter):
+            # Nothing to await: skip spinning up an event loop
+            with self.metrics.stage('full_analysis', source='snapshot'):
+                return self.analyze_from_snapshot(player_name, prop_type, prop_value, opponent, is_over,
+                                                  interval_draws, interval_level, recency, components, seed)
+        return self._run_sync(self.perform_full_analysis_async(
+            player_name, prop_type, prop_value, opponent, is_over, season, seasons, interval_draws, interval_level,
+            recency, date_filter, components, seed
+        ))
+
+    def perform_batch_analysis(self, props: List[tuple], seasons: int = 1) -> Dict:
+        """Synchronous wrapper around perform_batch_analysis_async"""
+        return self._run_sync(self.perform_batch_analysis_async(props, seasons))
+
+
+def parse_game_log(content: bytes, backend, season: int) -> List[Dict]:
+    """
+    Parse a game log page into compact per-game records.
+
+    A plain function (not a method) so process-pool workers need only the
+    HTML backend, not a whole analyzer. Each record's 'ordinal' is its real
+    date (date.toordinal()), with the year inferred from the ESPN season.
+    """
+    all_games = []
+
+    # Breaking out of the row generator stops the parser reading the page
+    for _, row_text, cells in backend.iter_rows(content):
+        # Stop at the marker row; everything after it is not regular season
+        if row_text.startswith("Regular Season StatsMINFGFG%3PT3P%FTFT%REBASTBLKSTLPFTOPTS"):
+            #print(f"Found marker row: {row_text}. Excluding subsequent rows.")
+            break
+
+        # Parse valid game rows
+        if len(cells) < 2:  # Ensure valid row structure
+            #print(f"Skipping invalid or summary row: {row_text}")
+            continue
+
+        # Extract and validate date
+        date_text = cells[0]
+        if not re.match(r'\w{3} \d{1,2}/\d{1,2}', date_text):
+            #print(f"Invalid date format, skipping: {date_text}")
+            continue
+
+        # Process regular-season game data
+        try:
+
+            opponent = NBAPropsAnalyzer.clean_opponent_name(cells[1])
+
+            def safe_parse(value):
+                """Parses stats safely, handling ranges like '2-2' or empty cells."""
+                try:
+                    #print(f"Parsing value: {value}")  # Debug log
+
+                    if '-' in value:
+                        parts = value.split('-')
+                        # Use the first value instead of averaging
+                        return float(parts[0])  # Take the first part only
+                    return float(value)
+                except ValueError:
+                    print(f"Failed to parse value: {value}", file=sys.stderr)  # Debug log for failures
+                    return 0.0
+                
+            points = safe_parse(cells[16]) if len(cells) > 16 else 0.0
+            rebounds = safe_parse(cells[10]) if len(cells) > 10 else 0.0
+            assists = safe_parse(cells[11]) if len(cells) > 11 else 0.0
+            threes = safe_parse(cells[6]) if len(cells) > 6 else 0.0
+            #print(f"Parsed threes for {date_text} vs {opponent}: {threes}")  # Debug log
+            pra = points + rebounds + assists
+
+            game_day = parse_game_date(date_text, season)
+            game_data = {
+                'date': date_text,
+                'ordinal': game_day.toordinal() if game_day else None,
+                'opponent': opponent,
+                'points': points,
+                'rebounds': rebounds,
+                'assists': assists,
+                'threes': threes,
+                'pra': pra
+            }
+            all_games.append(game_data)
+            #print(f"Regular season game added: {game_data}")
+
+        except Exception as e:
+            print(f"Error processing row: {e}", file=sys.stderr)
+            continue
+
+    return all_games
+
+
+# HTML backend used inside process-pool workers, created once per worker process
+_worker_backend = None
+
+
+def _init_parse_worker(gamelog_parser: str) -> None:
+    global _worker_backend
+    _worker_backend = get_backend(gamelog_parser)
+
+
+def _parse_game_logs_chunk(pages: List[bytes], season: int) -> List[tuple]:
+    """Parse a chunk of raw game log pages in a worker process, timing each page"""
+    parsed = []
+    for content in pages:
+        start = time.perf_counter()
+        all_games = parse_game_log(content, _worker_backend, season)
+        parsed.append((all_games, time.perf_counter() - start))
+    return parsed
+
 
 # Let's test the core functionality with some realistic test cases
 '''
@@ -967,6 +1752,260 @@ def main():
     else:
         print(f"Error: {result['error']}")
 
+OVER_WORDS = ('o', 'over', 'true', '1', 'yes', 'y')
+UNDER_WORDS = ('u', 'under', 'false', '0', 'no', 'n')
+
+
+def parse_over(value) -> bool:
+    """Accept over/under written as o/u, over/under, true/false or 1/0"""
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in OVER_WORDS
+
+
+def parse_direction(value) -> bool:
+    """Like parse_over, but a value that is neither over nor under is an error"""
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in OVER_WORDS:
+        return True
+    if text in UNDER_WORDS:
+        return False
+    raise ValueError(f"unrecognized over/under value {value!r}")
+
+
+def _prop_from_record(record) -> tuple:
+    if not isinstance(record, dict):
+        raise ValueError("not a JSON object")
+    missing = [field for field in ('player', 'prop_type', 'prop_value', 'opponent') if record.get(field) in (None, '')]
+    direction = record.get('is_over', record.get('over_under'))
+    if direction in (None, ''):
+        missing.append('is_over (or over_under)')
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    prop_value = float(record['prop_value'])
+    if not math.isfinite(prop_value):
+        raise ValueError(f"prop_value must be a finite number, got {record['prop_value']!r}")
+    return (
+        record['player'],
+        str(record['prop_type']).lower(),
+        prop_value,
+        record['opponent'],
+        parse_direction(direction)
+    )
+
+
+def read_props(stream, fmt: str = 'auto', errors: Optional[List[Dict]] = None,
+               lines: Optional[List[int]] = None) -> List[tuple]:
+    """
+    Read props from CSV or JSONL.
+
+    Both formats use the fields player, prop_type, prop_value, opponent and
+    is_over (or over_under); the direction is required. CSV needs a header row.
+
+    :param errors: When given, unreadable rows (bad JSON, a missing field, a
+                   non-numeric or non-finite line, an unknown direction) are
+                   skipped and appended here as {"line", "success": False,
+                   "error"} records; otherwise the first one raises ValueError.
+    :param lines: When given, the source line number of each returned prop
+                  is appended here, so results can be joined back to their
+                  input rows even after bad rows were skipped.
+    """
+    text = stream.read()
+    if fmt == 'auto':
+        fmt = 'jsonl' if text.lstrip().startswith('{') else 'csv'
+
+    # (line number, record or the error reading it)
+    rows = []
+    if fmt == 'jsonl':
+        for number, line in enumerate(text.splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                rows.append((number, json.loads(line)))
+            except ValueError as e:
+                rows.append((number, ValueError(f"invalid JSON: {e}")))
+    else:
+        reader = csv.DictReader(io.StringIO(text))
+        for record in reader:
+            rows.append((reader.line_num, record))
+
+    props = []
+    for number, record in rows:
+        try:
+            if isinstance(record, Exception):
+                raise record
+            props.append(_prop_from_record(record))
+            if lines is not None:
+                lines.append(number)
+        except ValueError as e:
+            error = f"Line {number}: {e}"
+            if errors is None:
+                raise ValueError(error) from e
+            errors.append({"line": number, "success": False, "error": error})
+    return props
+
+
+def run_batch(analyzer: NBAPropsAnalyzer, props: List[tuple], workers: int = 8, out=sys.stdout,
+              seasons: int = 1, interval_draws: int = 0, interval_level: float = 0.9, recency: bool = False,
+              date_filter: Optional[str] = None, seed: Optional[int] = None,
+              lines: Optional[List[int]] = None) -> int:
+    """
+    Analyze props and write one JSON line per prop as soon as it is ready.
+
+    Standings are scraped once; props are grouped by player so each game log
+    is fetched once, and players are processed concurrently. Players in the
+    analyzer's warmed snapshot (and its standings) are served from memory.
+    Output lines are written in completion order and carry the input index.
+
+    :param lines: Source line number of each prop (as collected by
+                  read_props), added to every output line as "line".
+    :return: Number of props that failed.
+    """
+    failures = 0
+
+    def write(index, prop, result):
+        nonlocal failures
+        if not result["success"]:
+            failures += 1
+        player_name, prop_type, prop_value, opponent, is_over = prop
+        line = {"index": index}
+        if lines is not None:
+            line["line"] = lines[index]
+        line.update({
+            "player": player_name,
+            "prop_type": prop_type,
+            "prop_value": prop_value,
+            "opponent": opponent,
+            "is_over": is_over,
+            **result
+        })
+        out.write(json.dumps(line) + "\n")
+        out.flush()
+
+    standings = analyzer.snapshot_standings()
+    if standings is None:
+        standings_result = analyzer.scrape_standings()
+        if not standings_result["success"]:
+            for index, prop in enumerate(props):
+                write(index, prop, standings_result)
+            return failures
+        standings = standings_result["data"]
+
+    by_player = {}
+    for index, prop in enumerate(props):
+        by_player.setdefault(prop[0], []).append((index, prop))
+
+    def analyze_player(player_name):
+        if analyzer._serves_from_snapshot(player_name, seasons, date_filter):
+            return [
+                (index, prop, analyzer.analyze_from_snapshot(*prop, interval_draws=interval_draws,
+                                                             interval_level=interval_level, recency=recency,
+                                                             seed=seed))
+                for index, prop in by_player[player_name]
+            ]
+
+        games_result = analyzer.get_player_history(player_name, seasons)
+        if not games_result["success"]:
+            return [(index, prop, games_result) for index, prop in by_player[player_name]]
+        games = GameLog.from_records(games_result["data"])
+        return [
+            (index, prop, analyzer.analyze_with_data(games, standings, *prop[1:],
+                                                     interval_draws=interval_draws, interval_level=interval_level,
+                                                     recency=recency, date_filter=date_filter, seed=seed))
+            for index, prop in by_player[player_name]
+        ]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(analyze_player, player_name) for player_name in by_player]
+        for future in as_completed(futures):
+            for index, prop, result in future.result():
+                write(index, prop, result)
+
+    return failures
+
+
+def batch_main(argv: List[str]) -> int:
+    """Non-interactive entry point: python Main.py batch [input] [options]"""
+    parser = argparse.ArgumentParser(prog='Main.py batch', description='Analyze many props and stream JSONL results')
+    parser.add_argument('input', nargs='?', default='-', help='CSV or JSONL file of props, or - for stdin')
+    parser.add_argument('--format', choices=['auto', 'csv', 'jsonl'], default='auto')
+    parser.add_argument('--workers', type=int, default=8, help='Players analyzed concurrently')
+    parser.add_argument('--cache-dir', default=None, help='Enable the on-disk cache in this directory')
+    parser.add_argument('--player-index', default=None, help='Path of the persisted player index')
+    parser.add_argument('--record', default=None, help='Record every ESPN response to this archive')
+    parser.add_argument('--replay', default=None, help='Serve ESPN responses from this archive instead of the network')
+    parser.add_argument('--replay-latency', default=None,
+                        help="Delay replayed responses: 'recorded' or a number of seconds")
+    parser.add_argument('--rate', type=float, default=None, help='Cap ESPN requests per second across all workers')
+    parser.add_argument('--retries', type=int, default=3, help='Retries of throttled or failed ESPN requests')
+    parser.add_argument('--hedge-after', type=float, default=None,
+                        help='Send a duplicate of any ESPN request unanswered after this many seconds')
+    parser.add_argument('--timeout', type=float, default=None,
+                        help='Seconds to wait for an ESPN connection or response (default 5 to connect, 20 to read)')
+    parser.add_argument('--seasons', type=int, default=1, help='Seasons of game logs to analyze, counting the current one')
+    parser.add_argument('--history-dir', default=None, help='Store completed seasons here so they are fetched once')
+    parser.add_argument('--warehouse', default=None, help='SQLite file every fetched game log is upserted into')
+    parser.add_argument('--interval-draws', type=int, default=0,
+                        help='Posterior draws for a final-probability credible interval (0 = off)')
+    parser.add_argument('--interval-level', type=float, default=0.9, help='Probability mass inside the interval')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed, for reproducible intervals')
+    parser.add_argument('--recency', action='store_true', help='Add last-5/10/20 and decayed stats to overall_stats')
+    parser.add_argument('--snapshot', default=None, help='Serve players from a snapshot written by Main.py warm')
+    parser.add_argument('--date-filter', default=None,
+                        help="Only analyze games in a window: regular_season, since_all_star or last_<N>_days")
+    parser.add_argument('--metrics', default=None,
+                        help='Write Prometheus-format stage timings and counters here when done (- for stderr)')
+    parser.add_argument('--log-metrics', action='store_true', help='Log a JSON event for every timed stage')
+    args = parser.parse_args(argv)
+
+    if args.log_metrics:
+        configure_event_logging()
+
+    # Bad rows become error lines in the output instead of stopping the run
+    errors, lines = [], []
+    if args.input == '-':
+        props = read_props(sys.stdin, args.format, errors, lines)
+    else:
+        with open(args.input, 'r', encoding='utf-8') as f:
+            props = read_props(f, args.format, errors, lines)
+    for error in errors:
+        sys.stdout.write(json.dumps(error) + "\n")
+
+    analyzer = NBAPropsAnalyzer(
+        cache_dir=args.cache_dir,
+        player_index_path=args.player_index,
+        max_concurrency=args.workers,
+        transport=make_transport(args.record, args.replay, parse_latency(args.replay_latency), args.workers,
+                                 rate=args.rate, retries=args.retries, hedge_after=args.hedge_after,
+                                 timeout=args.timeout),
+        metrics=Metrics(log_events=args.log_metrics) if args.metrics or args.log_metrics else None,
+        history_dir=args.history_dir,
+        warehouse_path=args.warehouse
+    )
+    if args.snapshot:
+        analyzer.load_snapshot(args.snapshot)
+    try:
+        failures = len(errors) + run_batch(analyzer, props, workers=args.workers, seasons=args.seasons,
+                                           interval_draws=args.interval_draws, interval_level=args.interval_level,
+                                           recency=args.recency, date_filter=args.date_filter,
+                                           seed=args.seed, lines=lines)
+    finally:
+        analyzer.close()
+        write_prometheus(analyzer.metrics, args.metrics)
+    return 1 if failures else 0
+
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == 'batch':
+        sys.exit(batch_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == 'warm':
+        from warmer import warm_main
+        sys.exit(warm_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        from service import serve_main
+        serve_main(sys.argv[2:])
+        sys.exit(0)
     main()
     #test_analysis()
\ No newline at end of file
@@ -0,0 +1,179 @@
+"""
+Open-loop load driver for the analyzer against the local ESPN stub.
+
+Requests are issued on a fixed schedule at the target rate whether or not
+earlier ones have finished, and latency is measured from each request's
+scheduled start, so queueing delay shows up in the percentiles once the
+analyzer falls behind. Give several rates to see how it degrades:
+
+    python benchmarks/loadtest.py --mode full --rates 5,10,20,40 --duration 10 --latency 0.05
+    python benchmarks/loadtest.py --mode service --rates 50,100,200 --error-rate 0.02
+
+Each rate prints one JSON line with offered and achieved throughput,
+p50/p95/p99 latency and failure counts.
+"""
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from Main import NBAPropsAnalyzer  # noqa: E402
+from run_benchmarks import Fixtures, make_slate, percentile  # noqa: E402
+from service import AnalysisService  # noqa: E402
+from stub_server import point_at, start_stub  # noqa: E402
+
+
+def full_analysis_call(analyzer: NBAPropsAnalyzer) -> Callable[[List[tuple]], int]:
+    """One perform_full_analysis per prop; returns the number of failed props"""
+    def call(props):
+        return sum(1 for prop in props if not analyzer.perform_full_analysis(*prop)["success"])
+    return call
+
+
+def batch_call(analyzer: NBAPropsAnalyzer) -> Callable[[List[tuple]], int]:
+    """One perform_batch_analysis over the whole chunk of props"""
+    def call(props):
+        result = analyzer.perform_batch_analysis(props)
+        if not result["success"]:
+            return len(props)
+        return sum(1 for item in result["data"] if not item["success"])
+    return call
+
+
+def start_service(analyzer: NBAPropsAnalyzer) -> int:
+    """Run an AnalysisService on its own event loop thread; returns its port"""
+    service = AnalysisService(analyzer)
+    ready = threading.Event()
+    port = {}
+
+    async def run():
+        server = await asyncio.start_server(service.serve_connection, '127.0.0.1', 0)
+        port["value"] = server.sockets[0].getsockname()[1]
+        ready.set()
+        async with server:
+            await server.serve_forever()
+
+    threading.Thread(target=asyncio.run, args=(run(),), name='analysis-service', daemon=True).start()
+    ready.wait()
+    return port["value"]
+
+
+def service_call(port: int) -> Callable[[List[tuple]], int]:
+    """POST each prop to /analysis over a per-thread keep-alive connection"""
+    local = threading.local()
+
+    def post(prop):
+        if not hasattr(local, 'conn'):
+            local.conn = http.client.HTTPConnection('127.0.0.1', port)
+        player_name, prop_type, prop_value, opponent, is_over = prop
+        body = json.dumps({"player": player_name, "prop_type": prop_type, "prop_value": prop_value,
+                           "opponent": opponent, "is_over": is_over})
+        try:
+            local.conn.request('POST', '/analysis', body, {'Content-Type': 'application/json'})
+            return json.loads(local.conn.getresponse().read())
+        except (OSError, http.client.HTTPException) as e:
+            del local.conn
+            return {"success": False, "error": str(e)}
+
+    def call(props):
+        return sum(1 for prop in props if not post(prop)["success"])
+    return call
+
+
+def run_at_rate(call: Callable[[List[tuple]], int], units: List[List[tuple]], rate: float,
+                duration: float, concurrency: int) -> Dict:
+    """
+    Issue units of work at a fixed rate for a fixed time.
+
+    :param rate: Units started per second.
+    :return: Latencies (seconds, from scheduled start) plus prop and failure counts.
+    """
+    total = max(1, int(rate * duration))
+    latencies = []
+    failures = 0
+    props = 0
+    lock = threading.Lock()
+
+    def job(unit, scheduled):
+        nonlocal failures, props
+        failed = call(unit)
+        elapsed = time.perf_counter() - scheduled
+        with lock:
+            latencies.append(elapsed)
+            failures += failed
+            props += len(unit)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for i in range(total):
+            scheduled = start + i / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(job, units[i % len(units)], scheduled)
+    elapsed = time.perf_counter() - start
+
+    return {"latencies": latencies, "failures": failures, "props": props, "elapsed": elapsed}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description='Load-test the analyzer against the ESPN stub')
+    parser.add_argument('--mode', choices=['full', 'batch', 'service'], default='full')
+    parser.add_argument('--rates', default='5,10,20', help='Comma-separated target rates (props per second)')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per rate')
+    parser.add_argument('--concurrency', type=int, default=32, help='Client threads issuing requests')
+    parser.add_argument('--batch-size', type=int, default=12, help='Props per request in batch mode')
+    parser.add_argument('--latency', type=float, default=0.0, help='Stub latency per response in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Uniform +/- seconds around --latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of stub responses that are 503s')
+    parser.add_argument('--cache-dir', default=None, help='Give the analyzer an on-disk cache')
+    parser.add_argument('--workers', type=int, default=16, help='Analyzer fetch concurrency')
+    parser.add_argument('--seed', type=int, default=11)
+    args = parser.parse_args(argv)
+
+    stub = start_stub(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, seed=args.seed)
+    analyzer = point_at(NBAPropsAnalyzer(cache_dir=args.cache_dir, max_concurrency=args.workers), stub.base_url)
+
+    slate = make_slate(Fixtures(), props_per_player=10, seed=args.seed)
+    if args.mode == 'batch':
+        units = [slate[i:i + args.batch_size] for i in range(0, len(slate), args.batch_size)]
+        call = batch_call(analyzer)
+    else:
+        units = [[prop] for prop in slate]
+        call = full_analysis_call(analyzer) if args.mode == 'full' else service_call(start_service(analyzer))
+
+    for rate in (float(value) for value in args.rates.split(',')):
+        unit_size = args.batch_size if args.mode == 'batch' else 1
+        stub_requests, stub_errors = stub.requests, stub.errors
+        run = run_at_rate(call, units, rate / unit_size, args.duration, args.concurrency)
+        latencies = run["latencies"]
+        print(json.dumps({
+            "mode": args.mode,
+            "offered_props_per_sec": rate,
+            "achieved_props_per_sec": run["props"] / run["elapsed"],
+            "props": run["props"],
+            "failures": run["failures"],
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "max_ms": max(latencies) * 1000,
+            "upstream_requests": stub.requests - stub_requests,
+            "upstream_errors": stub.errors - stub_errors
+        }), flush=True)
+
+    analyzer.close()
+    stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Regenerate the offline benchmark fixtures.
+
+The pages mirror the structure of ESPN's standings and player game log pages
+(table.Table layout, split team/stat standings tables, monthly game tables,
+the "Regular Season Stats" marker row followed by preseason games, and page
+filler outside the tables). Output is deterministic for a given seed.
+
+    python benchmarks/make_fixtures.py
+"""
+import gzip
+import json
+import os
+import random
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+EAST = [
+    ('CLE', 'Cleveland Cavaliers'), ('BOS', 'Boston Celtics'), ('NY', 'New York Knicks'),
+    ('ORL', 'Orlando Magic'), ('MIL', 'Milwaukee Bucks'), ('ATL', 'Atlanta Hawks'),
+    ('MIA', 'Miami Heat'), ('IND', 'Indiana Pacers'), ('CHI', 'Chicago Bulls'),
+    ('DET', 'Detroit Pistons'), ('PHI', 'Philadelphia 76ers'), ('BKN', 'Brooklyn Nets'),
+    ('CHA', 'Charlotte Hornets'), ('TOR', 'Toronto Raptors'), ('WSH', 'Washington Wizards')
+]
+WEST = [
+    ('OKC', 'Oklahoma City Thunder'), ('MEM', 'Memphis Grizzlies'), ('HOU', 'Houston Rockets'),
+    ('DAL', 'Dallas Mavericks'), ('LAL', 'Los Angeles Lakers'), ('LAC', 'LA Clippers'),
+    ('DEN', 'Denver Nuggets'), ('MIN', 'Minnesota Timberwolves'), ('SA', 'San Antonio Spurs'),
+    ('GS', 'Golden State Warriors'), ('PHX', 'Phoenix Suns'), ('SAC', 'Sacramento Kings'),
+    ('POR', 'Portland Trail Blazers'), ('UTAH', 'Utah Jazz'), ('NO', 'New Orleans Pelicans')
+]
+
+# (display name, ESPN id, scoring baseline)
+PLAYERS = [
+    ('LeBron James', '1966', 24), ('Josh Hart', '3062679', 13), ('Nikola Jokić', '3112335', 28),
+    ('Jalen Brunson', '3934672', 26), ('Stephen Curry', '3975', 25), ('Giannis Antetokounmpo', '3032977', 30),
+    ('Luka Dončić', '3945274', 28), ('Jayson Tatum', '4065648', 27), ('Shai Gilgeous-Alexander', '4278073', 31),
+    ('Joel Embiid', '3059318', 24), ('Kevin Durant', '3202', 26), ('Anthony Edwards', '4594268', 27)
+]
+
+MONTHS = [('April', 4, 30), ('March', 3, 31), ('February', 2, 28), ('January', 1, 31),
+          ('December', 12, 31), ('November', 11, 30), ('October', 10, 31)]
+DAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+GAMELOG_HEADER = ''.join(f'<th>{label}</th>' for label in [
+    'Date', 'OPP', 'Result', 'MIN', 'FG', 'FG%', '3PT', '3P%', 'FT', 'FT%',
+    'REB', 'AST', 'BLK', 'STL', 'PF', 'TO', 'PTS'
+])
+
+
+def standings_page(rng: random.Random) -> str:
+    parts = ['<html><head><title>NBA Standings</title></head><body><div class="Wrapper">']
+    for conference in (EAST, WEST):
+        wins = sorted(rng.sample(range(8, 40), len(conference)), reverse=True)
+        parts.append('<table class="Table Table--align-right Table--fixed Table--fixed-left">'
+                     '<thead><tr class="Table__TR"><th>Team</th></tr></thead><tbody>')
+        for seed, (abbr, name) in enumerate(conference, 1):
+            parts.append(
+                f'<tr class="Table__TR Table__TR--sm"><td class="Table__TD"><div class="team-link">'
+                f'<span class="pr2">{seed}</span><abbr title="{name}">{abbr}</abbr>'
+                f'<span class="hide-mobile"><a href="/nba/team/_/name/{abbr.lower()}">{name}</a></span>'
+                f'</div></td></tr>'
+            )
+        parts.append('</tbody></table>')
+        parts.append('<table class="Table Table--align-right"><thead><tr class="Table__TR">'
+                     '<th>W</th><th>L</th><th>PCT</th><th>GB</th><th>HOME</th><th>AWAY</th></tr></thead><tbody>')
+        for w in wins:
+            pct = f'{w / 45:.3f}'.lstrip('0')
+            parts.append(
+                f'<tr class="Table__TR Table__TR--sm"><td class="Table__TD">{w}</td>'
+                f'<td class="Table__TD">{45 - w}</td><td class="Table__TD">{pct}</td>'
+                f'<td class="Table__TD">-</td><td class="Table__TD">10-5</td><td class="Table__TD">9-6</td></tr>'
+            )
+        parts.append('</tbody></table>')
+    parts.append('<div class="filler">' + '<p>news</p>' * 2000 + '</div></body></html>')
+    return ''.join(parts)
+
+
+def game_row(rng: random.Random, month: int, day: int, baseline: int) -> str:
+    abbr = rng.choice(EAST + WEST)[0]
+    prefix = rng.choice(['vs', '@'])
+    points = max(0, int(rng.gauss(baseline, 6)))
+    rebounds, assists, threes = rng.randint(2, 12), rng.randint(1, 11), rng.randint(0, 6)
+    cells = [
+        f'{rng.choice(DAYS)} {month}/{day}',
+        f'<span class="pr2">{prefix}</span><a href="#"><img alt=""></a>'
+        f'<a href="/nba/team/_/name/{abbr.lower()}">{abbr}</a>',
+        '<span class="fw-bold">W</span>112-104',
+        '35', f'{points // 2}-{points // 2 + 7}', '48.1', f'{threes}-{threes + 4}', '40.0', '4-5', '80.0',
+        str(rebounds), str(assists), '1', '2', '3', '2', str(points)
+    ]
+    return ('<tr class="Table__TR Table__TR--sm">'
+            + ''.join(f'<td class="Table__TD">{cell}</td>' for cell in cells) + '</tr>')
+
+
+def gamelog_page(rng: random.Random, baseline: int) -> str:
+    parts = ['<html><head><title>Game Log</title><script>var x = "<table>";</script></head><body>']
+    for name, month, days in MONTHS:
+        parts.append(f'<div class="mb5"><div class="Table__Title">{name}</div>'
+                     f'<table class="Table Table--align-right"><thead><tr class="Table__TR">{GAMELOG_HEADER}</tr></thead><tbody>')
+        for day in sorted(rng.sample(range(22 if month == 10 else 1, days), 12 if month != 10 else 3), reverse=True):
+            parts.append(game_row(rng, month, day, baseline))
+        parts.append(f'<tr class="Table__TR totals_row"><td class="Table__TD" colspan="3">{name}</td>'
+                     f'<td class="Table__TD">35</td><td class="Table__TD">9-18</td></tr></tbody></table></div>')
+    marker = ''.join(f'<td>{label}</td>' for label in [
+        'Regular Season Stats', 'MIN', 'FG', 'FG%', '3PT', '3P%', 'FT', 'FT%',
+        'REB', 'AST', 'BLK', 'STL', 'PF', 'TO', 'PTS'
+    ])
+    parts.append(f'<table class="Table Table--align-right"><tbody><tr class="Table__TR">{marker}</tr>'
+                 f'<tr class="Table__TR"><td>Averages</td><td>35.1</td></tr></tbody></table>')
+    parts.append('<div class="Table__Title">Preseason</div><table class="Table Table--align-right"><tbody>'
+                 + game_row(rng, 10, 8, baseline) + game_row(rng, 10, 5, baseline) + '</tbody></table>')
+    parts.append('<div class="filler">' + '<p>related</p>' * 1500 + '</div></body></html>')
+    return ''.join(parts)
+
+
+def write_gz(name: str, text: str) -> None:
+    # mtime=0 keeps the archives byte-identical between runs
+    with open(os.path.join(FIXTURE_DIR, name), 'wb') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as f:
+            f.write(text.encode('utf-8'))
+
+
+def main(seed: int = 7) -> None:
+    rng = random.Random(seed)
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+
+    write_gz('standings.html.gz', standings_page(rng))
+
+    search = {}
+    for name, player_id, baseline in PLAYERS:
+        write_gz(f'gamelog_{player_id}.html.gz', gamelog_page(rng, baseline))
+        search[name.lower()] = {'items': [
+            {'id': player_id, 'displayName': name, 'type': 'player', 'sport': 'basketball'},
+            {'id': f'9{player_id}', 'displayName': f'{name} Jr.', 'type': 'player', 'sport': 'basketball'}
+        ]}
+
+    with open(os.path.join(FIXTURE_DIR, 'search.json'), 'w', encoding='utf-8') as f:
+        json.dump(search, f, ensure_ascii=False, indent=1, sort_keys=True)
+    with open(os.path.join(FIXTURE_DIR, 'players.json'), 'w', encoding='utf-8') as f:
+        json.dump([{'name': name, 'id': player_id} for name, player_id, _ in PLAYERS],
+                  f, ensure_ascii=False, indent=1)
+
+
+if __name__ == "__main__":
+    main()
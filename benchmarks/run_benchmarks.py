@@ -0,0 +1,268 @@
+"""
+Offline benchmark suite for NBAPropsAnalyzer.
+
+Every request is served from the fixtures in benchmarks/fixtures, so runs are
+repeatable and never touch ESPN. Results are written as flat JSON metrics
+that can be diffed between versions:
+
+    python benchmarks/run_benchmarks.py --output after.json --compare before.json
+"""
+import argparse
+import gzip
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+FIXTURE_DIR = os.path.join(BENCH_DIR, 'fixtures')
+sys.path.insert(0, REPO_DIR)
+
+from Main import NBAPropsAnalyzer  # noqa: E402
+from parsers import BACKENDS  # noqa: E402
+from transport import Transport  # noqa: E402
+
+PROP_TYPES = ['points', 'rebounds', 'assists', 'threes', 'pra']
+TEAMS = ['Cavaliers', 'Celtics', 'Knicks', 'Magic', 'Bucks', 'Heat', 'Lakers', 'Nuggets', 'Suns', 'Thunder']
+
+
+class Fixtures:
+    """Recorded standings, search and game log responses held in memory"""
+
+    def __init__(self, fixture_dir: str = FIXTURE_DIR):
+        with gzip.open(os.path.join(fixture_dir, 'standings.html.gz'), 'rb') as f:
+            self.standings = f.read()
+        with open(os.path.join(fixture_dir, 'search.json'), 'r', encoding='utf-8') as f:
+            self.search = json.load(f)
+        with open(os.path.join(fixture_dir, 'players.json'), 'r', encoding='utf-8') as f:
+            self.players = json.load(f)
+        self.gamelogs = {}
+        for player in self.players:
+            with gzip.open(os.path.join(fixture_dir, f"gamelog_{player['id']}.html.gz"), 'rb') as f:
+                self.gamelogs[player['id']] = f.read()
+
+    def response(self, url: str, params: Dict = None) -> requests.Response:
+        """Build the requests.Response ESPN would have returned for a URL"""
+        status, body, content_type = 404, b'', 'text/html'
+        if 'standings' in url:
+            status, body = 200, self.standings
+        elif 'search' in url:
+            query = (params or {}).get('query', '').lower()
+            status, body, content_type = 200, json.dumps(self.search.get(query, {'items': []})).encode(), 'application/json'
+        else:
+            match = re.search(r'/id/(\d+)', url)
+            if match and match.group(1) in self.gamelogs:
+                status, body = 200, self.gamelogs[match.group(1)]
+
+        response = requests.Response()
+        response.status_code = status
+        response._content = body
+        response.headers = CaseInsensitiveDict({'Content-Type': content_type})
+        response.url = url
+        response.encoding = 'utf-8'
+        return response
+
+
+class FixtureTransport(Transport):
+    """Transport that answers every request from the checked-in fixtures"""
+
+    def __init__(self, fixtures: Fixtures):
+        self.fixtures = fixtures
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.fixtures.response(url, kwargs.get('params'))
+
+
+def fixture_analyzer(fixtures: Fixtures, **kwargs) -> NBAPropsAnalyzer:
+    """Analyzer wired to the fixtures instead of ESPN"""
+    return NBAPropsAnalyzer(transport=FixtureTransport(fixtures), **kwargs)
+
+
+def time_calls(func: Callable, repeat: int) -> List[float]:
+    """Per-call wall times in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def peak_memory(func: Callable) -> int:
+    """Peak bytes allocated by Python while running func (C-level parser memory is not traced)"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def make_slate(fixtures: Fixtures, props_per_player: int, seed: int = 11) -> List[tuple]:
+    """Deterministic slate of props spread over every fixture player"""
+    rng = random.Random(seed)
+    slate = []
+    for player in fixtures.players:
+        for _ in range(props_per_player):
+            prop_type = rng.choice(PROP_TYPES)
+            line = {'points': 24.5, 'rebounds': 6.5, 'assists': 5.5, 'threes': 2.5, 'pra': 36.5}[prop_type]
+            slate.append((player['name'], prop_type, line + rng.randint(-3, 3), rng.choice(TEAMS), rng.random() < 0.5))
+    return slate
+
+
+def bench_parsing(fixtures: Fixtures, repeat: int) -> Dict:
+    """Parse throughput, peak memory and output parity for every parser backend"""
+    results = {}
+    pages = list(fixtures.gamelogs.values())
+    gamelog_bytes = sum(len(page) for page in pages)
+    reference = None
+
+    for name in BACKENDS:
+        analyzer = NBAPropsAnalyzer(parser=name, gamelog_parser=name)
+
+        records = ([analyzer._parse_standings(fixtures.standings)]
+                   + [analyzer._parse_game_log(page) for page in pages])
+        reference = reference or records
+        results[f"parse.{name}.identical_records"] = records == reference
+
+        standings_times = time_calls(lambda: analyzer._parse_standings(fixtures.standings), repeat)
+        results[f"parse.{name}.standings_pages_per_sec"] = 1 / statistics.median(standings_times)
+
+        gamelog_times = time_calls(lambda: [analyzer._parse_game_log(page) for page in pages], repeat)
+        per_round = statistics.median(gamelog_times)
+        results[f"parse.{name}.gamelog_pages_per_sec"] = len(pages) / per_round
+        results[f"parse.{name}.gamelog_mb_per_sec"] = gamelog_bytes / per_round / 1e6
+        results[f"parse.{name}.gamelog_peak_bytes"] = peak_memory(lambda: analyzer._parse_game_log(pages[0]))
+
+    return results
+
+
+def bench_full_analysis(fixtures: Fixtures, repeat: int) -> Dict:
+    """Per-prop latency of perform_full_analysis, cold (fetch + parse) and on shared data"""
+    analyzer = fixture_analyzer(fixtures)
+    slate = make_slate(fixtures, props_per_player=2)[:repeat]
+
+    # Prime the player index so the numbers reflect fetch + parse + analysis
+    for player in fixtures.players:
+        analyzer.get_player_id(player['name'])
+
+    latencies = [time_calls(lambda: analyzer.perform_full_analysis(*prop), 1)[0] for prop in slate]
+
+    standings = analyzer.scrape_standings()["data"]
+    games = {player['name']: analyzer.get_player_games(player['name'])["data"] for player in fixtures.players}
+    analysis_only = [
+        time_calls(lambda: analyzer.analyze_with_data(games[prop[0]], standings, *prop[1:]), 1)[0]
+        for prop in slate
+    ]
+    analyzer.close()
+
+    results = {}
+    for label, values in (("cold", latencies), ("analysis_only", analysis_only)):
+        results[f"full_analysis.{label}.p50_ms"] = percentile(values, 50) * 1000
+        results[f"full_analysis.{label}.p95_ms"] = percentile(values, 95) * 1000
+        results[f"full_analysis.{label}.mean_ms"] = statistics.mean(values) * 1000
+    return results
+
+
+def bench_batch(fixtures: Fixtures, props_per_player: int) -> Dict:
+    """Slate throughput and peak memory of perform_batch_analysis"""
+    slate = make_slate(fixtures, props_per_player)
+
+    analyzer = fixture_analyzer(fixtures)
+    start = time.perf_counter()
+    result = analyzer.perform_batch_analysis(slate)
+    elapsed = time.perf_counter() - start
+    failures = sum(1 for item in result.get("data", []) if not item["success"])
+
+    peak = peak_memory(lambda: fixture_analyzer(fixtures).perform_batch_analysis(slate))
+    analyzer.close()
+
+    return {
+        "batch.props": len(slate),
+        "batch.failures": failures,
+        "batch.props_per_sec": len(slate) / elapsed,
+        "batch.seconds": elapsed,
+        "batch.peak_bytes": peak
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(old: Dict, new: Dict) -> None:
+    """Print the relative change of every numeric metric present in both runs"""
+    print(f"{'metric':55} {'before':>14} {'after':>14} {'change':>9}", file=sys.stderr)
+    for key in sorted(set(old["results"]) & set(new["results"])):
+        before, after = old["results"][key], new["results"][key]
+        if isinstance(before, bool) or not isinstance(before, (int, float)):
+            continue
+        change = (after - before) / before * 100 if before else 0.0
+        print(f"{key:55} {before:14.3f} {after:14.3f} {change:+8.1f}%", file=sys.stderr)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description='Offline NBAPropsAnalyzer benchmarks')
+    parser.add_argument('--output', help='Write JSON results here instead of stdout')
+    parser.add_argument('--compare', help='Previous results JSON to compare against')
+    parser.add_argument('--repeat', type=int, default=10, help='Timing repetitions')
+    parser.add_argument('--props-per-player', type=int, default=20, help='Batch slate size per player')
+    args = parser.parse_args(argv)
+
+    fixtures = Fixtures()
+    results = {}
+    results.update(bench_parsing(fixtures, args.repeat))
+    results.update(bench_full_analysis(fixtures, args.repeat))
+    results.update(bench_batch(fixtures, args.props_per_player))
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backends": list(BACKENDS)
+        },
+        "results": results
+    }
+
+    text = json.dumps(report, indent=1, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(json.load(f), report)
+
+    mismatched = [key for key, value in results.items() if key.endswith('.identical_records') and not value]
+    if mismatched:
+        sys.exit(f"Parser output differs from the reference backend: {', '.join(mismatched)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Local stand-in for the ESPN endpoints the analyzer uses.
+
+Serves the standings page, the search API and game-log pages from
+benchmarks/fixtures over real HTTP, with configurable latency and an
+injected error rate, so the whole fetch path can be load-tested offline:
+
+    python benchmarks/stub_server.py --port 8765 --latency 0.05 --jitter 0.02 --error-rate 0.01
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from run_benchmarks import Fixtures  # noqa: E402
+
+
+class StubServer(ThreadingHTTPServer):
+    """Threaded HTTP server answering like ESPN from the fixtures"""
+
+    daemon_threads = True
+
+    def __init__(self, address, fixtures: Fixtures, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, seed: Optional[int] = None):
+        super().__init__(address, StubHandler)
+        self.fixtures = fixtures
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def plan(self):
+        """Delay and whether to fail the next request"""
+        with self._lock:
+            self.requests += 1
+            delay = max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+            fail = self.rng.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        return delay, fail
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        delay, fail = self.server.plan()
+        if delay:
+            time.sleep(delay)
+
+        if fail:
+            self._send(503, b'Service Unavailable', 'text/plain')
+            return
+
+        parts = urlsplit(self.path)
+        params = {key: values[0] for key, values in parse_qs(parts.query).items()}
+        response = self.server.fixtures.response(parts.path, params)
+        self._send(response.status_code, response.content, response.headers['Content-Type'])
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def point_at(analyzer, base_url: str):
+    """Send an analyzer's standings, search and game-log requests to a stub server"""
+    analyzer.STANDINGS_URL = f"{base_url}/nba/standings"
+    analyzer.SEARCH_URL = f"{base_url}/apis/common/v3/search"
+    analyzer.GAMELOG_URL = f"{base_url}/nba/player/gamelog/_/id/{{player_id}}"
+    return analyzer
+
+
+def start_stub(host: str = '127.0.0.1', port: int = 0, **options) -> StubServer:
+    """Start a stub server on a background thread (port 0 picks a free port)"""
+    server = StubServer((host, port), Fixtures(), **options)
+    threading.Thread(target=server.serve_forever, name='espn-stub', daemon=True).start()
+    return server
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description='Serve ESPN-shaped fixtures for load tests')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Uniform +/- seconds around --latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 503')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    server = StubServer((args.host, args.port), Fixtures(), latency=args.latency, jitter=args.jitter,
+                        error_rate=args.error_rate, seed=args.seed)
+    print(f"ESPN stub listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+class DiskCache:
+    """
+    Disk-backed cache for parsed ESPN data.
+
+    Entries are stored as one JSON file per key under a directory per resource
+    type, so a cache hit returns the already parsed records without touching
+    the HTML again. File modification times double as the LRU clock.
+
+    Entry count and total size are kept as running totals (seeded by one scan
+    on the first write), so a write only walks the directory when it pushes
+    the cache over its bounds. Eviction then trims down to EVICT_TO of the
+    bounds, leaving headroom for the next writes instead of scanning again on
+    every one of them.
+    """
+
+    # Seconds before an entry needs revalidating, per resource type
+    DEFAULT_TTLS = {
+        'standings': 6 * 60 * 60,  # Standings only move once games finish
+        'gamelog': 60 * 60,        # Game logs change after each game
+    }
+
+    # Fraction of max_entries/max_bytes that eviction trims the cache down to
+    EVICT_TO = 0.9
+
+    def __init__(self, cache_dir: str = '.props_cache', ttls: Optional[Dict[str, float]] = None,
+                 max_entries: int = 5000, max_bytes: int = 100 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.ttls = {**self.DEFAULT_TTLS, **(ttls or {})}
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        # Entry path -> size in bytes, and their sum; None until the first write
+        self._sizes: Optional[Dict[str, int]] = None
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def _path(self, resource: str, key: str) -> str:
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, resource, f"{digest}.json")
+
+    def get(self, resource: str, key: str) -> Optional[Dict]:
+        """
+        Look up an entry.
+
+        :return: None on a miss, otherwise the stored entry with a "fresh" flag
+                 telling whether it is still inside its TTL.
+        """
+        path = self._path(resource, key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        # Mark as recently used for LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        ttl = self.ttls.get(resource, 0)
+        entry["fresh"] = time.time() - entry.get("stored_at", 0) < ttl
+        return entry
+
+    def set(self, resource: str, key: str, data: Any, etag: Optional[str] = None,
+            last_modified: Optional[str] = None) -> None:
+        """Store parsed data along with the validators needed for revalidation"""
+        path = self._path(resource, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {
+            "key": key,
+            "stored_at": time.time(),
+            "etag": etag,
+            "last_modified": last_modified,
+            "data": data
+        }
+
+        # Write to a temp file first so readers never see a partial entry
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+            size = f.tell()
+        os.replace(tmp_path, path)
+
+        self._track(path, size)
+
+    def _track(self, path: str, size: int) -> None:
+        """Update the running totals for a written entry and evict if over bounds"""
+        with self._lock:
+            if self._sizes is None:
+                self._reset_totals(self._scan())
+            self._total_bytes += size - self._sizes.get(path, 0)
+            self._sizes[path] = size
+            over = len(self._sizes) > self.max_entries or self._total_bytes > self.max_bytes
+        if over:
+            self.evict()
+
+    def _reset_totals(self, files: List[tuple]) -> None:
+        self._sizes = {path: size for _, size, path in files}
+        self._total_bytes = sum(self._sizes.values())
+
+    def touch(self, resource: str, key: str) -> None:
+        """Restart an entry's TTL after the server confirmed it is unchanged"""
+        entry = self.get(resource, key)
+        if entry is not None:
+            self.set(resource, key, entry["data"], entry.get("etag"), entry.get("last_modified"))
+
+    def _scan(self) -> List[tuple]:
+        """(mtime, size, path) of every entry on disk"""
+        files = []
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def evict(self) -> None:
+        """Drop least recently used entries once the cache is over its bounds"""
+        # A full scan also resyncs the running totals with other writers of the directory
+        files = self._scan()
+        total_bytes = sum(size for _, size, _ in files)
+
+        removed = 0
+        if len(files) > self.max_entries or total_bytes > self.max_bytes:
+            max_entries = int(self.max_entries * self.EVICT_TO)
+            max_bytes = int(self.max_bytes * self.EVICT_TO)
+        else:
+            max_entries, max_bytes = len(files), total_bytes
+
+        files.sort()  # Oldest access first
+        while removed < len(files) and (len(files) - removed > max_entries or total_bytes > max_bytes):
+            _, size, path = files[removed]
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total_bytes -= size
+            removed += 1
+
+        with self._lock:
+            self._reset_totals(files[removed:])
+
+    def clear(self) -> None:
+        """Remove every cached entry"""
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                if name.endswith('.json'):
+                    os.remove(os.path.join(root, name))
+        with self._lock:
+            self._reset_totals([])
@@ -0,0 +1,474 @@
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+from recency import RecencyStats
+from season_dates import all_star_break, parse_game_date, regular_season_start, season_end_year
+
+
+class GameLog:
+    """
+    Columnar view of a player's game log.
+
+    Each stat is a contiguous float64 array and opponents are stored as integer
+    codes into self.teams, so per-team filters and hit counts are vectorized
+    masks instead of loops over per-game dicts. PRA is precomputed as its own
+    column. Dates are kept as ordinals with a date-sorted index, so date range
+    filters are bisect slices.
+    """
+
+    STAT_COLUMNS = ('points', 'rebounds', 'assists', 'threes')
+
+    def __init__(self, dates: List[str], teams: List[str], opponent_codes: np.ndarray,
+                 stats: Dict[str, np.ndarray], ordinals: Optional[np.ndarray] = None,
+                 seasons: Optional[np.ndarray] = None):
+        self.dates = dates
+        current = season_end_year()
+        self.seasons = seasons if seasons is not None else np.full(len(dates), current, dtype=np.int32)
+        if ordinals is None:
+            ordinals = np.array([_ordinal(text, season) for text, season in zip(dates, self.seasons.tolist())],
+                                dtype=np.int64)
+        self.ordinals = ordinals
+        # Game indices in date order and the matching sorted ordinals, for bisecting
+        self.date_order = np.argsort(ordinals, kind='stable')
+        self.sorted_ordinals = ordinals[self.date_order].tolist()
+        self.teams = teams
+        self.team_codes = {team: code for code, team in enumerate(teams)}
+        self.opponent_codes = opponent_codes
+        self.stats = stats
+        self._records = None
+        self._opponent_index = None
+        self._recency = None
+
+    @classmethod
+    def from_records(cls, games: List[Dict]) -> 'GameLog':
+        """Build the columns from the list-of-dicts game records"""
+        teams = []
+        team_codes = {}
+        codes = np.empty(len(games), dtype=np.int32)
+        for i, game in enumerate(games):
+            opponent = game['opponent']
+            if opponent not in team_codes:
+                team_codes[opponent] = len(teams)
+                teams.append(opponent)
+            codes[i] = team_codes[opponent]
+
+        stats = {}
+        for column in cls.STAT_COLUMNS:
+            if not games or column in games[0]:
+                stats[column] = np.fromiter((game[column] for game in games), dtype=np.float64, count=len(games))
+        if all(column in stats for column in ('points', 'rebounds', 'assists')):
+            stats['pra'] = stats['points'] + stats['rebounds'] + stats['assists']
+
+        current = season_end_year()
+        seasons = np.fromiter((game.get('season', current) for game in games), dtype=np.int32, count=len(games))
+        ordinals = np.fromiter(
+            (game.get('ordinal') or _ordinal(game['date'], season) for game, season in zip(games, seasons.tolist())),
+            dtype=np.int64, count=len(games)
+        )
+
+        log = cls([game['date'] for game in games], teams, codes, stats, ordinals, seasons)
+        log._records = games
+        return log
+
+    def extend(self, games: List[Dict]) -> 'GameLog':
+        """
+        A GameLog with newly played games added in front (ESPN lists newest first).
+
+        Columns are concatenated rather than rebuilt from dicts, and when every
+        new game is at least as recent as the newest one already here, this
+        log's RecencyStats are handed over and append()ed to instead of being
+        rebuilt. This log then rebuilds its own recency if it is asked again.
+        """
+        if not games:
+            return self
+        added = GameLog.from_records(games)
+
+        teams = list(self.teams)
+        team_codes = dict(self.team_codes)
+        remap = np.empty(len(added.teams), dtype=np.int32)
+        for code, team in enumerate(added.teams):
+            if team not in team_codes:
+                team_codes[team] = len(teams)
+                teams.append(team)
+            remap[code] = team_codes[team]
+
+        log = GameLog(
+            added.dates + self.dates,
+            teams,
+            np.concatenate([remap[added.opponent_codes], self.opponent_codes]),
+            {key: np.concatenate([added.stats[key], values]) for key, values in self.stats.items()},
+            np.concatenate([added.ordinals, self.ordinals]),
+            np.concatenate([added.seasons, self.seasons])
+        )
+
+        recency = self._recency
+        if recency is not None and (not len(self) or added.sorted_ordinals[0] >= self.sorted_ordinals[-1]):
+            self._recency = None
+            for i in added.date_order.tolist():
+                recency.append({key: values[i] for key, values in added.stats.items()})
+            log._recency = recency
+        return log
+
+    def updated(self, games: List[Dict]) -> 'GameLog':
+        """
+        The GameLog for a fresh fetch of the game list this log was built from.
+
+        When the fresh list is this one with new games on top, only those are
+        added (see extend); any other change, like a corrected stat line,
+        rebuilds the log.
+        """
+        new = len(games) - len(self)
+        if new >= 0 and self._same_games(games[new:]):
+            return self.extend(games[:new])
+        return GameLog.from_records(games)
+
+    def _same_games(self, games: List[Dict]) -> bool:
+        """Whether game records hold exactly this log's games, in the same order"""
+        if [game['date'] for game in games] != self.dates:
+            return False
+        if not games:
+            return True
+        if [game['opponent'] for game in games] != [self.teams[code] for code in self.opponent_codes.tolist()]:
+            return False
+        # PRA is derived from the other columns, so it cannot differ on its own
+        return all(
+            key in games[0] and np.array_equal(
+                np.fromiter((game[key] for game in games), dtype=np.float64, count=len(games)), values
+            )
+            for key, values in self.stats.items() if key != 'pra'
+        )
+
+    @classmethod
+    def coerce(cls, games: Union[List[Dict], 'GameLog']) -> 'GameLog':
+        """Accept either a GameLog or the legacy list of game dicts"""
+        return games if isinstance(games, GameLog) else cls.from_records(games)
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def stat(self, stat_key: str, missing_as_zero: bool = False) -> np.ndarray:
+        """
+        Get a stat column.
+
+        Stats the game log does not track raise KeyError, like indexing a game
+        dict would, unless missing_as_zero is set.
+        """
+        if stat_key in self.stats:
+            return self.stats[stat_key]
+        if missing_as_zero:
+            return np.zeros(len(self), dtype=np.float64)
+        raise KeyError(stat_key)
+
+    @property
+    def opponent_index(self) -> List[np.ndarray]:
+        """
+        Game indices grouped by opponent code, built once per game log.
+
+        A single stable sort groups every opponent's games while keeping them
+        in game-log order, so each per-team analysis reads its slice instead of
+        rescanning the season.
+        """
+        if self._opponent_index is None:
+            order = np.argsort(self.opponent_codes, kind='stable')
+            counts = np.bincount(self.opponent_codes, minlength=len(self.teams))
+            self._opponent_index = np.split(order, np.cumsum(counts)[:-1]) if len(self.teams) else []
+        return self._opponent_index
+
+    @property
+    def recency(self) -> 'RecencyStats':
+        """Prefix-sum windows and decayed stats over this log, built once"""
+        if self._recency is None:
+            self._recency = RecencyStats.from_game_log(self)
+        return self._recency
+
+    def opponent_indices(self, team: str) -> np.ndarray:
+        """Indices of the games played against a team, in game-log order"""
+        code = self.team_codes.get(team)
+        if code is None:
+            return np.empty(0, dtype=np.intp)
+        return self.opponent_index[code]
+
+    def dates_at(self, indices: np.ndarray) -> List[str]:
+        return [self.dates[i] for i in indices.tolist()]
+
+    def between(self, start: Optional[date] = None, end: Optional[date] = None) -> np.ndarray:
+        """Indices (in game-log order) of games played from start to end inclusive"""
+        lo = bisect_left(self.sorted_ordinals, start.toordinal()) if start else 0
+        hi = bisect_right(self.sorted_ordinals, end.toordinal()) if end else len(self.sorted_ordinals)
+        return np.sort(self.date_order[lo:hi])
+
+    def regular_season(self) -> np.ndarray:
+        """Indices of games on or after each season's regular-season start"""
+        parts = []
+        for season in np.unique(self.seasons).tolist():
+            in_range = self.between(regular_season_start(season), date(season, 6, 30))
+            parts.append(in_range[self.seasons[in_range] == season])
+        return np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.intp)
+
+    def since_all_star_break(self, season: Optional[int] = None) -> np.ndarray:
+        """Indices of games after the All-Star break of a season (the newest one by default)"""
+        season = season or (int(self.seasons.max()) if len(self) else season_end_year())
+        return self.between(all_star_break(season) + timedelta(days=1), date(season, 6, 30))
+
+    def last_days(self, days: int, today: Optional[date] = None) -> np.ndarray:
+        """Indices of games in the last `days` days up to today"""
+        today = today or date.today()
+        return self.between(today - timedelta(days=days - 1), today)
+
+    def date_filter(self, spec: str, today: Optional[date] = None) -> np.ndarray:
+        """
+        Indices for a named date window.
+
+        :param spec: 'regular_season', 'since_all_star' or 'last_<N>_days'.
+        """
+        if spec == 'regular_season':
+            return self.regular_season()
+        if spec == 'since_all_star':
+            return self.since_all_star_break()
+        if spec.startswith('last_') and spec.endswith('_days'):
+            return self.last_days(int(spec[5:-5]), today)
+        raise ValueError(f"Unknown date filter: {spec}")
+
+    def subset(self, indices: np.ndarray) -> 'GameLog':
+        """A GameLog of only the given games, keeping game-log order"""
+        indices = np.sort(np.asarray(indices, dtype=np.intp))
+        codes = self.opponent_codes[indices]
+        used = np.unique(codes)
+        remap = np.zeros(len(self.teams), dtype=np.int32)
+        remap[used] = np.arange(len(used), dtype=np.int32)
+        return GameLog(
+            self.dates_at(indices),
+            [self.teams[code] for code in used.tolist()],
+            remap[codes] if len(codes) else codes,
+            {key: values[indices] for key, values in self.stats.items()},
+            self.ordinals[indices],
+            self.seasons[indices]
+        )
+
+    def aggregate(self, stat_key: str, prop_value: float, is_over: bool,
+                  missing_as_zero: bool = False) -> 'OpponentAggregates':
+        """Single-pass per-opponent aggregates for one stat and line"""
+        return OpponentAggregates(self, stat_key, prop_value, is_over, missing_as_zero)
+
+    def ladder(self, stat_key: str) -> 'LineLadder':
+        """Sorted per-opponent values for answering many lines at once"""
+        return LineLadder(self, stat_key)
+
+    def stat_index(self, stat_key: str) -> 'StatIndex':
+        """Line-independent per-opponent aggregates for one stat"""
+        return StatIndex(self, stat_key)
+
+    def to_records(self) -> List[Dict]:
+        """List-of-dicts view matching get_player_games output"""
+        if self._records is None:
+            columns = {key: values.tolist() for key, values in self.stats.items()}
+            self._records = [
+                {
+                    'date': date_text,
+                    'ordinal': ordinal,
+                    'opponent': self.teams[code],
+                    **{key: values[i] for key, values in columns.items()}
+                }
+                for i, (date_text, ordinal, code) in enumerate(zip(self.dates, self.ordinals.tolist(),
+                                                                    self.opponent_codes.tolist()))
+            ]
+        return self._records
+
+
+def _ordinal(date_text: str, season: int) -> int:
+    """Ordinal of a year-less game date; 0 when it cannot be parsed"""
+    game_day = parse_game_date(date_text, season)
+    return game_day.toordinal() if game_day else 0
+
+
+def hit_mask(values: np.ndarray, prop_value: float, is_over: bool) -> np.ndarray:
+    """Which values clear the line in the requested direction"""
+    return values > prop_value if is_over else values < prop_value
+
+
+def team_summary_block(games_played: int, total: float, hit_count: int, dates: Iterable[str] = (),
+                       values: Iterable[float] = (), hits: Iterable[bool] = ()) -> Dict:
+    """
+    games_played/average/hit_rate/performances block for one opponent.
+
+    Shared by every aggregates class (in memory, snapshot and SQL) so their
+    results keep the same shape; dates, values and hits are the opponent's
+    games in game-log order.
+    """
+    if not games_played:
+        return {
+            "games_played": 0,
+            "average": 0,
+            "hit_rate": 0,
+            "hit_count": 0,
+            "performances": []
+        }
+    hit_count = int(hit_count)
+    return {
+        "games_played": games_played,
+        "average": float(total) / games_played,
+        "hit_rate": (hit_count / games_played) * 100,
+        "hit_count": hit_count,
+        "performances": [
+            {'date': date_text, 'value': value, 'hit': bool(hit)}
+            for date_text, value, hit in zip(dates, values, hits)
+        ]
+    }
+
+
+def season_summary_block(games_played: int, total: float, hits: int) -> Dict:
+    """Season-wide block matching calculate_overall_stats, shared like team_summary_block"""
+    hits = int(hits)
+    return {
+        "games_played": games_played,
+        "season_average": float(total) / games_played if games_played > 0 else 0,
+        "season_hit_rate": (hits / games_played * 100) if games_played > 0 else 0,
+        "season_hits": hits
+    }
+
+
+class OpponentAggregates:
+    """
+    Per-opponent sums, counts and hit counts for one stat and line.
+
+    Everything is computed in a single bincount pass over the game log; the
+    season, direct matchup, surrounding-team and cross-conference blocks of a
+    full analysis are all read from these arrays.
+    """
+
+    def __init__(self, log: GameLog, stat_key: str, prop_value: float, is_over: bool,
+                 missing_as_zero: bool = False):
+        self.log = log
+        self.values = log.stat(stat_key, missing_as_zero)
+        self.hits = hit_mask(self.values, prop_value, is_over)
+
+        num_teams = len(log.teams)
+        self.counts = np.bincount(log.opponent_codes, minlength=num_teams)
+        self.sums = np.bincount(log.opponent_codes, weights=self.values, minlength=num_teams)
+        self.hit_counts = np.bincount(log.opponent_codes, weights=self.hits, minlength=num_teams).astype(np.int64)
+
+    def team_summary(self, team: str) -> Dict:
+        """games_played/average/hit_rate/performances block for one opponent"""
+        code = self.log.team_codes.get(team)
+        games_played = int(self.counts[code]) if code is not None else 0
+        if not games_played:
+            return team_summary_block(0, 0, 0)
+
+        indices = self.log.opponent_index[code]
+        return team_summary_block(games_played, self.sums[code], self.hit_counts[code],
+                                  self.log.dates_at(indices), self.values[indices].tolist(),
+                                  self.hits[indices].tolist())
+
+    def season_summary(self) -> Dict:
+        """Season-wide block matching calculate_overall_stats"""
+        return season_summary_block(int(self.counts.sum()), self.sums.sum(), self.hit_counts.sum())
+
+
+class LineLadder:
+    """
+    Sorted stat values for the whole season and for each opponent.
+
+    Sorting happens once per stat; after that the over and under hit counts
+    for any number of lines are binary searches (np.searchsorted), so each
+    extra line costs O(log n) instead of another full analysis.
+    """
+
+    def __init__(self, log: GameLog, stat_key: str):
+        self.log = log
+        values = log.stat(stat_key)
+        self.season = np.sort(values)
+        self.by_team = [np.sort(values[indices]) for indices in log.opponent_index]
+
+    def _group(self, team: Optional[str]) -> np.ndarray:
+        if team is None:
+            return self.season
+        code = self.log.team_codes.get(team)
+        return self.by_team[code] if code is not None else self.season[:0]
+
+    def hit_counts(self, prop_values: np.ndarray, team: Optional[str] = None) -> Dict:
+        """
+        Over and under hit counts for every line against one group of games.
+
+        :param prop_values: Lines to evaluate.
+        :param team: Opponent to restrict to, or None for the whole season.
+        :return: games_played plus per-line "over" and "under" hit count arrays.
+        """
+        group = self._group(team)
+        lines = np.asarray(prop_values, dtype=np.float64)
+        games_played = len(group)
+        return {
+            "games_played": games_played,
+            # Strictly above the line / strictly below the line
+            "over": games_played - np.searchsorted(group, lines, side='right'),
+            "under": np.searchsorted(group, lines, side='left')
+        }
+
+    def hit_rates(self, prop_values: np.ndarray, team: Optional[str] = None) -> Dict:
+        """Same as hit_counts but as percentages (0 when no games were played)"""
+        counts = self.hit_counts(prop_values, team)
+        games_played = counts["games_played"]
+        if not games_played:
+            return {"games_played": 0, "over": counts["over"] * 0.0, "under": counts["under"] * 0.0}
+        return {
+            "games_played": games_played,
+            "over": counts["over"] / games_played * 100,
+            "under": counts["under"] / games_played * 100
+        }
+
+
+class StatIndex:
+    """
+    Line-independent per-opponent aggregates for one stat.
+
+    Counts and sums per opponent and the sorted values behind a LineLadder
+    are computed once (e.g. by the nightly warmer). at_line() then answers any
+    line with binary searches, touching only the teams an analysis asks for.
+    """
+
+    def __init__(self, log: GameLog, stat_key: str):
+        self.log = log
+        self.values = log.stat(stat_key)
+        num_teams = len(log.teams)
+        self.counts = np.bincount(log.opponent_codes, minlength=num_teams)
+        self.sums = np.bincount(log.opponent_codes, weights=self.values, minlength=num_teams)
+        self.ladder = LineLadder(log, stat_key)
+
+    def at_line(self, prop_value: float, is_over: bool) -> 'LineAggregates':
+        return LineAggregates(self, prop_value, is_over)
+
+
+class LineAggregates:
+    """OpponentAggregates-compatible view of a StatIndex at one line"""
+
+    def __init__(self, index: StatIndex, prop_value: float, is_over: bool):
+        self.index = index
+        self.log = index.log
+        self.prop_value = prop_value
+        self.is_over = is_over
+
+    def _hit_count(self, group: np.ndarray) -> int:
+        if self.is_over:
+            return len(group) - int(np.searchsorted(group, self.prop_value, side='right'))
+        return int(np.searchsorted(group, self.prop_value, side='left'))
+
+    def team_summary(self, team: str) -> Dict:
+        """games_played/average/hit_rate/performances block for one opponent"""
+        code = self.log.team_codes.get(team)
+        games_played = int(self.index.counts[code]) if code is not None else 0
+        if not games_played:
+            return team_summary_block(0, 0, 0)
+
+        indices = self.log.opponent_index[code]
+        values = self.index.values[indices]
+        return team_summary_block(games_played, self.index.sums[code],
+                                  self._hit_count(self.index.ladder.by_team[code]),
+                                  self.log.dates_at(indices), values.tolist(),
+                                  hit_mask(values, self.prop_value, self.is_over).tolist())
+
+    def season_summary(self) -> Dict:
+        """Season-wide block matching calculate_overall_stats"""
+        return season_summary_block(int(self.index.counts.sum()), self.index.sums.sum(),
+                                    self._hit_count(self.index.ladder.season))
@@ -0,0 +1,97 @@
+import threading
+from collections.abc import Mapping
+from typing import Callable, Dict, Iterable
+
+# Components of a full analysis, in the order the eager result lists them
+ANALYSIS_COMPONENTS = ('overall_stats', 'direct_matchup', 'surrounding_teams', 'cross_conference', 'final_probability')
+
+# Components that need the standings page
+STANDINGS_COMPONENTS = frozenset({'surrounding_teams', 'cross_conference', 'final_probability'})
+
+
+def check_components(components: Iterable[str]) -> list:
+    """Validate requested component names, keeping their order and dropping repeats"""
+    components = list(dict.fromkeys(components))
+    unknown = [name for name in components if name not in ANALYSIS_COMPONENTS]
+    if unknown:
+        raise ValueError(f"Unknown analysis components: {', '.join(unknown)} "
+                         f"(choose from {', '.join(ANALYSIS_COMPONENTS)})")
+    return components
+
+
+class LazyAnalysis(Mapping):
+    """
+    Analysis result whose components are computed on first access.
+
+    Each entry of `compute` takes this object and returns a
+    {"success", "data"/"error"} result, so components can resolve what they
+    depend on (final_probability pulls in the others, the standings-based
+    ones pull in the hidden 'standings' entry). Results are kept, so nothing
+    is computed twice.
+
+    Reads like the eager analysis's data dict: indexing gives a component's
+    data, or its {"success": False, "error"} result if it failed, so .get()
+    and dict() work on any outcome. It is not a dict, though; serialize
+    to_dict() rather than the object itself.
+    """
+
+    def __init__(self, compute: Dict[str, Callable[['LazyAnalysis'], Dict]]):
+        self._compute = compute
+        self._results: Dict[str, Dict] = {}
+        # Re-entrant: components resolve their dependencies while holding it
+        self._lock = threading.RLock()
+
+    def result(self, name: str) -> Dict:
+        """{"success", "data"/"error"} result of a component or internal dependency, computing it if needed"""
+        with self._lock:
+            if name not in self._results:
+                try:
+                    self._results[name] = self._compute[name](self)
+                except Exception as e:
+                    self._results[name] = {"success": False, "error": str(e)}
+            return self._results[name]
+
+    def resolve(self, name: str):
+        """Data of a component or internal dependency; raises ValueError with its error if it failed"""
+        result = self.result(name)
+        if not result["success"]:
+            raise ValueError(result["error"])
+        return result["data"]
+
+    def provide(self, name: str, result: Dict) -> None:
+        """Supply a dependency's result obtained elsewhere (e.g. standings fetched asynchronously)"""
+        with self._lock:
+            self._results.setdefault(name, result)
+
+    def has(self, name: str) -> bool:
+        """Whether a component or dependency has been computed (or provided) already"""
+        return name in self._results
+
+    def __getitem__(self, name: str):
+        if name not in ANALYSIS_COMPONENTS:
+            raise KeyError(name)
+        result = self.result(name)
+        return result["data"] if result["success"] else result
+
+    def __iter__(self):
+        return iter(ANALYSIS_COMPONENTS)
+
+    def __len__(self) -> int:
+        return len(ANALYSIS_COMPONENTS)
+
+    def __contains__(self, name) -> bool:
+        # Mapping's default would compute the component just to test membership
+        return name in ANALYSIS_COMPONENTS
+
+    @property
+    def computed(self) -> list:
+        """Components computed so far"""
+        return [name for name in ANALYSIS_COMPONENTS if name in self._results]
+
+    def to_dict(self) -> Dict:
+        """
+        Every component, computed now, as a plain dict of the same shape as the
+        eager result's data. Use this for json.dumps, which does not accept
+        the lazy object.
+        """
+        return {name: self[name] for name in ANALYSIS_COMPONENTS}
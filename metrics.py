@@ -0,0 +1,173 @@
+import json
+import logging
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger('props.metrics')
+
+# Histogram bucket upper bounds in seconds, from a cache hit to a slow upstream page
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict[str, str]) -> LabelKey:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+class _Stage:
+    """Context manager timing one block; a class is cheaper than a generator here"""
+
+    __slots__ = ('metrics', 'name', 'labels', 'start')
+
+    def __init__(self, metrics: 'Metrics', name: str, labels: Dict):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.observe(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class Metrics:
+    """
+    Stage timers and counters for the analyzer.
+
+    stage() times a block into a per-stage histogram, incr() bumps a counter.
+    Everything can be exported as Prometheus text (to_prometheus) and, when
+    log_events is set, each finished stage is also logged as a JSON event on
+    the 'props.metrics' logger.
+    """
+
+    enabled = True
+
+    def __init__(self, log_events: bool = False, prefix: str = 'props'):
+        self.log_events = log_events
+        self.prefix = prefix
+        self._counters: Dict[LabelKey, float] = {}
+        self._histograms: Dict[LabelKey, list] = {}
+        self._lock = threading.Lock()
+
+    def stage(self, name: str, **labels) -> _Stage:
+        """Time the enclosed block as one observation of a stage"""
+        return _Stage(self, name, labels)
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                # Per-bucket counts (the last one is +Inf), then the total count and sum
+                histogram = self._histograms[key] = [0] * (len(STAGE_BUCKETS) + 1) + [0, 0.0]
+            histogram[bisect_left(STAGE_BUCKETS, seconds)] += 1
+            histogram[-2] += 1
+            histogram[-1] += seconds
+
+        if self.log_events:
+            logger.info(json.dumps({"event": "stage", "stage": name, "seconds": round(seconds, 6), **labels}))
+
+    def incr(self, name: str, value: float = 1, **labels) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def snapshot(self) -> Dict:
+        """Counters and per-stage count/total seconds as plain JSON-friendly data"""
+        with self._lock:
+            counters = {self._flat_name(key): value for key, value in self._counters.items()}
+            stages = {
+                self._flat_name(key): {"count": histogram[-2], "seconds": histogram[-1]}
+                for key, histogram in self._histograms.items()
+            }
+        return {"counters": counters, "stages": stages}
+
+    @staticmethod
+    def _flat_name(key: LabelKey) -> str:
+        name, labels = key
+        return name + ''.join(f".{value}" for _, value in labels)
+
+    def to_prometheus(self) -> str:
+        """Render everything in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items())
+
+        seen = set()
+        for (name, labels), value in counters:
+            metric = f"{self.prefix}_{name}_total"
+            if metric not in seen:
+                seen.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{_format_labels(labels)} {value:g}")
+
+        metric = f"{self.prefix}_stage_seconds"
+        if histograms:
+            lines.append(f"# TYPE {metric} histogram")
+        for (name, labels), histogram in histograms:
+            stage_labels = (('stage', name),) + labels
+            cumulative = 0
+            for bound, count in zip(STAGE_BUCKETS, histogram):
+                cumulative += count
+                lines.append(f"{metric}_bucket{_format_labels(stage_labels, (('le', f'{bound:g}'),))} {cumulative}")
+            lines.append(f"{metric}_bucket{_format_labels(stage_labels, (('le', '+Inf'),))} {histogram[-2]}")
+            lines.append(f"{metric}_count{_format_labels(stage_labels)} {histogram[-2]}")
+            lines.append(f"{metric}_sum{_format_labels(stage_labels)} {histogram[-1]:.6f}")
+
+        return '\n'.join(lines) + '\n'
+
+
+class NullMetrics(Metrics):
+    """Disabled metrics: every hook is a no-op and stage() returns a shared null context"""
+
+    enabled = False
+    _NULL_STAGE = nullcontext()
+
+    def stage(self, name: str, **labels):
+        return self._NULL_STAGE
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        pass
+
+    def incr(self, name: str, value: float = 1, **labels) -> None:
+        pass
+
+
+NULL_METRICS = NullMetrics()
+
+
+def configure_event_logging(stream=None) -> None:
+    """Send the JSON stage events to stderr (or stream), one per line"""
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+
+def write_prometheus(metrics: Metrics, path: Optional[str]) -> None:
+    """Write the Prometheus text to a file (for node_exporter's textfile collector), or to stderr for '-'"""
+    if not path or not metrics.enabled:
+        return
+    text = metrics.to_prometheus()
+    if path == '-':
+        sys.stderr.write(text)
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
@@ -0,0 +1,276 @@
+import codecs
+from html.parser import HTMLParser
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # lxml is optional
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:  # selectolax is optional, and older releases lack lexbor
+    try:
+        from selectolax.parser import HTMLParser as SelectolaxParser
+    except ImportError:
+        SelectolaxParser = None
+
+
+# (table index, row text, cell texts) for every <tr> inside a table.Table
+TableRow = Tuple[int, str, List[str]]
+
+
+class ParserBackend:
+    """
+    Turns an ESPN page into the rows of its table.Table elements.
+
+    Every backend yields the same TableRow tuples so the standings and game log
+    parsers produce identical records whichever backend is in use. Row text
+    matches BeautifulSoup's get_text(strip=True) and cell text matches
+    cell.text.strip().
+    """
+
+    name = 'base'
+
+    def iter_rows(self, content: bytes) -> Iterator[TableRow]:
+        raise NotImplementedError
+
+
+class BeautifulSoupBackend(ParserBackend):
+    """Original full-document parse with html.parser"""
+
+    name = 'bs4'
+
+    def _soup(self, content: bytes) -> BeautifulSoup:
+        return BeautifulSoup(content, 'html.parser')
+
+    def iter_rows(self, content: bytes) -> Iterator[TableRow]:
+        soup = self._soup(content)
+        for table_index, table in enumerate(soup.find_all('table', class_='Table')):
+            for row in table.find_all('tr'):
+                cells = [cell.text.strip() for cell in row.find_all('td')]
+                yield table_index, row.get_text(strip=True), cells
+
+
+class SoupStrainerBackend(BeautifulSoupBackend):
+    """BeautifulSoup that only builds table.Table subtrees"""
+
+    name = 'bs4-tables'
+
+    def _soup(self, content: bytes) -> BeautifulSoup:
+        # Class filtering happens in find_all; strainers match the raw class string
+        only_tables = SoupStrainer('table')
+        return BeautifulSoup(content, 'lxml' if lxml else 'html.parser', parse_only=only_tables)
+
+
+class LxmlBackend(ParserBackend):
+    """libxml2 parse, walking only table.Table subtrees"""
+
+    name = 'lxml'
+
+    TABLE_XPATH = "//table[contains(concat(' ', normalize-space(@class), ' '), ' Table ')]"
+
+    def iter_rows(self, content: bytes) -> Iterator[TableRow]:
+        parser = lxml.html.HTMLParser(encoding='utf-8')
+        doc = lxml.html.document_fromstring(content, parser=parser)
+        for table_index, table in enumerate(doc.xpath(self.TABLE_XPATH)):
+            for row in table.iter('tr'):
+                row_text = ''.join(text.strip() for text in row.itertext())
+                cells = [cell.text_content().strip() for cell in row.iter('td')]
+                yield table_index, row_text, cells
+
+
+class SelectolaxBackend(ParserBackend):
+    """Lexbor-based parse, walking only table.Table subtrees"""
+
+    name = 'selectolax'
+
+    def iter_rows(self, content: bytes) -> Iterator[TableRow]:
+        tree = SelectolaxParser(content)
+        for table_index, table in enumerate(tree.css('table.Table')):
+            for row in table.css('tr'):
+                row_text = row.text(deep=True, separator='', strip=True)
+                cells = [cell.text(deep=True).strip() for cell in row.css('td')]
+                yield table_index, row_text, cells
+
+
+class _RowCollector(HTMLParser):
+    """
+    Event-driven html.parser handler that assembles table.Table rows.
+
+    Completed rows are queued in self.rows as they close; nothing else on the
+    page is kept.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows: List[TableRow] = []
+        self.table_index = -1
+        self.table_depth = 0  # Depth inside the current table.Table, 0 when outside
+        self.skip_depth = 0   # Inside <script>/<style>, whose text get_text() ignores
+        self.row_texts = None
+        self.cells = None
+        self.cell_text = None
+        self.pending = []     # Current text node, which may arrive in pieces
+
+    def _flush_text(self):
+        if not self.pending:
+            return
+        text = ''.join(self.pending)
+        self.pending = []
+        if self.row_texts is not None and text.strip():
+            self.row_texts.append(text.strip())
+        if self.cell_text is not None:
+            self.cell_text.append(text)
+
+    def _close_cell(self):
+        if self.cell_text is not None:
+            self.cells.append(''.join(self.cell_text).strip())
+            self.cell_text = None
+
+    def _close_row(self):
+        self._close_cell()
+        if self.row_texts is not None:
+            self.rows.append((self.table_index, ''.join(self.row_texts), self.cells))
+            self.row_texts = None
+            self.cells = None
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        if tag in ('script', 'style'):
+            self.skip_depth += 1
+            return
+        if tag == 'table':
+            if self.table_depth:
+                self.table_depth += 1
+            elif 'Table' in (dict(attrs).get('class') or '').split():
+                self.table_index += 1
+                self.table_depth = 1
+            return
+        if not self.table_depth:
+            return
+        if tag == 'tr':
+            self._close_row()
+            self.row_texts = []
+            self.cells = []
+        elif tag == 'td' and self.cells is not None:
+            self._close_cell()
+            self.cell_text = []
+
+    def handle_endtag(self, tag):
+        self._flush_text()
+        if tag in ('script', 'style'):
+            self.skip_depth = max(0, self.skip_depth - 1)
+            return
+        if not self.table_depth:
+            return
+        if tag == 'td':
+            self._close_cell()
+        elif tag == 'tr':
+            self._close_row()
+        elif tag == 'table':
+            self.table_depth -= 1
+            if not self.table_depth:
+                self._close_row()
+
+    def handle_data(self, data):
+        if self.table_depth and not self.skip_depth:
+            self.pending.append(data)
+
+
+class StreamingBackend(ParserBackend):
+    """
+    Incremental row parser that never builds the full document tree.
+
+    Rows are yielded as soon as they close, and the page is fed in chunks, so
+    a consumer that stops iterating (e.g. at the game log's season totals
+    marker) also stops the parser reading the rest of the page. Uses lxml's
+    pull parser when available and html.parser otherwise.
+    """
+
+    name = 'stream'
+
+    CHUNK_SIZE = 16 * 1024
+
+    def _chunks(self, content: Union[bytes, Iterable[bytes]]) -> Iterator[bytes]:
+        if isinstance(content, (bytes, bytearray)):
+            for start in range(0, len(content), self.CHUNK_SIZE):
+                yield content[start:start + self.CHUNK_SIZE]
+        else:
+            yield from content
+
+    def iter_rows(self, content: Union[bytes, Iterable[bytes]]) -> Iterator[TableRow]:
+        if lxml:
+            return self._iter_rows_lxml(content)
+        return self._iter_rows_stdlib(content)
+
+    def _iter_rows_lxml(self, content) -> Iterator[TableRow]:
+        parser = etree.HTMLPullParser(events=('start', 'end'), encoding='utf-8')
+        table_index = -1
+        table_depth = 0
+
+        for chunk in self._chunks(content):
+            parser.feed(chunk)
+            for event, element in parser.read_events():
+                tag = element.tag
+                if event == 'start':
+                    if tag == 'table':
+                        if table_depth:
+                            table_depth += 1
+                        elif 'Table' in (element.get('class') or '').split():
+                            table_index += 1
+                            table_depth = 1
+                    continue
+
+                if table_depth:
+                    if tag == 'tr':
+                        row_text = ''.join(text.strip() for text in element.itertext())
+                        cells = [''.join(cell.itertext()).strip() for cell in element.iter('td')]
+                        yield table_index, row_text, cells
+                        element.clear()
+                    elif tag == 'table':
+                        table_depth -= 1
+                        if not table_depth:
+                            element.clear()
+                else:
+                    # Drop finished content outside the tables to keep memory flat
+                    element.clear()
+
+    def _iter_rows_stdlib(self, content) -> Iterator[TableRow]:
+        collector = _RowCollector()
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+        for chunk in self._chunks(content):
+            collector.feed(decoder.decode(chunk))
+            yield from collector.rows
+            collector.rows = []
+
+        collector.feed(decoder.decode(b'', final=True))
+        collector.close()
+        yield from collector.rows
+
+
+BACKENDS: Dict[str, type] = {
+    BeautifulSoupBackend.name: BeautifulSoupBackend,
+    SoupStrainerBackend.name: SoupStrainerBackend,
+    StreamingBackend.name: StreamingBackend,
+}
+if lxml:
+    BACKENDS[LxmlBackend.name] = LxmlBackend
+if SelectolaxParser:
+    BACKENDS[SelectolaxBackend.name] = SelectolaxBackend
+
+# Fastest first; 'auto' picks the first one installed
+PREFERRED_BACKENDS = ['selectolax', 'lxml', 'bs4-tables', 'bs4']
+
+
+def get_backend(name: str = 'auto') -> ParserBackend:
+    """Create a parser backend by name, or the fastest available for 'auto'"""
+    if name == 'auto':
+        name = next(backend for backend in PREFERRED_BACKENDS if backend in BACKENDS)
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown or unavailable parser backend: {name}")
+    return BACKENDS[name]()
@@ -0,0 +1,100 @@
+import difflib
+import json
+import os
+import re
+import threading
+import unicodedata
+from typing import Dict, Iterable, Optional
+
+
+class PlayerIndex:
+    """
+    Local name -> ESPN id directory.
+
+    Names are keyed by a normalized form (accents, punctuation, case and
+    suffixes like "Jr." removed) so "Nikola Jokic" and "Nikola Jokić" resolve
+    to the same entry with a single dict lookup. Fuzzy matching is only tried
+    when the exact normalized key is missing.
+    """
+
+    SUFFIXES = {'jr', 'sr', 'ii', 'iii', 'iv', 'v'}
+
+    def __init__(self, path: Optional[str] = None, fuzzy_cutoff: float = 0.9):
+        self.path = path
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.players: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self.load()
+
+    @classmethod
+    def normalize(cls, name: str) -> str:
+        """Reduce a player name to its accent-insensitive lookup key"""
+        decomposed = unicodedata.normalize('NFKD', name)
+        stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+        words = re.sub(r"[^a-z0-9 ]", ' ', stripped.lower().replace("'", '')).split()
+        while len(words) > 1 and words[-1] in cls.SUFFIXES:
+            words.pop()
+        return ' '.join(words)
+
+    def lookup(self, name: str, fuzzy: bool = True) -> Optional[Dict]:
+        """Resolve a name to its {"id", "name"} entry, or None if unknown"""
+        key = self.normalize(name)
+        entry = self.players.get(key)
+        if entry or not fuzzy or not self.players:
+            return entry
+
+        matches = difflib.get_close_matches(key, self.players.keys(), n=1, cutoff=self.fuzzy_cutoff)
+        return self.players[matches[0]] if matches else None
+
+    def add(self, name: str, player_id: str, display_name: Optional[str] = None) -> bool:
+        """
+        Add or update a player.
+
+        :return: True if the index changed.
+        """
+        key = self.normalize(name)
+        entry = {"id": str(player_id), "name": display_name or name}
+        with self._lock:
+            if self.players.get(key) == entry:
+                return False
+            self.players[key] = entry
+            return True
+
+    def update(self, records: Iterable[Dict]) -> int:
+        """
+        Merge a roster dump or search results into the index.
+
+        Records need an "id" and a "displayName" or "name". Only new or
+        changed players are written, so refreshing with a fresh roster is
+        incremental.
+
+        :return: Number of entries added or changed.
+        """
+        changed = 0
+        for record in records:
+            name = record.get('displayName') or record.get('name')
+            if not name or not record.get('id'):
+                continue
+            if self.add(name, record['id'], name):
+                changed += 1
+        if changed:
+            self.save()
+        return changed
+
+    def load(self) -> None:
+        with open(self.path, 'r', encoding='utf-8') as f:
+            self.players = json.load(f)
+
+    def save(self) -> None:
+        """Persist the index if it has a path"""
+        if not self.path:
+            return
+        with self._lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.players, f, ensure_ascii=False, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+    def __len__(self) -> int:
+        return len(self.players)
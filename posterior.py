@@ -0,0 +1,67 @@
+from typing import Dict, Optional
+
+import numpy as np
+
+
+def posterior_hit_rates(games_played: int, hit_count: int, draws: int,
+                        rng: np.random.Generator, prior: float = 0.5) -> np.ndarray:
+    """
+    Plausible hit rates for one component, drawn from its Beta posterior.
+
+    With a Beta(prior, prior) prior (Jeffreys by default) the rate behind
+    hit_count hits in games_played games is Beta(hits + prior, misses +
+    prior). Unlike resampling the games, this still spreads out for a 3/3 or
+    0/2 record, where every resample would give the same rate. One rng.beta
+    call makes all the draws; a component with no games draws 0.
+    """
+    if not games_played:
+        return np.zeros(draws)
+    return rng.beta(hit_count + prior, games_played - hit_count + prior, size=draws) * 100
+
+
+def final_probability_interval(direct_matchup: Dict, overall_stats: Dict, final_probability: Dict,
+                               draws: int = 2000, level: float = 0.9,
+                               seed: Optional[int] = None) -> Dict:
+    """
+    Bayesian credible interval for final_probability.
+
+    Only the direct matchup and overall season hit rates vary: each is drawn
+    independently from its Beta posterior (see posterior_hit_rates) and the
+    weighted probability is recomputed for every draw with the weights the
+    point estimate used. The surrounding-teams and cross-conference hit rates
+    are held fixed at the values in final_probability["hit_rates"], so their
+    uncertainty is not part of the interval. The prior pulls small samples
+    slightly towards 50%, so a short direct-matchup record widens the interval
+    instead of leaving it at zero width.
+
+    :param direct_matchup: The direct_matchup block (games_played, hit_count).
+    :param overall_stats: The overall_stats block (games_played, season_hits).
+    :param final_probability: The final_probability block (weights, hit_rates).
+    :param level: Posterior probability inside the interval, e.g. 0.9 for 5th-95th percentiles.
+    :param seed: Seed for reproducible intervals.
+    :return: level, low, high, mean, std and the number of draws.
+    """
+    rng = np.random.default_rng(seed)
+    weights = final_probability["weights"]
+    hit_rates = final_probability["hit_rates"]
+
+    direct = posterior_hit_rates(direct_matchup["games_played"], direct_matchup["hit_count"], draws, rng)
+    overall = posterior_hit_rates(overall_stats["games_played"], overall_stats["season_hits"], draws, rng)
+
+    probabilities = (
+        direct * weights["direct_matchups"]
+        + hit_rates["surrounding_teams"] * weights["surrounding_teams"]
+        + hit_rates["cross_conference"] * weights["cross_conference"]
+        + overall * weights["overall_season"]
+    ) / 100
+
+    tail = (1 - level) / 2 * 100
+    low, high = np.percentile(probabilities, [tail, 100 - tail])
+    return {
+        "level": level,
+        "low": float(low),
+        "high": float(high),
+        "mean": float(probabilities.mean()),
+        "std": float(probabilities.std()),
+        "draws": draws
+    }
@@ -0,0 +1,100 @@
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Shared request-rate limit.
+
+    Tokens refill continuously at `rate` per second up to `burst`; each
+    request takes one. acquire() blocks until a token is free, try_acquire()
+    never waits.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now >= self._paused_until and self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                else:
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for a while, e.g. for a Retry-After header"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD limit on requests in flight.
+
+    Every successful response raises the limit by 1/limit (about +1 per
+    round of requests); a throttled or failed one multiplies it by `decrease`,
+    at most once per `cooldown` seconds so a burst of errors from one overload
+    only backs off once.
+    """
+
+    def __init__(self, initial: int = 8, minimum: int = 1, maximum: int = 64,
+                 decrease: float = 0.5, cooldown: float = 1.0):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.inflight = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self.inflight >= int(self.limit):
+                self._cond.wait()
+            self.inflight += 1
+
+    def try_acquire(self) -> bool:
+        with self._cond:
+            if self.inflight >= int(self.limit):
+                return False
+            self.inflight += 1
+            return True
+
+    def release(self, ok: bool) -> None:
+        with self._cond:
+            self.inflight -= 1
+            if ok:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            else:
+                now = time.monotonic()
+                if now - self._last_decrease >= self.cooldown:
+                    self.limit = max(self.minimum, self.limit * self.decrease)
+                    self._last_decrease = now
+            self._cond.notify_all()
@@ -0,0 +1,126 @@
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+
+class RecencyStats:
+    """
+    Rolling-window and recency-weighted stats over a game log.
+
+    Games are kept oldest first. Each stat has a prefix-sum list and each
+    (stat, line, direction) asked about gets a prefix hit-count list, so the
+    last-k average or hit rate for any k is two lookups. Exponentially decayed
+    sums are carried as running totals. append() extends every structure for
+    a newly played game in O(1) per tracked series instead of rebuilding.
+    """
+
+    def __init__(self, values: Dict[str, Iterable[float]]):
+        self.values: Dict[str, List[float]] = {key: list(column) for key, column in values.items()}
+        self.prefix: Dict[str, List[float]] = {
+            key: [0.0] + np.cumsum(column, dtype=np.float64).tolist() for key, column in self.values.items()
+        }
+        self._hit_prefix: Dict[Tuple[str, float, bool], List[int]] = {}
+        # (stat, line or None, direction, half-life) -> [decayed value sum, decayed weight sum]
+        self._decayed: Dict[tuple, List[float]] = {}
+
+    @classmethod
+    def from_game_log(cls, log) -> 'RecencyStats':
+        """Build from a GameLog, putting its games in date order whatever order its rows are in"""
+        return cls({key: column[log.date_order].tolist() for key, column in log.stats.items()})
+
+    def __len__(self) -> int:
+        return len(next(iter(self.prefix.values()), [0])) - 1
+
+    def _column(self, stat_key: str) -> List[float]:
+        if stat_key not in self.values:
+            raise KeyError(stat_key)
+        return self.values[stat_key]
+
+    def _hits(self, stat_key: str, prop_value: float, is_over: bool) -> List[int]:
+        key = (stat_key, float(prop_value), bool(is_over))
+        prefix = self._hit_prefix.get(key)
+        if prefix is None:
+            column = np.asarray(self._column(stat_key), dtype=np.float64)
+            hits = column > prop_value if is_over else column < prop_value
+            prefix = self._hit_prefix[key] = [0] + np.cumsum(hits, dtype=np.int64).tolist()
+        return prefix
+
+    def window(self, stat_key: str, last: int, prop_value: float = None, is_over: bool = True) -> Dict:
+        """
+        Average (and hit rate, when a line is given) over the last `last` games.
+
+        Windows longer than the game log cover the whole log.
+        """
+        self._column(stat_key)
+        n = len(self)
+        games = min(last, n)
+        if not games:
+            summary = {"games_played": 0, "average": 0}
+            if prop_value is not None:
+                summary.update(hit_rate=0, hit_count=0)
+            return summary
+
+        prefix = self.prefix[stat_key]
+        summary = {"games_played": games, "average": (prefix[n] - prefix[n - games]) / games}
+        if prop_value is not None:
+            hits = self._hits(stat_key, prop_value, is_over)
+            hit_count = hits[n] - hits[n - games]
+            summary.update(hit_rate=hit_count / games * 100, hit_count=hit_count)
+        return summary
+
+    @staticmethod
+    def _decay(half_life: float) -> float:
+        return 0.5 ** (1 / half_life)
+
+    def _decayed_totals(self, stat_key: str, half_life: float, prop_value: float = None,
+                        is_over: bool = True) -> List[float]:
+        key = (stat_key, None if prop_value is None else float(prop_value), bool(is_over), float(half_life))
+        totals = self._decayed.get(key)
+        if totals is None:
+            column = np.asarray(self._column(stat_key), dtype=np.float64)
+            if prop_value is not None:
+                column = (column > prop_value if is_over else column < prop_value).astype(np.float64)
+            # Newest game weighs 1, the one before decay, then decay**2, ...
+            weights = self._decay(half_life) ** np.arange(len(column) - 1, -1, -1, dtype=np.float64)
+            totals = self._decayed[key] = [float(column @ weights), float(weights.sum())]
+        return totals
+
+    def decayed(self, stat_key: str, half_life: float = 10, prop_value: float = None,
+                is_over: bool = True) -> Dict:
+        """
+        Exponentially decayed average (and hit rate) where a game `half_life`
+        games old counts half as much as the latest one.
+        """
+        value_sum, weight_sum = self._decayed_totals(stat_key, half_life)
+        summary = {"half_life": half_life, "average": value_sum / weight_sum if weight_sum else 0}
+        if prop_value is not None:
+            hit_sum, weight_sum = self._decayed_totals(stat_key, half_life, prop_value, is_over)
+            summary["hit_rate"] = hit_sum / weight_sum * 100 if weight_sum else 0
+        return summary
+
+    def summary(self, stat_key: str, prop_value: float, is_over: bool,
+                windows: Iterable[int] = (5, 10, 20), half_life: float = 10) -> Dict:
+        """last_<k> blocks for every window plus the decayed block, for one line"""
+        result = {f"last_{k}": self.window(stat_key, k, prop_value, is_over) for k in windows}
+        result["decayed"] = self.decayed(stat_key, half_life, prop_value, is_over)
+        return result
+
+    def append(self, game: Dict) -> None:
+        """Add a newly played game, updating prefix sums, hit counts and decayed totals"""
+        for key, column in self.values.items():
+            value = float(game[key])
+            column.append(value)
+            self.prefix[key].append(self.prefix[key][-1] + value)
+
+        for (stat_key, prop_value, is_over), prefix in self._hit_prefix.items():
+            value = self.values[stat_key][-1]
+            prefix.append(prefix[-1] + ((value > prop_value) if is_over else (value < prop_value)))
+
+        for (stat_key, prop_value, is_over, half_life), totals in self._decayed.items():
+            value = self.values[stat_key][-1]
+            if prop_value is not None:
+                value = float(value > prop_value if is_over else value < prop_value)
+            decay = self._decay(half_life)
+            totals[0] = totals[0] * decay + value
+            totals[1] = totals[1] * decay + 1
+
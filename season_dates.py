@@ -0,0 +1,66 @@
+import re
+from datetime import date, timedelta
+from typing import Optional
+
+# Regular season tip-off used for filtering (the original cutoff was October 22)
+REGULAR_SEASON_START = (10, 22)
+
+MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
+}
+
+_NUMERIC_DATE = re.compile(r'(\d{1,2})/(\d{1,2})')
+
+
+def season_start_year(today: Optional[date] = None) -> int:
+    """Calendar year the current season started in; seasons start in October"""
+    today = today or date.today()
+    return today.year if today.month >= 10 else today.year - 1
+
+
+def season_end_year(today: Optional[date] = None) -> int:
+    """ESPN's year for the current season, i.e. the year it ends in"""
+    return season_start_year(today) + 1
+
+
+def parse_game_date(date_text: str, season: int) -> Optional[date]:
+    """
+    Turn ESPN's year-less game date into a real date.
+
+    Accepts "Sat 12/28" and "Sat Dec 28". July-December games belong to the
+    calendar year the season started in, January-June games to the year it
+    ends in.
+
+    :param season: ESPN season year (the year the season ends in).
+    :return: The date, or None when the text is not a game date.
+    """
+    match = _NUMERIC_DATE.search(date_text)
+    if match:
+        month, day = int(match.group(1)), int(match.group(2))
+    else:
+        parts = date_text.split()
+        if len(parts) < 3:
+            return None
+        month = MONTHS.get(parts[1][:3].lower(), 0)
+        try:
+            day = int(parts[2])
+        except ValueError:
+            return None
+
+    year = season - 1 if month >= 7 else season
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def regular_season_start(season: int) -> date:
+    return date(season - 1, *REGULAR_SEASON_START)
+
+
+def all_star_break(season: int) -> date:
+    """All-Star Sunday, the third Sunday of February in the season's end year"""
+    first = date(season, 2, 1)
+    first_sunday = first + timedelta(days=(6 - first.weekday()) % 7)
+    return first_sunday + timedelta(weeks=2)
@@ -0,0 +1,72 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class SeasonStore:
+    """
+    Local store of completed seasons' game logs.
+
+    Past seasons never change, so each player-season is written once as its
+    own JSON file (<dir>/<player id>/<season>.json) and then only read back.
+    Loaded seasons are also kept in memory, so repeat analyses over a
+    multi-season window cost no network and no disk reads.
+    """
+
+    def __init__(self, store_dir: str = '.props_history'):
+        self.store_dir = store_dir
+        self._loaded: Dict[tuple, List[Dict]] = {}
+        self._lock = threading.Lock()
+        os.makedirs(store_dir, exist_ok=True)
+
+    def _path(self, player_id: str, season: int) -> str:
+        return os.path.join(self.store_dir, str(player_id), f"{int(season)}.json")
+
+    def has(self, player_id: str, season: int) -> bool:
+        return (str(player_id), int(season)) in self._loaded or os.path.exists(self._path(player_id, season))
+
+    def get(self, player_id: str, season: int) -> Optional[List[Dict]]:
+        """Game records for one player-season, or None if it was never stored"""
+        key = (str(player_id), int(season))
+        with self._lock:
+            if key in self._loaded:
+                return self._loaded[key]
+
+        try:
+            with open(self._path(player_id, season), 'r', encoding='utf-8') as f:
+                games = json.load(f)["games"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+        with self._lock:
+            self._loaded[key] = games
+        return games
+
+    def put(self, player_id: str, season: int, games: List[Dict]) -> None:
+        """Store a completed season; the file is written atomically"""
+        path = self._path(player_id, season)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {
+            "player_id": str(player_id),
+            "season": int(season),
+            "stored_at": time.time(),
+            "games": games
+        }
+
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._loaded[(str(player_id), int(season))] = games
+
+    def seasons(self, player_id: str) -> List[int]:
+        """Seasons stored for a player, oldest first"""
+        try:
+            names = os.listdir(os.path.join(self.store_dir, str(player_id)))
+        except OSError:
+            return []
+        return sorted(int(name[:-5]) for name in names if name.endswith('.json') and name[:-5].isdigit())
@@ -0,0 +1,330 @@
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Union
+
+from Main import NBAPropsAnalyzer, parse_direction
+from gamelog import GameLog
+from metrics import Metrics, configure_event_logging
+from player_index import PlayerIndex
+from transport import make_transport, parse_latency
+
+
+def parse_flag(value) -> bool:
+    """Strict boolean field: true/false, 1/0 or yes/no; anything else is an error"""
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ('true', '1', 'yes', 'y'):
+        return True
+    if text in ('false', '0', 'no', 'n'):
+        return False
+    raise ValueError(f"expected true or false, got {value!r}")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one in-flight task.
+
+    Callers that arrive while a fetch is running await the same task instead
+    of starting their own, so a burst of requests for one player costs a
+    single upstream fetch.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.coalesced = 0
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # Shield so one cancelled caller does not cancel the fetch for the others
+        return await asyncio.shield(task)
+
+
+class TTLCache:
+    """Small in-process cache whose entries expire after a fixed number of seconds"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def stale(self, key: str) -> Optional[Any]:
+        """The last value stored under key, expired or not"""
+        entry = self._entries.get(key)
+        return entry[1] if entry else None
+
+    def set(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+
+
+class AnalysisService:
+    """
+    Serves analyses over shared standings and game-log caches.
+
+    Standings and each player's parsed GameLog (with its opponent index) are
+    kept in memory and shared by every request; concurrent misses for the same
+    resource are coalesced.
+    """
+
+    def __init__(self, analyzer: NBAPropsAnalyzer, standings_ttl: float = 15 * 60,
+                 gamelog_ttl: float = 10 * 60):
+        self.analyzer = analyzer
+        self.standings_cache = TTLCache(standings_ttl)
+        self.gamelog_cache = TTLCache(gamelog_ttl)
+        self.flights = SingleFlight()
+        self.upstream_fetches = 0
+
+    async def get_standings(self) -> Dict:
+        standings = self.analyzer.snapshot_standings()
+        if standings is not None:
+            return {"success": True, "data": standings}
+
+        standings = self.standings_cache.get('standings')
+        if standings is not None:
+            return {"success": True, "data": standings}
+
+        async def fetch():
+            self.upstream_fetches += 1
+            result = await self.analyzer.scrape_standings_async()
+            if result["success"]:
+                self.standings_cache.set('standings', result["data"])
+            return result
+
+        return await self.flights.do('standings', fetch)
+
+    async def get_game_log(self, player_name: str, seasons: int = 1) -> Dict:
+        if seasons <= 1:
+            game_log = self.analyzer.snapshot_game_log(player_name)
+            if game_log is not None:
+                return {"success": True, "data": game_log}
+
+        key = PlayerIndex.normalize(player_name)
+        if seasons > 1:
+            key = f"{key}:{seasons}"
+        game_log = self.gamelog_cache.get(key)
+        if game_log is not None:
+            return {"success": True, "data": game_log}
+
+        async def fetch():
+            self.upstream_fetches += 1
+            result = await self.analyzer.get_player_history_async(player_name, seasons)
+            if not result["success"]:
+                return result
+            # An expired log is updated in place of a rebuild, so a refresh that only
+            # adds the latest games appends them to its recency stats
+            previous = self.gamelog_cache.stale(key)
+            if previous is not None:
+                game_log = previous.updated(result["data"])
+            else:
+                game_log = GameLog.from_records(result["data"])
+            self.gamelog_cache.set(key, game_log)
+            return {"success": True, "data": game_log}
+
+        return await self.flights.do(f"gamelog:{key}", fetch)
+
+    async def analyze(self, body: Dict) -> Dict:
+        player_name = body['player']
+        # Validated before any fetch: a missing or unreadable direction is a bad request, not an OVER
+        is_over = parse_direction(body['is_over'])
+        recency = parse_flag(body.get('recency', False))
+        seasons = int(body.get('seasons', 1))
+        standings_result, games_result = await asyncio.gather(
+            self.get_standings(), self.get_game_log(player_name, seasons)
+        )
+        if not standings_result["success"]:
+            return standings_result
+        if not games_result["success"]:
+            return games_result
+        return self.analyzer.analyze_with_data(
+            games_result["data"],
+            standings_result["data"],
+            body['prop_type'],
+            float(body['prop_value']),
+            body['opponent'],
+            is_over,
+            interval_draws=int(body.get('interval_draws', 0)),
+            interval_level=float(body.get('interval_level', 0.9)),
+            seed=int(body['seed']) if body.get('seed') is not None else None,
+            recency=recency,
+            date_filter=body.get('date_filter')
+        )
+
+    async def _analyze_one(self, body: Dict) -> Dict:
+        """analyze, with a malformed prop reported as its own failed result"""
+        try:
+            return await self.analyze(body)
+        except (ValueError, KeyError, TypeError) as e:
+            return {"success": False, "error": f"Bad request: {e}"}
+
+    async def batch(self, body: Dict) -> Dict:
+        results = await asyncio.gather(*(self._analyze_one(prop) for prop in body['props']))
+        return {"success": True, "data": list(results)}
+
+    async def ladder(self, body: Dict) -> Dict:
+        player_name = body['player']
+        seasons = int(body.get('seasons', 1))
+        standings_result, games_result = await asyncio.gather(
+            self.get_standings(), self.get_game_log(player_name, seasons)
+        )
+        if not standings_result["success"]:
+            return standings_result
+        if not games_result["success"]:
+            return games_result
+        return self.analyzer.analyze_ladder_with_data(
+            games_result["data"],
+            standings_result["data"],
+            body['prop_type'],
+            [float(value) for value in body['prop_values']],
+            body['opponent']
+        )
+
+    def stats(self) -> Dict:
+        return {
+            "success": True,
+            "data": {
+                "upstream_fetches": self.upstream_fetches,
+                "coalesced_requests": self.flights.coalesced,
+                "standings_cache": {"hits": self.standings_cache.hits, "misses": self.standings_cache.misses},
+                "gamelog_cache": {"hits": self.gamelog_cache.hits, "misses": self.gamelog_cache.misses},
+                "transport": self.analyzer.transport.stats() if hasattr(self.analyzer.transport, 'stats') else {}
+            }
+        }
+
+    async def handle(self, method: str, path: str, body: bytes) -> Tuple[int, Union[Dict, str]]:
+        """Route one request; returns the status code and JSON payload (or plain text for /metrics)"""
+        if method == 'GET' and path == '/health':
+            return 200, {"success": True}
+        if method == 'GET' and path == '/stats':
+            return 200, self.stats()
+        if method == 'GET' and path == '/metrics':
+            return 200, self.analyzer.metrics.to_prometheus()
+
+        routes = {'/analysis': self.analyze, '/batch': self.batch, '/ladder': self.ladder}
+        if path not in routes:
+            return 404, {"success": False, "error": f"Unknown endpoint: {path}"}
+        if method != 'POST':
+            return 405, {"success": False, "error": "Use POST"}
+
+        try:
+            payload = json.loads(body or b'{}')
+            return 200, await routes[path](payload)
+        except (ValueError, KeyError, TypeError) as e:
+            return 400, {"success": False, "error": f"Bad request: {e}"}
+
+    async def serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Minimal HTTP/1.1 handling with keep-alive"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, _ = request_line.decode('latin-1').split(' ', 2)
+                except ValueError:
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get('content-length', 0) or 0)
+                body = await reader.readexactly(length) if length else b''
+
+                status, payload = await self.handle(method.upper(), target.split('?', 1)[0], body)
+                if isinstance(payload, str):
+                    data, content_type = payload.encode('utf-8'), 'text/plain; version=0.0.4'
+                else:
+                    data, content_type = json.dumps(payload).encode('utf-8'), 'application/json'
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(service: AnalysisService, host: str = '127.0.0.1', port: int = 8080) -> None:
+    server = await asyncio.start_server(service.serve_connection, host, port)
+    print(f"Serving NBA props analysis on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def serve_main(argv=None) -> None:
+    """Entry point: python Main.py serve [options] (or python service.py)"""
+    parser = argparse.ArgumentParser(prog='Main.py serve', description='HTTP service for props analysis')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, default=16, help='Concurrent upstream fetches')
+    parser.add_argument('--cache-dir', default=None, help='Enable the on-disk cache in this directory')
+    parser.add_argument('--player-index', default=None, help='Path of the persisted player index')
+    parser.add_argument('--history-dir', default=None, help='Store completed seasons here so they are fetched once')
+    parser.add_argument('--snapshot', default=None, help='Serve players from a snapshot written by Main.py warm')
+    parser.add_argument('--record', default=None, help='Record every ESPN response to this archive')
+    parser.add_argument('--replay', default=None, help='Serve ESPN responses from this archive instead of the network')
+    parser.add_argument('--replay-latency', default=None,
+                        help="Delay replayed responses: 'recorded' or a number of seconds")
+    parser.add_argument('--rate', type=float, default=None, help='Cap ESPN requests per second')
+    parser.add_argument('--retries', type=int, default=3, help='Retries of throttled or failed ESPN requests')
+    parser.add_argument('--hedge-after', type=float, default=None,
+                        help='Send a duplicate of any ESPN request unanswered after this many seconds')
+    parser.add_argument('--timeout', type=float, default=None,
+                        help='Seconds to wait for an ESPN connection or response (default 5 to connect, 20 to read)')
+    parser.add_argument('--log-metrics', action='store_true', help='Log a JSON event for every timed stage')
+    args = parser.parse_args(argv)
+
+    if args.log_metrics:
+        configure_event_logging()
+
+    analyzer = NBAPropsAnalyzer(
+        cache_dir=args.cache_dir,
+        player_index_path=args.player_index,
+        max_concurrency=args.workers,
+        transport=make_transport(args.record, args.replay, parse_latency(args.replay_latency), args.workers,
+                                 rate=args.rate, retries=args.retries, hedge_after=args.hedge_after,
+                                 timeout=args.timeout),
+        # Always collected here so GET /metrics can be scraped
+        metrics=Metrics(log_events=args.log_metrics),
+        history_dir=args.history_dir
+    )
+    if args.snapshot:
+        analyzer.load_snapshot(args.snapshot)
+    try:
+        asyncio.run(serve(AnalysisService(analyzer), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        analyzer.close()
+
+
+if __name__ == "__main__":
+    serve_main()
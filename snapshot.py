@@ -0,0 +1,90 @@
+import gzip
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+from gamelog import GameLog, StatIndex
+from player_index import PlayerIndex
+
+
+class WarmSnapshot:
+    """
+    Standings plus parsed game logs for a slate's players, ready to serve.
+
+    Written by the warmer and loaded by the analyzer. GameLogs and per-stat
+    StatIndexes are built once (precompute() or on first use) and kept, so an
+    analysis served from a snapshot is in-memory lookups plus the final
+    weighting.
+    """
+
+    VERSION = 1
+
+    def __init__(self, standings: Dict, players: Dict[str, Dict], created_at: Optional[float] = None,
+                 max_age: Optional[float] = None):
+        self.standings = standings
+        # Normalized name -> {"name", "id", "games"}
+        self.players = players
+        self.created_at = created_at or time.time()
+        self.max_age = max_age
+        self._logs: Dict[str, GameLog] = {}
+        self._indexes: Dict[tuple, StatIndex] = {}
+        self._lock = threading.Lock()
+
+    def is_fresh(self) -> bool:
+        return self.max_age is None or time.time() - self.created_at < self.max_age
+
+    def game_log(self, player_name: str) -> Optional[GameLog]:
+        key = PlayerIndex.normalize(player_name)
+        log = self._logs.get(key)
+        if log is None:
+            entry = self.players.get(key)
+            if entry is None:
+                return None
+            with self._lock:
+                log = self._logs.setdefault(key, GameLog.from_records(entry["games"]))
+        return log
+
+    def stat_index(self, player_name: str, stat_key: str) -> Optional[StatIndex]:
+        """Per-opponent aggregates for one player and stat (KeyError if the stat is not tracked)"""
+        key = (PlayerIndex.normalize(player_name), stat_key)
+        index = self._indexes.get(key)
+        if index is None:
+            log = self.game_log(player_name)
+            if log is None:
+                return None
+            index = StatIndex(log, stat_key)
+            with self._lock:
+                index = self._indexes.setdefault(key, index)
+        return index
+
+    def precompute(self, stat_keys: Iterable[str]) -> None:
+        """Build every player's GameLog and StatIndex for each tracked stat up front"""
+        stat_keys = list(stat_keys)
+        for entry in self.players.values():
+            log = self.game_log(entry["name"])
+            for stat_key in stat_keys:
+                if stat_key in log.stats:
+                    self.stat_index(entry["name"], stat_key)
+
+    def save(self, path: str) -> None:
+        snapshot = {
+            "version": self.VERSION,
+            "created_at": self.created_at,
+            "standings": self.standings,
+            "players": self.players
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, max_age: Optional[float] = None) -> 'WarmSnapshot':
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            snapshot = json.load(f)
+        if snapshot.get("version") != cls.VERSION:
+            raise ValueError(f"Unsupported snapshot version: {snapshot.get('version')}")
+        return cls(snapshot["standings"], snapshot["players"], snapshot["created_at"], max_age)
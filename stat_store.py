@@ -0,0 +1,223 @@
+import sqlite3
+import threading
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from gamelog import season_summary_block, team_summary_block
+from season_dates import parse_game_date
+
+
+class StatWarehouse:
+    """
+    SQLite store of parsed game rows for ad-hoc and aggregate queries.
+
+    One row per player game, keyed by (player_id, game_day) so re-ingesting
+    a refreshed game log upserts instead of duplicating. game_day is the
+    real date as an ordinal (date.toordinal(), the game records' 'ordinal'),
+    so both the key and the (player_id, opponent, game_day) index sort
+    chronologically and serve date ranges; game_date keeps ESPN's text.
+    """
+
+    STAT_COLUMNS = ('points', 'rebounds', 'assists', 'threes', 'pra')
+
+    # Bumped when the table layout changes; older tables are dropped and re-ingested
+    SCHEMA_VERSION = 2
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS games (
+            player_id  TEXT    NOT NULL,
+            game_day   INTEGER NOT NULL,
+            season     INTEGER NOT NULL,
+            game_date  TEXT    NOT NULL,
+            opponent   TEXT    NOT NULL,
+            points     REAL,
+            rebounds   REAL,
+            assists    REAL,
+            threes     REAL,
+            pra        REAL,
+            PRIMARY KEY (player_id, game_day)
+        );
+        CREATE INDEX IF NOT EXISTS games_player_opponent_day ON games (player_id, opponent, game_day);
+    """
+
+    def __init__(self, path: str = 'props_stats.sqlite3'):
+        self.path = path
+        # One connection shared by the I/O threads, serialized by the lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            if path != ':memory:':
+                self._conn.execute('PRAGMA journal_mode=WAL')
+            version = self._conn.execute('PRAGMA user_version').fetchone()[0]
+            if version < self.SCHEMA_VERSION:
+                # The warehouse only holds fetched game logs, so an old layout is rebuilt, not migrated
+                self._conn.execute('DROP TABLE IF EXISTS games')
+            self._conn.executescript(self.SCHEMA)
+            self._conn.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _query(self, sql: str, params: Sequence = ()) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    @classmethod
+    def _column(cls, stat_key: str) -> str:
+        """Validate a stat name before it is interpolated into SQL"""
+        if stat_key not in cls.STAT_COLUMNS:
+            raise KeyError(stat_key)
+        return stat_key
+
+    def upsert_games(self, player_id: str, season: int, games: List[Dict]) -> int:
+        """
+        Bulk insert or update one player-season of game records.
+
+        :param games: Records as returned by get_player_games.
+        :return: Number of rows written (games whose date cannot be read are skipped).
+        """
+        rows = []
+        for game in games:
+            game_season = int(game.get('season', season))
+            game_day = game.get('ordinal')
+            if not game_day:
+                parsed = parse_game_date(game['date'], game_season)
+                if parsed is None:
+                    continue
+                game_day = parsed.toordinal()
+            rows.append((
+                str(player_id), game_day, game_season, game['date'], game['opponent'],
+                game.get('points'), game.get('rebounds'), game.get('assists'), game.get('threes'),
+                game.get('pra')
+            ))
+        with self._lock, self._conn:
+            self._conn.executemany("""
+                INSERT INTO games (player_id, game_day, season, game_date, opponent,
+                                   points, rebounds, assists, threes, pra)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (player_id, game_day) DO UPDATE SET
+                    season = excluded.season,
+                    game_date = excluded.game_date,
+                    opponent = excluded.opponent,
+                    points = excluded.points,
+                    rebounds = excluded.rebounds,
+                    assists = excluded.assists,
+                    threes = excluded.threes,
+                    pra = excluded.pra
+            """, rows)
+        return len(rows)
+
+    def seasons(self, player_id: str) -> List[int]:
+        """Seasons stored for a player, newest first"""
+        rows = self._query('SELECT DISTINCT season FROM games WHERE player_id = ? ORDER BY season DESC',
+                           (str(player_id),))
+        return [row[0] for row in rows]
+
+    def find_games(self, player_id: Optional[str] = None, opponent: Optional[str] = None,
+                   stat_key: Optional[str] = None, above: Optional[float] = None,
+                   below: Optional[float] = None, seasons: Optional[Iterable[int]] = None,
+                   start: Optional[date] = None, end: Optional[date] = None) -> List[Dict]:
+        """
+        Ad-hoc game lookup, newest first, e.g. every game vs the Celtics with PRA over 40:
+
+            warehouse.find_games(player_id, opponent='Celtics', stat_key='pra', above=40)
+
+        start/end limit the games to a date range (inclusive), served by the
+        game_day key and index.
+        """
+        clauses, params = [], []
+        if player_id is not None:
+            clauses.append('player_id = ?')
+            params.append(str(player_id))
+        if opponent is not None:
+            clauses.append('opponent = ?')
+            params.append(opponent)
+        if seasons is not None:
+            seasons = [int(season) for season in seasons]
+            clauses.append(f"season IN ({','.join('?' * len(seasons))})")
+            params.extend(seasons)
+        if start is not None:
+            clauses.append('game_day >= ?')
+            params.append(start.toordinal())
+        if end is not None:
+            clauses.append('game_day <= ?')
+            params.append(end.toordinal())
+        if above is not None or below is not None:
+            column = self._column(stat_key)
+            if above is not None:
+                clauses.append(f'{column} > ?')
+                params.append(above)
+            if below is not None:
+                clauses.append(f'{column} < ?')
+                params.append(below)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        rows = self._query(f"""
+            SELECT player_id, season, game_date, game_day, opponent, points, rebounds, assists, threes, pra
+            FROM games {where}
+            ORDER BY player_id, game_day DESC
+        """, params)
+        keys = ('player_id', 'season', 'date', 'ordinal', 'opponent') + self.STAT_COLUMNS
+        return [dict(zip(keys, row)) for row in rows]
+
+    def aggregate(self, player_id: str, stat_key: str, prop_value: float, is_over: bool,
+                  seasons: Optional[Iterable[int]] = None) -> 'SQLAggregates':
+        """Per-opponent aggregates for one stat and line, computed in SQL"""
+        return SQLAggregates(self, str(player_id), self._column(stat_key), prop_value, is_over, seasons)
+
+
+class SQLAggregates:
+    """
+    SQL-backed counterpart of gamelog.OpponentAggregates.
+
+    Counts, sums and hit counts per opponent come from a single GROUP BY
+    query; a team's individual performances are only fetched when its
+    summary is asked for. team_summary and season_summary return the same
+    blocks as the in-memory version, so the analyzer's surrounding-team and
+    cross-conference logic runs on either.
+    """
+
+    def __init__(self, warehouse: StatWarehouse, player_id: str, column: str, prop_value: float,
+                 is_over: bool, seasons: Optional[Iterable[int]] = None):
+        self.warehouse = warehouse
+        self.player_id = player_id
+        self.column = column
+        self.prop_value = prop_value
+        self.comparison = '>' if is_over else '<'
+
+        self._where = 'player_id = ?'
+        self._params = [player_id]
+        if seasons is not None:
+            seasons = [int(season) for season in seasons]
+            self._where += f" AND season IN ({','.join('?' * len(seasons))})"
+            self._params.extend(seasons)
+
+        rows = warehouse._query(f"""
+            SELECT opponent, COUNT(*), SUM({column}), SUM({column} {self.comparison} ?)
+            FROM games WHERE {self._where}
+            GROUP BY opponent
+        """, [prop_value] + self._params)
+        self.by_team = {opponent: (count, total or 0.0, hits or 0) for opponent, count, total, hits in rows}
+
+    def team_summary(self, team: str) -> Dict:
+        """games_played/average/hit_rate/performances block for one opponent"""
+        games_played, total, hit_count = self.by_team.get(team, (0, 0.0, 0))
+        if not games_played:
+            return team_summary_block(0, 0, 0)
+
+        rows = self.warehouse._query(f"""
+            SELECT game_date, {self.column}, {self.column} {self.comparison} ?
+            FROM games WHERE {self._where} AND opponent = ?
+            ORDER BY game_day DESC
+        """, [self.prop_value] + self._params + [team])
+        dates, values, hits = zip(*rows) if rows else ((), (), ())
+        return team_summary_block(games_played, total, hit_count, dates, values, hits)
+
+    def season_summary(self) -> Dict:
+        """Season-wide block matching calculate_overall_stats"""
+        return season_summary_block(
+            sum(count for count, _, _ in self.by_team.values()),
+            sum(total for _, total, _ in self.by_team.values()),
+            sum(hit_count for _, _, hit_count in self.by_team.values())
+        )
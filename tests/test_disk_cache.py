@@ -0,0 +1,195 @@
+"""
+DiskCache TTLs, revalidation through the analyzer, and LRU eviction with running size totals.
+"""
+import os
+import sys
+import time
+
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+import disk_cache  # noqa: E402
+from disk_cache import DiskCache  # noqa: E402
+from Main import NBAPropsAnalyzer  # noqa: E402
+from metrics import Metrics  # noqa: E402
+from run_benchmarks import Fixtures  # noqa: E402
+from transport import Transport  # noqa: E402
+
+
+class Clock:
+    """Stand-in for the time module so TTLs can expire without waiting"""
+
+    def __init__(self):
+        self.now = time.time()
+
+    def time(self) -> float:
+        return self.now
+
+
+def entry_paths(cache: DiskCache) -> list:
+    return [os.path.join(root, name) for root, _, names in os.walk(cache.cache_dir)
+            for name in names if name.endswith('.json')]
+
+
+def disk_bytes(cache: DiskCache) -> int:
+    return sum(os.path.getsize(path) for path in entry_paths(cache))
+
+
+def age(cache: DiskCache, key: str, seconds_ago: float) -> None:
+    """Set an entry's LRU clock (its mtime) explicitly"""
+    stamp = time.time() - seconds_ago
+    os.utime(cache._path('gamelog', key), (stamp, stamp))
+
+
+def test_entries_go_stale_after_their_ttl(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(disk_cache, 'time', clock)
+    cache = DiskCache(str(tmp_path), ttls={'gamelog': 60})
+
+    cache.set('gamelog', '1966', [{'points': 30}], etag='"v1"')
+    entry = cache.get('gamelog', '1966')
+    assert entry["fresh"] and entry["data"] == [{'points': 30}] and entry["etag"] == '"v1"'
+
+    clock.now += 61
+    entry = cache.get('gamelog', '1966')
+    assert not entry["fresh"]
+    assert entry["data"] == [{'points': 30}]
+
+    # A 304 restarts the TTL without changing the data or validators
+    cache.touch('gamelog', '1966')
+    entry = cache.get('gamelog', '1966')
+    assert entry["fresh"] and entry["etag"] == '"v1"'
+
+
+def test_missing_entry_is_a_miss(tmp_path):
+    assert DiskCache(str(tmp_path)).get('gamelog', 'nobody') is None
+
+
+class ETagTransport(Transport):
+    """Serves one standings page with an ETag and answers 304 when the client already has it"""
+
+    def __init__(self, body: bytes, etag: str = '"v1"'):
+        self.body = body
+        self.etag = etag
+        self.requests = []
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        headers = kwargs.get('headers') or {}
+        self.requests.append(headers)
+        response = requests.Response()
+        response.url = url
+        response.headers = CaseInsensitiveDict({'ETag': self.etag})
+        if headers.get('If-None-Match') == self.etag:
+            response.status_code, response._content = 304, b''
+        else:
+            response.status_code, response._content = 200, self.body
+        return response
+
+
+@pytest.fixture(scope='module')
+def standings_page():
+    return Fixtures().standings
+
+
+def test_stale_entry_is_revalidated_with_its_etag(tmp_path, standings_page):
+    transport = ETagTransport(standings_page)
+    metrics = Metrics()
+    analyzer = NBAPropsAnalyzer(cache_dir=str(tmp_path), cache_ttls={'standings': 0},
+                                transport=transport, metrics=metrics)
+
+    first = analyzer.scrape_standings()
+    second = analyzer.scrape_standings()
+    assert first["success"] and second == first
+
+    assert 'If-None-Match' not in transport.requests[0]
+    assert transport.requests[1]['If-None-Match'] == '"v1"'
+    snapshot = metrics.snapshot()
+    # The 304 was answered from the cache without parsing the page again
+    assert snapshot["stages"]["parse.standings"]["count"] == 1
+    assert snapshot["counters"]["cache_requests.standings.revalidated"] == 1
+
+    # A changed page replaces the entry and its validator
+    transport.etag = '"v2"'
+    assert analyzer.scrape_standings() == first
+    assert analyzer.cache.get('standings', analyzer.STANDINGS_URL)["etag"] == '"v2"'
+    analyzer.close()
+
+
+def test_fresh_entry_skips_the_network(tmp_path, standings_page):
+    transport = ETagTransport(standings_page)
+    analyzer = NBAPropsAnalyzer(cache_dir=str(tmp_path), transport=transport)
+    analyzer.scrape_standings()
+    analyzer.scrape_standings()
+    assert len(transport.requests) == 1
+    analyzer.close()
+
+
+def test_eviction_drops_least_recently_used_entries(tmp_path):
+    cache = DiskCache(str(tmp_path), max_entries=10)
+    for i in range(10):
+        cache.set('gamelog', str(i), [i])
+        age(cache, str(i), 100 - i)
+    # Reading refreshes an entry's place in the LRU order
+    cache.get('gamelog', '0')
+
+    cache.set('gamelog', 'new', ['new'])
+    # Over the cap: trimmed to EVICT_TO of it, oldest first
+    assert len(entry_paths(cache)) == 9
+    assert cache.get('gamelog', '1') is None
+    assert cache.get('gamelog', '2') is None
+    for key in ['0', '3', '9', 'new']:
+        assert cache.get('gamelog', key) is not None
+
+
+def test_writes_under_the_cap_evict_nothing(tmp_path):
+    cache = DiskCache(str(tmp_path), max_entries=10)
+    for i in range(10):
+        cache.set('gamelog', str(i), [i])
+    assert len(entry_paths(cache)) == 10
+
+
+def test_byte_cap_is_enforced_and_tracked(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=5000)
+    for i in range(60):
+        cache.set('gamelog', str(i), list(range(20)))
+        assert cache._total_bytes == disk_bytes(cache)
+        assert len(cache._sizes) == len(entry_paths(cache))
+    assert disk_bytes(cache) <= 5000
+    assert cache.get('gamelog', '59') is not None
+
+
+def test_rewrites_replace_an_entrys_tracked_size(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    for size in (100, 3, 50):
+        cache.set('gamelog', 'same', list(range(size)))
+        assert cache._total_bytes == disk_bytes(cache)
+    assert len(cache._sizes) == 1
+
+    cache.clear()
+    assert cache._total_bytes == 0 and entry_paths(cache) == []
+
+
+def test_totals_are_seeded_from_existing_entries(tmp_path):
+    DiskCache(str(tmp_path)).set('gamelog', 'old', list(range(100)))
+    cache = DiskCache(str(tmp_path), max_entries=2)
+    cache.set('gamelog', 'a', [1])
+    assert len(cache._sizes) == 2
+    assert cache._total_bytes == disk_bytes(cache)
+
+
+def test_eviction_resyncs_with_other_writers(tmp_path):
+    cache = DiskCache(str(tmp_path), max_entries=10)
+    cache.set('gamelog', 'mine', [1])
+    # Another process sharing the directory; this instance's totals don't see its writes
+    other = DiskCache(str(tmp_path))
+    for i in range(20):
+        other.set('gamelog', f"other{i}", [i])
+
+    cache.evict()
+    assert len(entry_paths(cache)) == 9
+    assert len(cache._sizes) == 9
+    assert cache._total_bytes == disk_bytes(cache)
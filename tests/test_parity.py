@@ -0,0 +1,87 @@
+"""
+Parity checks over the checked-in benchmark fixtures.
+
+Every parser backend, the ladder and the warehouse are alternative routes to
+the same numbers; these tests fail when one of them drifts from the
+reference path (bs4 parsing, perform_full_analysis, in-memory aggregates).
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from run_benchmarks import Fixtures, fixture_analyzer, make_slate  # noqa: E402
+from Main import NBAPropsAnalyzer  # noqa: E402
+from gamelog import GameLog  # noqa: E402
+from parsers import BACKENDS  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def fixtures():
+    return Fixtures()
+
+
+@pytest.fixture(scope='module')
+def slate(fixtures):
+    return make_slate(fixtures, props_per_player=2)
+
+
+@pytest.fixture(scope='module')
+def analyzer(fixtures):
+    analyzer = fixture_analyzer(fixtures, warehouse_path=':memory:')
+    yield analyzer
+    analyzer.close()
+
+
+@pytest.fixture(scope='module')
+def reference_records(fixtures):
+    analyzer = NBAPropsAnalyzer(parser='bs4', gamelog_parser='bs4')
+    return ([analyzer._parse_standings(fixtures.standings)]
+            + [analyzer._parse_game_log(page) for page in fixtures.gamelogs.values()])
+
+
+@pytest.mark.parametrize('backend', list(BACKENDS))
+def test_parser_backends_match_bs4(fixtures, reference_records, backend):
+    analyzer = NBAPropsAnalyzer(parser=backend, gamelog_parser=backend)
+    records = ([analyzer._parse_standings(fixtures.standings)]
+               + [analyzer._parse_game_log(page) for page in fixtures.gamelogs.values()])
+    assert records == reference_records
+
+
+def test_ladder_matches_full_analysis(analyzer, slate):
+    standings = analyzer.scrape_standings()["data"]
+    for player_name, prop_type, prop_value, opponent, is_over in slate:
+        full = analyzer.perform_full_analysis(player_name, prop_type, prop_value, opponent, is_over)
+        assert full["success"], full
+        games = analyzer.get_player_games(player_name)["data"]
+        ladder = analyzer.analyze_ladder_with_data(games, standings, prop_type, [prop_value], opponent)
+        assert ladder["success"], ladder
+
+        entry = ladder["data"]["ladder"][0]["over" if is_over else "under"]
+        data = full["data"]
+        assert entry["season_hit_rate"] == pytest.approx(data["overall_stats"]["season_hit_rate"])
+        assert entry["direct_hit_rate"] == pytest.approx(data["direct_matchup"]["hit_rate"])
+        assert entry["final_probability"] == pytest.approx(data["final_probability"]["final_probability"])
+
+
+def test_warehouse_matches_in_memory(analyzer, slate):
+    standings = analyzer.scrape_standings()["data"]
+    for player_name, prop_type, prop_value, opponent, is_over in slate:
+        games = analyzer.get_player_games(player_name)["data"]
+        in_memory = analyzer.analyze_with_data(games, standings, prop_type, prop_value, opponent, is_over)
+        from_sql = analyzer.analyze_from_warehouse(player_name, prop_type, prop_value, opponent, is_over, standings)
+        assert in_memory["success"], in_memory
+        assert from_sql == in_memory
+
+
+def test_snapshot_aggregates_match_in_memory(analyzer, slate):
+    for player_name, prop_type, prop_value, _, is_over in slate:
+        stat_key = analyzer.PROP_STATS[prop_type]
+        log = GameLog.from_records(analyzer.get_player_games(player_name)["data"])
+        in_memory = log.aggregate(stat_key, prop_value, is_over)
+        at_line = log.stat_index(stat_key).at_line(prop_value, is_over)
+        assert at_line.season_summary() == in_memory.season_summary()
+        for team in log.teams + ['Nobody']:
+            assert at_line.team_summary(team) == in_memory.team_summary(team)
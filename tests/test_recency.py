@@ -0,0 +1,120 @@
+"""
+Incremental recency stats and game-log refreshes match a full rebuild.
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from run_benchmarks import Fixtures, fixture_analyzer  # noqa: E402
+from gamelog import GameLog  # noqa: E402
+from recency import RecencyStats  # noqa: E402
+
+LINES = [('points', 24.5, True), ('rebounds', 6.5, False), ('pra', 36.5, True)]
+
+
+@pytest.fixture(scope='module')
+def games():
+    """A fixture player's game records, newest first as ESPN lists them"""
+    analyzer = fixture_analyzer(Fixtures())
+    result = analyzer.get_player_games('LeBron James')
+    analyzer.close()
+    assert result["success"] and len(result["data"]) > 20
+    return result["data"]
+
+
+def flatten(summary: dict, prefix: str = '') -> dict:
+    """Nested summary blocks as {'last_5.hit_rate': value, ...}, for approximate comparison"""
+    flat = {}
+    for key, value in summary.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def summaries(recency: RecencyStats) -> dict:
+    return flatten({
+        f"{stat_key}.{prop_value}.{is_over}": recency.summary(stat_key, prop_value, is_over,
+                                                              windows=(1, 5, 10, 20, 1000))
+        for stat_key, prop_value, is_over in LINES
+    })
+
+
+def assert_same(recency: RecencyStats, rebuilt: RecencyStats) -> None:
+    assert len(recency) == len(rebuilt)
+    for key, column in rebuilt.values.items():
+        assert recency.values[key] == pytest.approx(column)
+        assert recency.prefix[key] == pytest.approx(rebuilt.prefix[key])
+    assert summaries(recency) == pytest.approx(summaries(rebuilt))
+
+
+def test_append_matches_a_rebuild(games):
+    oldest_first = games[::-1]
+    columns = GameLog.from_records(oldest_first).stats
+
+    recency = RecencyStats({key: column[:10] for key, column in columns.items()})
+    # Queried before appending, so cached hit prefixes and decayed totals get extended too
+    summaries(recency)
+    for i in range(10, len(oldest_first)):
+        recency.append({key: column[i] for key, column in columns.items()})
+
+    assert_same(recency, RecencyStats(columns))
+
+
+def test_append_to_an_empty_log():
+    recency = RecencyStats({'points': []})
+    recency.summary('points', 20.5, True)
+    for value in (30.0, 10.0, 25.0):
+        recency.append({'points': value})
+    rebuilt = RecencyStats({'points': [30.0, 10.0, 25.0]})
+    assert flatten(recency.summary('points', 20.5, True)) == \
+        pytest.approx(flatten(rebuilt.summary('points', 20.5, True)))
+
+
+def test_extend_hands_over_and_appends_to_recency(games):
+    old = GameLog.from_records(games[5:])
+    recency = old.recency
+    summaries(recency)
+
+    extended = old.extend(games[:5])
+    assert extended._recency is recency
+    assert len(extended) == len(games)
+    assert_same(extended.recency, GameLog.from_records(games).recency)
+    # The old log no longer shares the mutated stats
+    assert len(old.recency) == len(games) - 5
+
+
+def test_updated_adds_only_the_new_games(games):
+    old = GameLog.from_records(games[3:])
+    recency = old.recency
+
+    refreshed = old.updated(games)
+    rebuilt = GameLog.from_records(games)
+    assert refreshed.recency is recency
+    assert refreshed.dates == rebuilt.dates
+    for key, column in rebuilt.stats.items():
+        assert np.array_equal(refreshed.stats[key], column)
+    assert refreshed.aggregate('points', 24.5, True).season_summary() == \
+        rebuilt.aggregate('points', 24.5, True).season_summary()
+    assert_same(refreshed.recency, rebuilt.recency)
+
+
+def test_updated_rebuilds_when_an_old_game_changed(games):
+    old = GameLog.from_records(games[3:])
+    recency = old.recency
+
+    corrected = [dict(game) for game in games]
+    corrected[-1]['points'] += 1
+    refreshed = old.updated(corrected)
+    assert refreshed.recency is not recency
+    assert_same(refreshed.recency, GameLog.from_records(corrected).recency)
+
+
+def test_updated_with_no_new_games_keeps_the_log(games):
+    log = GameLog.from_records(games)
+    assert log.updated([dict(game) for game in games]) is log
@@ -0,0 +1,123 @@
+"""
+Request coalescing and caching in the analysis service, over the benchmark fixtures.
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from run_benchmarks import Fixtures, FixtureTransport  # noqa: E402
+from Main import NBAPropsAnalyzer  # noqa: E402
+from service import AnalysisService, SingleFlight, TTLCache  # noqa: E402
+
+
+class CountingTransport(FixtureTransport):
+    def __init__(self, fixtures: Fixtures):
+        super().__init__(fixtures)
+        self.urls = []
+
+    def get(self, url: str, **kwargs):
+        self.urls.append(url)
+        return super().get(url, **kwargs)
+
+
+@pytest.fixture(scope='module')
+def fixtures():
+    return Fixtures()
+
+
+@pytest.fixture
+def service(fixtures):
+    analyzer = NBAPropsAnalyzer(transport=CountingTransport(fixtures))
+    yield AnalysisService(analyzer)
+    analyzer.close()
+
+
+def test_single_flight_runs_one_call_per_key():
+    calls = []
+
+    async def fetch(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return {"success": True, "data": key}
+
+    async def run():
+        flights = SingleFlight()
+        results = await asyncio.gather(
+            *(flights.do('a', lambda: fetch('a')) for _ in range(5)),
+            flights.do('b', lambda: fetch('b'))
+        )
+        return flights, results
+
+    flights, results = asyncio.run(run())
+    assert sorted(calls) == ['a', 'b']
+    assert [result["data"] for result in results] == ['a'] * 5 + ['b']
+    assert flights.coalesced == 4
+
+
+def test_single_flight_fetches_again_once_done():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return len(calls)
+
+    async def run():
+        flights = SingleFlight()
+        first = await flights.do('a', fetch)
+        second = await flights.do('a', fetch)
+        return first, second, flights
+
+    first, second, flights = asyncio.run(run())
+    assert (first, second) == (1, 2)
+    assert not flights._inflight
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_fetch():
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return 'done'
+
+    async def run():
+        flights = SingleFlight()
+        impatient = asyncio.ensure_future(flights.do('a', fetch))
+        patient = asyncio.ensure_future(flights.do('a', fetch))
+        await asyncio.sleep(0.01)
+        impatient.cancel()
+        return await patient
+
+    assert asyncio.run(run()) == 'done'
+
+
+def test_ttl_cache_expires_but_keeps_the_stale_value():
+    cache = TTLCache(ttl=0)
+    cache.set('key', 'value')
+    assert cache.get('key') is None
+    assert cache.stale('key') == 'value'
+    assert cache.stale('other') is None
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_concurrent_requests_share_one_upstream_fetch(service):
+    body = {"player": "LeBron James", "prop_type": "points", "prop_value": 24.5,
+            "opponent": "Celtics", "is_over": "over"}
+
+    async def run():
+        return await asyncio.gather(*(service.analyze(dict(body)) for _ in range(10)))
+
+    results = asyncio.run(run())
+    assert all(result["success"] for result in results)
+    assert all(result == results[0] for result in results)
+
+    # One standings page, one player search and one game log for all ten requests
+    assert service.upstream_fetches == 2
+    assert service.flights.coalesced == 18
+    assert len(service.analyzer.transport.urls) == 3
+
+    # Later requests are served from the in-memory caches
+    asyncio.run(service.analyze(dict(body)))
+    assert len(service.analyzer.transport.urls) == 3
+    assert service.gamelog_cache.hits == 1 and service.standings_cache.hits == 1
@@ -0,0 +1,233 @@
+"""
+ResilientTransport, TokenBucket and AdaptiveConcurrency against a scripted inner transport.
+"""
+import os
+import sys
+import threading
+import time
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import transport as transport_module  # noqa: E402
+from rate_limit import AdaptiveConcurrency, TokenBucket  # noqa: E402
+from transport import ResilientTransport, Transport  # noqa: E402
+
+
+def make_response(status: int = 200, headers=None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response._content = b''
+    response.headers.update(headers or {})
+    return response
+
+
+class ScriptedTransport(Transport):
+    """
+    Answers requests from a script, one step per call (the last step repeats).
+
+    A step is a status code, a (status, headers) pair, an exception instance to
+    raise, or a (delay, step) pair to answer after sleeping.
+    """
+
+    def __init__(self, *steps):
+        self.steps = list(steps)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        with self._lock:
+            step = self.steps[min(self.calls, len(self.steps) - 1)]
+            self.calls += 1
+        if isinstance(step, tuple) and isinstance(step[0], float):
+            delay, step = step
+            time.sleep(delay)
+        if isinstance(step, Exception):
+            raise step
+        if isinstance(step, tuple):
+            return make_response(*step)
+        return make_response(step)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record retry delays instead of sleeping through them"""
+    delays = []
+    monkeypatch.setattr(transport_module.time, 'sleep', delays.append)
+    return delays
+
+
+def resilient(inner: Transport, **kwargs) -> ResilientTransport:
+    kwargs.setdefault('backoff', 0.01)
+    return ResilientTransport(inner, **kwargs)
+
+
+def test_retries_throttled_responses_until_success(sleeps):
+    inner = ScriptedTransport(503, 429, 200)
+    response = resilient(inner).get('http://espn.test/')
+    assert response.status_code == 200
+    assert inner.calls == 3
+    assert len(sleeps) == 2
+
+
+def test_returns_last_response_when_retries_run_out(sleeps):
+    inner = ScriptedTransport(503)
+    transport = resilient(inner, retries=2)
+    assert transport.get('http://espn.test/').status_code == 503
+    assert inner.calls == 3
+    assert transport.stats()["retries"] == 2
+    assert transport.stats()["throttled"] == 3
+
+
+def test_client_errors_are_not_retried(sleeps):
+    inner = ScriptedTransport(404)
+    assert resilient(inner).get('http://espn.test/').status_code == 404
+    assert inner.calls == 1
+    assert sleeps == []
+
+
+def test_retry_after_sets_the_minimum_delay(sleeps):
+    inner = ScriptedTransport((429, {'Retry-After': '7'}), 200)
+    assert resilient(inner).get('http://espn.test/').status_code == 200
+    assert sleeps[0] >= 7
+
+
+def test_unreadable_retry_after_falls_back_to_backoff(sleeps):
+    inner = ScriptedTransport((429, {'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'}), 200)
+    assert resilient(inner, backoff=0.5).get('http://espn.test/').status_code == 200
+    assert 0 <= sleeps[0] <= 0.5
+
+
+def test_retry_after_pauses_the_shared_bucket(sleeps):
+    inner = ScriptedTransport((429, {'Retry-After': '30'}))
+    transport = resilient(inner, rate=100, retries=0)
+    transport.get('http://espn.test/')
+    assert not transport.bucket.try_acquire()
+
+
+def test_connection_errors_are_retried_then_raised(sleeps):
+    inner = ScriptedTransport(requests.ConnectionError('reset'))
+    with pytest.raises(requests.ConnectionError):
+        resilient(inner, retries=2).get('http://espn.test/')
+    assert inner.calls == 3
+
+    inner = ScriptedTransport(requests.Timeout('slow'), 200)
+    assert resilient(inner).get('http://espn.test/').status_code == 200
+
+
+def test_other_errors_are_not_retried(sleeps):
+    inner = ScriptedTransport(ValueError('bad url'))
+    transport = resilient(inner)
+    with pytest.raises(ValueError):
+        transport.get('http://espn.test/')
+    assert inner.calls == 1
+    # The failed attempt gave its slot back
+    assert transport.limiter.inflight == 0
+
+
+def test_throttling_halves_the_concurrency_limit(sleeps):
+    transport = resilient(ScriptedTransport(503, 200), max_concurrency=8)
+    transport.get('http://espn.test/')
+    # Halved once by the 503, then +1/limit for the success
+    assert transport.limiter.limit == pytest.approx(4 + 1 / 4)
+    assert transport.limiter.inflight == 0
+
+
+def test_aimd_limit_moves_up_additively_and_down_multiplicatively():
+    limiter = AdaptiveConcurrency(initial=8, minimum=2, maximum=9, cooldown=0)
+    limiter.acquire()
+    limiter.release(True)
+    assert limiter.limit == pytest.approx(8.125)
+
+    for _ in range(5):
+        limiter.acquire()
+        limiter.release(False)
+    assert limiter.limit == 2
+
+    for _ in range(100):
+        limiter.acquire()
+        limiter.release(True)
+    assert limiter.limit == 9
+
+
+def test_aimd_backs_off_once_per_cooldown():
+    limiter = AdaptiveConcurrency(initial=8, cooldown=60)
+    for _ in range(3):
+        limiter.acquire()
+        limiter.release(False)
+    assert limiter.limit == 4
+
+
+def test_aimd_holds_requests_at_the_limit():
+    limiter = AdaptiveConcurrency(initial=2)
+    assert limiter.try_acquire() and limiter.try_acquire()
+    assert not limiter.try_acquire()
+
+    acquired = threading.Event()
+    waiter = threading.Thread(target=lambda: (limiter.acquire(), acquired.set()))
+    waiter.start()
+    assert not acquired.wait(0.05)
+    limiter.release(True)
+    assert acquired.wait(1)
+    waiter.join()
+
+
+def test_slow_request_is_hedged_and_the_duplicate_wins():
+    inner = ScriptedTransport((0.5, 200), 200)
+    transport = resilient(inner, hedge_after=0.05)
+    start = time.perf_counter()
+    assert transport.get('http://espn.test/').status_code == 200
+    assert time.perf_counter() - start < 0.4
+    assert inner.calls == 2
+    assert transport.stats()["hedges"] == 1
+    assert transport.stats()["hedge_wins"] == 1
+    transport.close()
+
+
+def test_fast_request_is_not_hedged():
+    inner = ScriptedTransport(200)
+    transport = resilient(inner, hedge_after=0.5)
+    transport.get('http://espn.test/')
+    assert inner.calls == 1
+    assert "hedges" not in transport.stats()
+    transport.close()
+
+
+def test_no_hedge_without_a_free_slot():
+    inner = ScriptedTransport((0.2, 200), 200)
+    transport = resilient(inner, hedge_after=0.02, max_concurrency=1)
+    assert transport.get('http://espn.test/').status_code == 200
+    assert inner.calls == 1
+    assert "hedges" not in transport.stats()
+    transport.close()
+
+
+def test_throttled_hedge_does_not_win_over_a_good_primary():
+    inner = ScriptedTransport((0.2, 200), 503)
+    transport = resilient(inner, hedge_after=0.02, retries=0)
+    assert transport.get('http://espn.test/').status_code == 200
+    assert "hedge_wins" not in transport.stats()
+    transport.close()
+
+
+def test_token_bucket_paces_requests_after_the_burst():
+    bucket = TokenBucket(rate=50, burst=2)
+    assert bucket.try_acquire() and bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+    start = time.perf_counter()
+    for _ in range(5):
+        bucket.acquire()
+    # Five tokens at 50/s need about 0.1s of refill
+    assert time.perf_counter() - start >= 0.08
+
+
+def test_token_bucket_pause_blocks_until_it_ends():
+    bucket = TokenBucket(rate=1000)
+    bucket.pause(0.1)
+    assert not bucket.try_acquire()
+    start = time.perf_counter()
+    bucket.acquire()
+    assert time.perf_counter() - start >= 0.08
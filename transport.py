@@ -0,0 +1,360 @@
+import base64
+import gzip
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from metrics import NULL_METRICS, Metrics
+from rate_limit import AdaptiveConcurrency, TokenBucket
+
+# Responses that mean "slow down / try again" rather than a real answer
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# (connect, read) seconds; without one a hung socket holds an I/O worker forever
+DEFAULT_TIMEOUT = (5.0, 20.0)
+
+
+class Transport:
+    """Where the analyzer's HTTP GETs go; subclasses decide how they are answered"""
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def bind_metrics(self, metrics: Metrics) -> None:
+        """Report transport-level counters (retries, hedges) to the analyzer's metrics"""
+        pass
+
+
+def request_key(url: str, params: Optional[Dict] = None) -> str:
+    """Canonical URL (query string included) used to match recorded responses"""
+    return requests.Request('GET', url, params=params).prepare().url
+
+
+class LiveTransport(Transport):
+    """
+    Real network access through one pooled requests session.
+
+    :param timeout: Default (connect, read) timeout in seconds, or one number
+                    for both; a request's own timeout argument wins.
+    """
+
+    def __init__(self, max_concurrency: int = 8, timeout: Union[float, tuple] = DEFAULT_TIMEOUT):
+        # One pooled session keeps TCP/TLS connections alive across requests
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_concurrency)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.timeout = timeout
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.get(url, **kwargs)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class RecordingTransport(Transport):
+    """
+    Passes requests through to another transport and records every response.
+
+    The archive is a gzip-compressed JSON document with the URL, status,
+    headers, body and upstream latency of each response. It is written on
+    close() (or save()), atomically, so a crashed run never leaves a truncated
+    archive behind.
+    """
+
+    def __init__(self, path: str, inner: Optional[Transport] = None):
+        self.path = path
+        self.inner = inner or LiveTransport()
+        self.entries: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        start = time.perf_counter()
+        response = self.inner.get(url, **kwargs)
+        elapsed = time.perf_counter() - start
+
+        entry = {
+            "key": request_key(url, kwargs.get('params')),
+            "status": response.status_code,
+            "headers": dict(response.headers),
+            "body": base64.b64encode(response.content).decode('ascii'),
+            "elapsed": elapsed
+        }
+        with self._lock:
+            self.entries.append(entry)
+        return response
+
+    def save(self) -> None:
+        with self._lock:
+            archive = {"version": 1, "recorded_at": time.time(), "entries": list(self.entries)}
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(archive, f)
+        os.replace(tmp_path, self.path)
+
+    def close(self) -> None:
+        self.save()
+        self.inner.close()
+
+    def bind_metrics(self, metrics: Metrics) -> None:
+        self.inner.bind_metrics(metrics)
+
+
+class ReplayTransport(Transport):
+    """
+    Serves responses from an archive written by RecordingTransport.
+
+    Responses for the same URL are replayed in the order they were recorded
+    (the last one repeats once they run out). URLs missing from the archive get
+    a 404 so runs stay offline.
+
+    :param latency: None for no delay, 'recorded' to sleep for each response's
+                    recorded upstream time, or a fixed number of seconds.
+    :param latency_scale: Multiplier applied to the delay, e.g. 0.5 to replay
+                          at twice the recorded speed.
+    """
+
+    def __init__(self, path: str, latency: Union[None, str, float] = None, latency_scale: float = 1.0):
+        self.path = path
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self.misses = 0
+        self._responses: Dict[str, List[Dict]] = {}
+        self._positions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            archive = json.load(f)
+        for entry in archive["entries"]:
+            self._responses.setdefault(entry["key"], []).append(entry)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._responses.values())
+
+    def _next_entry(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entries = self._responses.get(key)
+            if not entries:
+                self.misses += 1
+                return None
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+            return entries[min(position, len(entries) - 1)]
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        key = request_key(url, kwargs.get('params'))
+        entry = self._next_entry(key)
+
+        if self.latency == 'recorded':
+            delay = entry["elapsed"] if entry else 0.0
+        else:
+            delay = float(self.latency or 0.0)
+        if delay > 0:
+            time.sleep(delay * self.latency_scale)
+
+        response = requests.Response()
+        response.url = key
+        if entry is None:
+            response.status_code = 404
+            response._content = b''
+            return response
+
+        response.status_code = entry["status"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response._content = base64.b64decode(entry["body"])
+        # The body is already decoded; don't let clients try to gunzip it again
+        response.headers.pop('Content-Encoding', None)
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers) or 'utf-8'
+        return response
+
+
+class ResilientTransport(Transport):
+    """
+    Keeps a burst of parallel fetches inside what ESPN will tolerate.
+
+    Every attempt takes a token from a shared TokenBucket (when a rate is set)
+    and a slot from an AIMD AdaptiveConcurrency limit, which halves on 429/5xx
+    or connection errors and creeps back up as requests succeed. Throttled and
+    failed attempts are retried with full-jitter exponential backoff, waiting
+    at least as long as any Retry-After header asks. The last response is
+    returned (or the last error raised) once retries run out.
+
+    With hedge_after set, a request still unanswered after that many seconds
+    gets one duplicate, but only if a token and a slot are free right away, so
+    hedging never adds load while we are being throttled. The first usable
+    answer wins.
+
+    :param rate: Sustained requests per second across all threads (None = unlimited).
+    :param burst: Requests allowed back to back before the rate applies.
+    :param max_concurrency: Ceiling (and starting point) of the in-flight limit.
+    :param retries: Extra attempts after the first.
+    :param backoff: Base delay in seconds; attempt n waits up to backoff * 2**n.
+    :param max_backoff: Cap on a single delay.
+    :param hedge_after: Seconds before a hedged duplicate is sent (None = never).
+    """
+
+    def __init__(self, inner: Transport, rate: Optional[float] = None, burst: Optional[float] = None,
+                 max_concurrency: int = 8, min_concurrency: int = 1, retries: int = 3,
+                 backoff: float = 0.5, max_backoff: float = 30.0, hedge_after: Optional[float] = None,
+                 rng: Optional[random.Random] = None):
+        self.inner = inner
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.limiter = AdaptiveConcurrency(max_concurrency, min_concurrency, max_concurrency)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.hedge_after = hedge_after
+        self.counts = Counter()
+        self.metrics = NULL_METRICS
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+        # Attempts run here when hedging so the caller can wait on either copy
+        self._hedge_pool = ThreadPoolExecutor(
+            max_workers=2 * max_concurrency, thread_name_prefix='props-hedge'
+        ) if hedge_after else None
+
+    def bind_metrics(self, metrics: Metrics) -> None:
+        self.metrics = metrics
+        self.inner.bind_metrics(metrics)
+
+    def _count(self, name: str, **labels) -> None:
+        with self._lock:
+            self.counts[name] += 1
+        self.metrics.incr(f'http_{name}', **labels)
+
+    def _reserve(self) -> bool:
+        """Take a token and a slot without waiting (for hedges)"""
+        if self.bucket and not self.bucket.try_acquire():
+            return False
+        return self.limiter.try_acquire()
+
+    def _attempt(self, url: str, kwargs: Dict, reserved: bool = False) -> requests.Response:
+        if not reserved:
+            if self.bucket:
+                self.bucket.acquire()
+            self.limiter.acquire()
+        try:
+            response = self.inner.get(url, **kwargs)
+        except Exception:
+            self.limiter.release(False)
+            raise
+        throttled = response.status_code in RETRY_STATUSES
+        self.limiter.release(not throttled)
+        if throttled:
+            self._count('throttled', status=response.status_code)
+            delay = self._retry_after(response)
+            if delay and self.bucket:
+                self.bucket.pause(delay)
+        return response
+
+    @staticmethod
+    def _usable(future) -> bool:
+        return future.exception() is None and future.result().status_code not in RETRY_STATUSES
+
+    def _send(self, url: str, kwargs: Dict) -> requests.Response:
+        """One attempt, hedged with a duplicate if it is slow to answer"""
+        if self._hedge_pool is None:
+            return self._attempt(url, kwargs)
+
+        primary = self._hedge_pool.submit(self._attempt, url, kwargs)
+        done, _ = wait([primary], timeout=self.hedge_after)
+        if done or not self._reserve():
+            return primary.result()
+
+        self._count('hedges')
+        hedge = self._hedge_pool.submit(self._attempt, url, kwargs, True)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if self._usable(future) or not pending:
+                    if future is hedge:
+                        self._count('hedge_wins')
+                    return future.result()
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> Optional[float]:
+        value = response.headers.get('Retry-After')
+        try:
+            return float(value) if value is not None else None
+        except ValueError:
+            # The HTTP-date form is rare from ESPN; fall back to our own backoff
+            return None
+
+    def _delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        delay = self._rng.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        return max(delay, retry_after or 0.0)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        for attempt in range(self.retries + 1):
+            retry_after = None
+            try:
+                response = self._send(url, kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.retries:
+                    raise
+                self._count('retries', reason=type(e).__name__)
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                    return response
+                retry_after = self._retry_after(response)
+                self._count('retries', reason=response.status_code)
+            time.sleep(self._delay(attempt, retry_after))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counts = dict(self.counts)
+        return {"concurrency_limit": int(self.limiter.limit), "in_flight": self.limiter.inflight, **counts}
+
+    def close(self) -> None:
+        if self._hedge_pool:
+            self._hedge_pool.shutdown(wait=False)
+        self.inner.close()
+
+
+def make_transport(record: Optional[str] = None, replay: Optional[str] = None,
+                   replay_latency: Union[None, str, float] = None,
+                   max_concurrency: int = 8, rate: Optional[float] = None,
+                   retries: int = 3, hedge_after: Optional[float] = None,
+                   timeout: Union[None, float, tuple] = None) -> Transport:
+    """
+    Build the transport selected by the command-line options.
+
+    Whatever answers the requests (the network, a recorder or a replayed
+    archive) is wrapped in a ResilientTransport, outside the recorder so that
+    throttled responses are recorded and replay exercises the same retries.
+    """
+    if record and replay:
+        raise ValueError("Choose either record or replay, not both")
+    if replay:
+        inner = ReplayTransport(replay, latency=replay_latency)
+    elif record:
+        inner = RecordingTransport(record, LiveTransport(max_concurrency, timeout or DEFAULT_TIMEOUT))
+    else:
+        inner = LiveTransport(max_concurrency, timeout or DEFAULT_TIMEOUT)
+    return ResilientTransport(inner, rate=rate, max_concurrency=max_concurrency,
+                              retries=retries, hedge_after=hedge_after)
+
+
+def parse_latency(value: Optional[str]) -> Union[None, str, float]:
+    """Command-line form of ReplayTransport's latency: 'recorded' or seconds"""
+    if value is None or value == 'recorded':
+        return value
+    return float(value)
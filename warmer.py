@@ -0,0 +1,133 @@
+import argparse
+import heapq
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from Main import NBAPropsAnalyzer, read_props
+from player_index import PlayerIndex
+from snapshot import WarmSnapshot
+from transport import make_transport
+
+
+class Warmer:
+    """
+    Pre-fetches and precomputes everything a slate will ask for.
+
+    Players are fetched in order of expected demand (how many props on the
+    slate name them) from a heap shared by the worker threads, so the most
+    requested players are ready first even if the run is cut short. Fetches go
+    through the analyzer, so the disk cache and player index are warmed too.
+    """
+
+    def __init__(self, analyzer: NBAPropsAnalyzer, workers: int = 8):
+        self.analyzer = analyzer
+        self.workers = workers
+
+    @staticmethod
+    def demand(props: List[tuple]) -> Counter:
+        """Expected requests per player: the number of slate props naming them"""
+        return Counter(prop[0] for prop in props)
+
+    def warm(self, props: List[tuple]) -> Dict:
+        """
+        Fetch standings and every slate player's game log, highest demand first.
+
+        :return: The WarmSnapshot (precomputed for every prop type) plus the
+                 players that failed, with their errors.
+        """
+        standings_result = self.analyzer.scrape_standings()
+        if not standings_result["success"]:
+            return standings_result
+
+        demand = self.demand(props)
+        heap = [(-count, order, name) for order, (name, count) in enumerate(demand.items())]
+        heapq.heapify(heap)
+        lock = threading.Lock()
+        players = {}
+        failures = {}
+
+        def worker():
+            while True:
+                with lock:
+                    if not heap:
+                        return
+                    _, _, player_name = heapq.heappop(heap)
+
+                id_result = self.analyzer.get_player_id(player_name)
+                games_result = self.analyzer.get_player_games(player_name) if id_result["success"] else id_result
+                with lock:
+                    if games_result["success"]:
+                        players[PlayerIndex.normalize(player_name)] = {
+                            "name": player_name,
+                            "id": id_result["id"],
+                            "games": games_result["data"]
+                        }
+                    else:
+                        failures[player_name] = games_result["error"]
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='warmer') as pool:
+            for _ in range(min(self.workers, len(heap)) or 1):
+                pool.submit(worker)
+
+        snapshot = WarmSnapshot(standings_result["data"], players)
+        snapshot.precompute(set(self.analyzer.PROP_STATS.values()))
+        return {"success": True, "data": {"snapshot": snapshot, "failures": failures}}
+
+
+def warm_main(argv=None) -> int:
+    """Entry point: python Main.py warm slate.csv --snapshot warm.json.gz [--every SECONDS]"""
+    parser = argparse.ArgumentParser(prog='Main.py warm', description='Precompute a slate for in-memory serving')
+    parser.add_argument('slate', help='CSV or JSONL file of the day\'s props')
+    parser.add_argument('--snapshot', required=True, help='Where to write the warmed snapshot')
+    parser.add_argument('--format', choices=['auto', 'csv', 'jsonl'], default='auto')
+    parser.add_argument('--workers', type=int, default=8, help='Players fetched concurrently')
+    parser.add_argument('--cache-dir', default=None, help='Enable the on-disk cache in this directory')
+    parser.add_argument('--player-index', default=None, help='Path of the persisted player index')
+    parser.add_argument('--rate', type=float, default=None, help='Cap ESPN requests per second across all workers')
+    parser.add_argument('--timeout', type=float, default=None,
+                        help='Seconds to wait for an ESPN connection or response (default 5 to connect, 20 to read)')
+    parser.add_argument('--every', type=float, default=0, help='Re-run every this many seconds (0 = once)')
+    args = parser.parse_args(argv)
+
+    analyzer = NBAPropsAnalyzer(
+        cache_dir=args.cache_dir,
+        player_index_path=args.player_index,
+        max_concurrency=args.workers,
+        transport=make_transport(max_concurrency=args.workers, rate=args.rate, timeout=args.timeout)
+    )
+    warmer = Warmer(analyzer, args.workers)
+    try:
+        while True:
+            errors = []
+            with open(args.slate, 'r', encoding='utf-8') as f:
+                props = read_props(f, args.format, errors)
+            for error in errors:
+                print(f"Error reading slate: {error['error']}", file=sys.stderr)
+
+            start = time.perf_counter()
+            result = warmer.warm(props)
+            if not result["success"]:
+                print(f"Error warming slate: {result['error']}", file=sys.stderr)
+                if not args.every:
+                    return 1
+            else:
+                snapshot = result["data"]["snapshot"]
+                snapshot.save(args.snapshot)
+                for player_name, error in result["data"]["failures"].items():
+                    print(f"Error warming {player_name}: {error}", file=sys.stderr)
+                print(f"Warmed {len(snapshot.players)} players for {len(props)} props "
+                      f"in {time.perf_counter() - start:.1f}s -> {args.snapshot}", file=sys.stderr)
+
+            if not args.every:
+                return 1 if result["data"]["failures"] else 0
+            time.sleep(args.every)
+    finally:
+        analyzer.close()
+
+
+if __name__ == "__main__":
+    sys.exit(warm_main())